@@ -0,0 +1,247 @@
+"""
+Precomputed period x industry x pain category x sentiment rollup cube
+
+Mention counts are pivoted once into a dense numpy array with one axis per
+dimension, and cumulative sums are taken along the time axis. Any period range
+is then the difference of two prefix slices, so a filter such as "2024-Q2 to
+2025-Q1, Retail and Healthcare" costs a handful of array lookups no matter how
+many rows or how many years of history the cube was built from.
+
+Facts are rows of FACT_COLUMNS:
+
+    Date        any timestamp inside the period (e.g. month end)
+    Industry    industry name
+    Category    pain point category (keys of sfcc_data.pain_points)
+    Sentiment   Positive / Neutral / Negative
+    Mentions    count
+
+Missing dimensions can be filled with UNSPECIFIED.
+"""
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+FACT_COLUMNS = ['Date', 'Industry', 'Category', 'Sentiment', 'Mentions']
+DIMENSIONS = ['Industry', 'Category', 'Sentiment']
+SENTIMENTS = ['Positive', 'Neutral', 'Negative']
+
+# Member used when a fact does not carry a dimension
+UNSPECIFIED = 'Unspecified'
+
+
+def _to_period(value, freq, how):
+    """Convert a Period, date string ('2024-03', '2024Q1') or timestamp to `freq`"""
+    if not isinstance(value, pd.Period):
+        value = pd.Period(value) if isinstance(value, str) else pd.Period(value, freq=freq)
+    return value.asfreq(freq, how=how)
+
+
+class AggregateCube:
+    """
+    Dense rollup cube with prefix sums along time
+
+    Args:
+        periods (pandas.PeriodIndex): Consecutive periods of the time axis
+        members (dict): {dimension: list of members} for DIMENSIONS
+        counts (numpy.ndarray): Shape (periods, industries, categories,
+            sentiments) mention counts
+    """
+
+    def __init__(self, periods, members, counts):
+        self.periods = periods
+        self.members = {dim: list(members[dim]) for dim in DIMENSIONS}
+        self._positions = {
+            dim: {member: i for i, member in enumerate(self.members[dim])}
+            for dim in DIMENSIONS
+        }
+        # prefix[t] holds the sum of all periods before t
+        self.prefix = np.zeros((len(periods) + 1,) + counts.shape[1:], dtype=np.int64)
+        np.cumsum(counts, axis=0, out=self.prefix[1:])
+
+    @classmethod
+    def from_facts(cls, facts, freq='M', industries=None, categories=None, sentiments=SENTIMENTS):
+        """
+        Pivot fact rows into a cube
+
+        Args:
+            facts (pandas.DataFrame): FACT_COLUMNS rows
+            freq (str): Time resolution, 'M' for months or 'D' for days
+            industries (list): Industry members, in display order; members
+                found in the facts are appended
+            categories (list): Category members, as above
+            sentiments (list): Sentiment members, as above
+
+        Returns:
+            AggregateCube
+        """
+        facts = facts.dropna(subset=['Date'])
+        dimensions = []
+        for dim in DIMENSIONS:
+            values = facts[dim] if dim in facts.columns else pd.Series(UNSPECIFIED, index=facts.index)
+            # Members are mapped once per distinct label, rows only carry codes
+            values = values.astype('category')
+            dimensions.append((values.cat.categories.astype(str), values.cat.codes.to_numpy()))
+        return cls._pivot(pd.to_datetime(facts['Date']).to_numpy(), dimensions,
+                          facts['Mentions'].fillna(0).to_numpy(dtype=np.int64),
+                          freq, [industries, categories, sentiments])
+
+    @classmethod
+    def from_table(cls, table, freq='M', industries=None, categories=None, sentiments=SENTIMENTS):
+        """
+        Pivot fact rows held in an Arrow table into a cube
+
+        Reads the columns in place: dictionary codes and numbers of a
+        memory-mapped table are not copied into a DataFrame first.
+
+        Args:
+            table (pyarrow.Table): FACT_COLUMNS rows
+            freq (str): Time resolution, as for from_facts()
+            industries (list): Industry members, as for from_facts()
+            categories (list): Category members, as above
+            sentiments (list): Sentiment members, as above
+
+        Returns:
+            AggregateCube
+        """
+        dates = table['Date'].to_numpy()
+        valid = ~np.isnat(dates)
+        dimensions = []
+        for dim in DIMENSIONS:
+            if dim not in table.column_names:
+                dimensions.append((pd.Index([UNSPECIFIED]), np.zeros(valid.sum(), dtype=np.int64)))
+                continue
+            column = table[dim]
+            if not pa.types.is_dictionary(column.type):
+                column = pc.dictionary_encode(column)
+            column = column.unify_dictionaries()
+            labels = column.chunk(0).dictionary.to_pylist() if column.num_chunks else []
+            codes = np.concatenate([pc.fill_null(chunk.indices, -1).to_numpy() for chunk in column.chunks]
+                                   or [np.zeros(0, dtype=np.int64)])
+            dimensions.append((pd.Index(labels, dtype=object).astype(str), codes[valid]))
+        mentions = pc.fill_null(table['Mentions'], 0).to_numpy().astype(np.int64, copy=False)
+        return cls._pivot(dates[valid], dimensions, mentions[valid], freq, [industries, categories, sentiments])
+
+    @classmethod
+    def _pivot(cls, dates, dimensions, mentions, freq, presets):
+        """
+        Build the cube from per-row dates, dimension codes and mentions
+
+        Args:
+            dates (numpy.ndarray): datetime64 per row, no missing values
+            dimensions (list): (labels, codes) per dimension in DIMENSIONS
+                order; a code of -1 is a missing value, counted as
+                UNSPECIFIED
+            mentions (numpy.ndarray): int64 mentions per row
+            freq (str): Time resolution
+            presets (list): Members per dimension in display order, or None
+        """
+        if len(dates):
+            fact_periods = pd.DatetimeIndex(dates).to_period(freq)
+            periods = pd.period_range(fact_periods.min(), fact_periods.max(), freq=freq)
+        else:
+            periods = pd.PeriodIndex([], freq=freq)
+
+        members = {}
+        codes = []
+        for dim, (labels, row_codes), preset in zip(DIMENSIONS, dimensions, presets):
+            labels = pd.Index(labels)
+            missing = row_codes < 0
+            if missing.any():
+                if UNSPECIFIED not in labels:
+                    labels = labels.append(pd.Index([UNSPECIFIED]))
+                row_codes = np.where(missing, labels.get_loc(UNSPECIFIED), row_codes)
+            present = labels[np.unique(row_codes)] if len(row_codes) else labels[:0]
+            members[dim] = list(dict.fromkeys(list(preset or []) + sorted(present)))
+            positions = pd.Index(members[dim]).get_indexer(labels)
+            codes.append(positions[row_codes].astype(np.int64))
+
+        counts = np.zeros((len(periods),) + tuple(len(members[dim]) for dim in DIMENSIONS), dtype=np.int64)
+        if len(periods):
+            time_codes = fact_periods.asi8 - periods[0].ordinal
+            np.add.at(counts, (time_codes, *codes), mentions)
+        return cls(periods, members, counts)
+
+    # --- Lookups ---
+
+    def _time_bounds(self, start=None, end=None):
+        """Prefix indices [lo, hi) covering the periods from start to end"""
+        if not len(self.periods):
+            return 0, 0
+        freq = self.periods.freq
+        origin = self.periods[0].ordinal
+        lo = 0
+        hi = len(self.periods)
+        if start is not None:
+            lo = int(np.clip(_to_period(start, freq, 'start').ordinal - origin, 0, len(self.periods)))
+        if end is not None:
+            hi = int(np.clip(_to_period(end, freq, 'end').ordinal - origin + 1, 0, len(self.periods)))
+        return lo, max(lo, hi)
+
+    def _selection(self, industries=None, categories=None, sentiments=None):
+        """np.ix_-style index arrays for the non-time axes"""
+        selected = []
+        for dim, wanted in zip(DIMENSIONS, [industries, categories, sentiments]):
+            if wanted is None:
+                selected.append(np.arange(len(self.members[dim])))
+            else:
+                positions = self._positions[dim]
+                selected.append(np.array([positions[m] for m in wanted if m in positions], dtype=np.int64))
+        return np.ix_(*selected)
+
+    def total(self, start=None, end=None, industries=None, categories=None, sentiments=None):
+        """
+        Total mentions in a period range for a subset of members
+
+        Args:
+            start: First period (Period, e.g. a quarter, or date string),
+                beginning of the cube if None
+            end: Last period, inclusive, end of the cube if None
+            industries (list): Industries to include, all if None
+            categories (list): Categories to include, all if None
+            sentiments (list): Sentiments to include, all if None
+
+        Returns:
+            int: Mention count
+        """
+        lo, hi = self._time_bounds(start, end)
+        window = self.prefix[hi] - self.prefix[lo]
+        return int(window[self._selection(industries, categories, sentiments)].sum())
+
+    def totals_by(self, dimension, start=None, end=None, industries=None, categories=None, sentiments=None):
+        """
+        Mentions per member of one dimension in a period range
+
+        Args:
+            dimension (str): 'Industry', 'Category' or 'Sentiment'
+            start, end, industries, categories, sentiments: As for total()
+
+        Returns:
+            pandas.Series: Mentions indexed by member
+        """
+        lo, hi = self._time_bounds(start, end)
+        window = (self.prefix[hi] - self.prefix[lo])[self._selection(industries, categories, sentiments)]
+        axis = DIMENSIONS.index(dimension)
+        sums = window.sum(axis=tuple(i for i in range(len(DIMENSIONS)) if i != axis))
+        wanted = [industries, categories, sentiments][axis]
+        index = self.members[dimension] if wanted is None else [m for m in wanted if m in self._positions[dimension]]
+        return pd.Series(sums, index=index, name='Mentions')
+
+    def series(self, start=None, end=None, industries=None, categories=None, sentiments=None):
+        """
+        Mentions per period in a range
+
+        Args:
+            start, end, industries, categories, sentiments: As for total()
+
+        Returns:
+            pandas.DataFrame: Date (period end) and Mentions
+        """
+        lo, hi = self._time_bounds(start, end)
+        per_period = np.diff(self.prefix[lo:hi + 1], axis=0)
+        selection = (slice(None),) + self._selection(industries, categories, sentiments)
+        mentions = per_period[selection].sum(axis=(1, 2, 3)) if hi > lo else np.zeros(0, dtype=np.int64)
+        return pd.DataFrame({
+            'Date': self.periods[lo:hi].to_timestamp(how='end').normalize(),
+            'Mentions': mentions,
+        })
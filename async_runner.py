@@ -0,0 +1,209 @@
+"""
+Asyncio runner for many concurrent transcript searches
+
+Weekly reporting runs dozens of searches (per competitor, industry, quarter).
+Instead of submitting and waiting on them one by one, the runner submits up to
+`max_concurrency` jobs at a time, polls them concurrently and hands results back
+as soon as each finishes, so a batch takes about as long as its slowest job.
+
+Usage:
+    jobs = [search_job(term, [term], days_back=90) for term in terms]
+    for result in run_searches(jobs, max_concurrency=8):
+        print(result.name, result.total_seconds, len(result.df))
+
+    python async_runner.py competitors.txt --days-back 90 --concurrency 8
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from batch_search import load_terms
+from query_planner import QueryBudgetExceeded, apply_budget, plan_query
+from search_salesloft_transcripts import build_search_query, search_job_config
+
+# Seconds between job status checks
+POLL_INTERVAL = 1.0
+
+
+class SearchJob:
+    """
+    One query to run
+
+    Args:
+        name (str): Label used in progress output and results
+        query (str): SQL to run
+        job_config (bigquery.QueryJobConfig): Config with query parameters
+        location (str): Dataset location, BigQuery infers it if None
+        days_back (int): Search window, used by the budget planner
+    """
+
+    def __init__(self, name, query, job_config=None, location=None, days_back=None):
+        self.name = name
+        self.query = query
+        self.job_config = job_config
+        self.location = location
+        self.days_back = days_back
+
+
+class JobResult:
+    """
+    Outcome and timing of one SearchJob
+
+    `queued_seconds` is time spent waiting for a concurrency slot,
+    `run_seconds` is planning, execution and download.
+    """
+
+    def __init__(self, name, df=None, error=None, queued_seconds=0.0, run_seconds=0.0, bytes_processed=None):
+        self.name = name
+        self.df = df
+        self.error = error
+        self.queued_seconds = queued_seconds
+        self.run_seconds = run_seconds
+        self.bytes_processed = bytes_processed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def total_seconds(self):
+        return self.queued_seconds + self.run_seconds
+
+
+def search_job(name, search_terms=None, days_back=30, limit=100):
+    """
+    SearchJob for the same query search_salesloft_transcripts() runs
+
+    Args:
+        name (str): Label for the job
+        search_terms (list): List of terms to search for in transcripts
+        days_back (int): How many days back to search
+        limit (int): Maximum number of results to return
+
+    Returns:
+        SearchJob: Job ready for run_searches()
+    """
+    return SearchJob(
+        name,
+        build_search_query(search_terms, days_back, limit),
+        apply_budget(search_job_config(search_terms, days_back)),
+        days_back=days_back
+    )
+
+
+async def _run_job(client, job, semaphore, executor, poll_interval):
+    loop = asyncio.get_running_loop()
+    queued_at = time.perf_counter()
+    async with semaphore:
+        started_at = time.perf_counter()
+        bytes_processed = None
+        try:
+            # Client calls are blocking HTTP requests, so they go to threads
+            plan = await loop.run_in_executor(executor, partial(
+                plan_query, client, job.query,
+                job_config=job.job_config, location=job.location, days_back=job.days_back
+            ))
+            bytes_processed = plan.bytes_processed
+            if not plan.within_budget:
+                raise QueryBudgetExceeded(plan)
+
+            query_job = await loop.run_in_executor(executor, partial(
+                client.query, job.query, job_config=job.job_config, location=job.location
+            ))
+            while not await loop.run_in_executor(executor, query_job.done):
+                await asyncio.sleep(poll_interval)
+            df = await loop.run_in_executor(executor, query_job.to_dataframe)
+            error = None
+        except Exception as e:
+            df, error = None, e
+        finished_at = time.perf_counter()
+
+    return JobResult(
+        job.name, df=df, error=error,
+        queued_seconds=started_at - queued_at,
+        run_seconds=finished_at - started_at,
+        bytes_processed=bytes_processed
+    )
+
+
+async def iter_searches(jobs, max_concurrency=8, poll_interval=POLL_INTERVAL, client=None):
+    """
+    Run jobs concurrently, yielding each result as soon as it completes
+
+    Args:
+        jobs (list): SearchJob instances
+        max_concurrency (int): Maximum jobs in flight at once
+        poll_interval (float): Seconds between status checks of a job
+        client (bigquery.Client): Client to use, created if not provided
+
+    Yields:
+        JobResult: In completion order; failed jobs carry `error`
+    """
+    if client is None:
+        from google.cloud import bigquery
+        client = bigquery.Client()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # One thread per slot: the loop's default pool has min(32, cpus + 4)
+    # threads and would cap the blocking client calls below max_concurrency
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="search")
+    tasks = [asyncio.ensure_future(_run_job(client, job, semaphore, executor, poll_interval)) for job in jobs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+        executor.shutdown(wait=False)
+
+
+def run_searches(jobs, max_concurrency=8, poll_interval=POLL_INTERVAL, client=None, verbose=True):
+    """
+    Blocking wrapper around iter_searches()
+
+    Args:
+        jobs (list): SearchJob instances
+        max_concurrency (int): Maximum jobs in flight at once
+        poll_interval (float): Seconds between status checks of a job
+        client (bigquery.Client): Client to use, created if not provided
+        verbose (bool): Print each job as it completes and a timing summary
+
+    Returns:
+        list: JobResult instances in completion order
+    """
+    async def collect():
+        results = []
+        async for result in iter_searches(jobs, max_concurrency, poll_interval, client):
+            results.append(result)
+            if verbose:
+                status = f"{len(result.df)} rows" if result.ok else f"failed: {result.error}"
+                print(f"[{len(results)}/{len(jobs)}] {result.name}: {status} "
+                      f"(queued {result.queued_seconds:.1f}s, ran {result.run_seconds:.1f}s)")
+        return results
+
+    started_at = time.perf_counter()
+    results = asyncio.run(collect())
+    if verbose and results:
+        wall_clock = time.perf_counter() - started_at
+        sequential = sum(result.run_seconds for result in results)
+        slowest = max(result.run_seconds for result in results)
+        print(f"\nWall clock {wall_clock:.1f}s for {len(results)} jobs "
+              f"(slowest job {slowest:.1f}s, sum of job times {sequential:.1f}s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run one transcript search per term concurrently")
+    parser.add_argument("terms_file", help="Text file with one search term per line")
+    parser.add_argument("--days-back", type=int, default=30, help="How many days back to search (default 30)")
+    parser.add_argument("--limit", type=int, default=100, help="Maximum results per search (default 100)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum searches in flight (default 8)")
+    args = parser.parse_args()
+
+    jobs = [search_job(term, [term], args.days_back, args.limit) for term in load_terms(args.terms_file)]
+    run_searches(jobs, max_concurrency=args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Batch multi-term transcript search
+
+Runs a whole watchlist (hundreds or thousands of terms, one per line in a text
+file) in a single warehouse pass. The terms are bound as one array query
+parameter, and results come back either per transcript (which terms matched)
+or per term (COUNTIF-style aggregates).
+
+Usage:
+    python batch_search.py competitors.txt --days-back 30 --counts
+    python batch_search.py competitors.txt --days-back 30 --output matches.csv
+"""
+import argparse
+
+import pandas as pd
+
+from keyword_scanner import KeywordScanner
+from query_planner import apply_budget, plan_query
+from transcript_mirror import MIRROR_DIR, iter_mirror_batches, mirror_covers
+
+BATCH_MATCH_QUERY = """
+WITH transcripts AS (
+    SELECT
+        t.created_at,
+        t.call_uuid,
+        t.duration_seconds,
+        c.opportunity_id,
+        c.account_name,
+        c.owner_name,
+        LOWER(t.transcript_text) AS text_lower
+    FROM `shopify-dw.raw_salesloft.transcriptions` t
+    LEFT JOIN `shopify-dw.raw_salesloft.conversations` c
+    ON t.call_uuid = c.call_uuid
+    WHERE t.created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @days_back DAY)
+),
+matched AS (
+    SELECT
+        tr.* EXCEPT (text_lower),
+        ARRAY(
+            SELECT term FROM UNNEST(@terms) AS term WITH OFFSET AS term_order
+            WHERE STRPOS(tr.text_lower, term) > 0
+            ORDER BY term_order
+        ) AS matched_terms
+    FROM transcripts tr
+)
+SELECT * FROM matched
+WHERE ARRAY_LENGTH(matched_terms) > 0
+ORDER BY created_at DESC
+LIMIT @limit
+"""
+
+BATCH_COUNT_QUERY = """
+WITH transcripts AS (
+    SELECT
+        c.account_name,
+        LOWER(t.transcript_text) AS text_lower
+    FROM `shopify-dw.raw_salesloft.transcriptions` t
+    LEFT JOIN `shopify-dw.raw_salesloft.conversations` c
+    ON t.call_uuid = c.call_uuid
+    WHERE t.created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @days_back DAY)
+)
+SELECT
+    term,
+    COUNTIF(STRPOS(tr.text_lower, term) > 0) AS transcripts,
+    COUNT(DISTINCT IF(STRPOS(tr.text_lower, term) > 0, tr.account_name, NULL)) AS accounts,
+    SUM(DIV(LENGTH(tr.text_lower) - LENGTH(REPLACE(tr.text_lower, term, '')), LENGTH(term))) AS mentions
+FROM transcripts tr
+CROSS JOIN UNNEST(@terms) AS term
+GROUP BY term
+ORDER BY transcripts DESC, term
+"""
+
+MATCH_COLUMNS = [
+    "created_at",
+    "call_uuid",
+    "duration_seconds",
+    "opportunity_id",
+    "account_name",
+    "owner_name",
+    "matched_terms",
+]
+
+COUNT_COLUMNS = ["term", "transcripts", "accounts", "mentions"]
+
+
+def load_terms(path):
+    """
+    Read a watchlist file, one term per line
+
+    Blank lines and lines starting with '#' are skipped. Terms are lowercased
+    and de-duplicated, keeping the first occurrence order.
+
+    Args:
+        path (str): Path to the watchlist file
+
+    Returns:
+        list: Terms to search for
+    """
+    with open(path) as f:
+        lines = [line.strip().lower() for line in f]
+    return list(dict.fromkeys(line for line in lines if line and not line.startswith("#")))
+
+
+def _normalize_terms(terms):
+    return list(dict.fromkeys(term.strip().lower() for term in terms if term and term.strip()))
+
+
+def _job_config(terms, days_back, limit=None):
+    from google.cloud import bigquery
+
+    parameters = [
+        bigquery.ArrayQueryParameter("terms", "STRING", terms),
+        bigquery.ScalarQueryParameter("days_back", "INT64", days_back),
+    ]
+    if limit is not None:
+        parameters.append(bigquery.ScalarQueryParameter("limit", "INT64", limit))
+    return apply_budget(bigquery.QueryJobConfig(
+        query_parameters=parameters,
+        labels={'purpose': 'salesloft_batch_search'}
+    ))
+
+
+def _run(query, job_config, days_back, client):
+    """Plan and run one batch query, None if over budget"""
+    if client is None:
+        from google.cloud import bigquery
+        client = bigquery.Client()
+    plan = plan_query(client, query, job_config=job_config, days_back=days_back)
+    print(plan.summary())
+    if not plan.within_budget:
+        return None
+    return client.query(query, job_config=job_config).to_dataframe()
+
+
+def mirror_batch_search(terms, days_back=30, limit=1000, mirror_dir=MIRROR_DIR):
+    """
+    Per-transcript term matches computed over the local mirror
+
+    Every transcript is scanned once with an Aho-Corasick automaton over all
+    terms, so the cost does not grow with the size of the watchlist.
+
+    Args:
+        terms (list): Terms to search for
+        days_back (int): How many days back to search
+        limit (int): Maximum number of transcripts to return
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        pandas.DataFrame: MATCH_COLUMNS, most recent first
+    """
+    terms = _normalize_terms(terms)
+    scanner = KeywordScanner(terms, word_start=False)
+    rows = []
+    for batch in iter_mirror_batches(days_back=days_back, mirror_dir=mirror_dir):
+        for row in batch.to_pylist():
+            hits = scanner.count_terms(row.pop("transcript_text"))
+            if hits:
+                row["matched_terms"] = [terms[term_id] for term_id in sorted(hits)]
+                rows.append(row)
+                if len(rows) == limit:
+                    return pd.DataFrame(rows, columns=MATCH_COLUMNS)
+    return pd.DataFrame(rows, columns=MATCH_COLUMNS)
+
+
+def mirror_term_counts(terms, days_back=30, mirror_dir=MIRROR_DIR):
+    """
+    Per-term transcript, account and mention counts over the local mirror
+
+    Args:
+        terms (list): Terms to count
+        days_back (int): How many days back to search
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        pandas.DataFrame: COUNT_COLUMNS, most frequent first
+    """
+    terms = _normalize_terms(terms)
+    scanner = KeywordScanner(terms, word_start=False)
+    transcripts = [0] * len(terms)
+    mentions = [0] * len(terms)
+    accounts = [set() for _ in terms]
+    for batch in iter_mirror_batches(days_back=days_back, columns=["account_name", "transcript_text"],
+                                     mirror_dir=mirror_dir):
+        for account_name, text in zip(batch.column("account_name").to_pylist(),
+                                      batch.column("transcript_text").to_pylist()):
+            # Non-overlapping, like the DIV/LENGTH count of the warehouse query
+            for term_id, count in scanner.count_terms(text, overlapping=False).items():
+                transcripts[term_id] += 1
+                mentions[term_id] += count
+                if account_name is not None:
+                    accounts[term_id].add(account_name)
+
+    counts = pd.DataFrame({
+        "term": terms,
+        "transcripts": transcripts,
+        "accounts": [len(names) for names in accounts],
+        "mentions": mentions,
+    })
+    return counts.sort_values(["transcripts", "term"], ascending=[False, True]).reset_index(drop=True)
+
+
+def batch_search(terms, days_back=30, limit=1000, client=None, use_mirror=True):
+    """
+    Find transcripts mentioning any watchlist term, with the terms each matched
+
+    Args:
+        terms (list): Terms to search for (case-insensitive substrings)
+        days_back (int): How many days back to search
+        limit (int): Maximum number of transcripts to return
+        client (bigquery.Client): Client to use, created if not provided
+        use_mirror (bool): Answer from the local transcript mirror when it
+            covers the requested window
+
+    Returns:
+        pandas.DataFrame: MATCH_COLUMNS, most recent first, or None if the
+        query failed or was over budget
+    """
+    terms = _normalize_terms(terms)
+    if use_mirror and mirror_covers(days_back):
+        return mirror_batch_search(terms, days_back, limit)
+    try:
+        return _run(BATCH_MATCH_QUERY, _job_config(terms, days_back, limit), days_back, client)
+    except Exception as e:
+        print(f"Error executing batch search: {str(e)}")
+        return None
+
+
+def batch_term_counts(terms, days_back=30, client=None, use_mirror=True):
+    """
+    Count transcripts, distinct accounts and mentions for every term in one scan
+
+    Args:
+        terms (list): Terms to count (case-insensitive substrings)
+        days_back (int): How many days back to search
+        client (bigquery.Client): Client to use, created if not provided
+        use_mirror (bool): Answer from the local transcript mirror when it
+            covers the requested window
+
+    Returns:
+        pandas.DataFrame: COUNT_COLUMNS, most frequent first, or None if the
+        query failed or was over budget
+    """
+    terms = _normalize_terms(terms)
+    if use_mirror and mirror_covers(days_back):
+        return mirror_term_counts(terms, days_back)
+    try:
+        return _run(BATCH_COUNT_QUERY, _job_config(terms, days_back), days_back, client)
+    except Exception as e:
+        print(f"Error executing batch term counts: {str(e)}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search Salesloft transcripts for a watchlist of terms")
+    parser.add_argument("terms_file", help="Text file with one search term per line")
+    parser.add_argument("--days-back", type=int, default=30, help="How many days back to search (default 30)")
+    parser.add_argument("--limit", type=int, default=1000, help="Maximum transcripts to return (default 1000)")
+    parser.add_argument("--counts", action="store_true", help="Report per-term counts instead of transcripts")
+    parser.add_argument("--output", help="Write results to this CSV file instead of printing them")
+    args = parser.parse_args()
+
+    terms = load_terms(args.terms_file)
+    print(f"Searching for {len(terms)} terms over the last {args.days_back} days")
+    if args.counts:
+        results = batch_term_counts(terms, days_back=args.days_back)
+    else:
+        results = batch_search(terms, days_back=args.days_back, limit=args.limit)
+
+    if results is None or results.empty:
+        print("No results")
+    elif args.output:
+        results.to_csv(args.output, index=False)
+        print(f"Wrote {len(results)} rows to {args.output}")
+    else:
+        print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""
+Benchmark suite for search, scoring, aggregation and the dashboard filter path
+
+Each scale gets a deterministic synthetic transcript mirror (see
+synthetic_transcripts.py), cached under BENCHMARK_DIR and reused between runs.
+Every benchmark is timed `repeat` times and the best time is kept. Results are
+appended to RESULTS_FILE as JSON lines, and each run is compared with the
+previous run of the same benchmark, scale and seed, so regressions show up as
+soon as they land.
+
+Benchmarks:
+    keyword_search     streaming mirror scan for SFCC terms
+    term_counts        one-pass watchlist counts (Aho-Corasick)
+    snippets           snippet extraction around matches
+    sentiment          batch sentence sentiment scoring
+    classification     per-partition industry / pain point / sentiment
+                       classification into partial aggregates
+    aggregation        aggregate cube build from fact rows
+    dashboard_filter   the cube queries behind the dashboard's quarter and
+                       industry filters, for every quarter range
+
+Usage:
+    python benchmark.py --scales 1000 10000 100000
+    python benchmark.py --scales 1000000 --only keyword_search sentiment --repeat 1
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from aggregate_cube import AggregateCube, SENTIMENTS, UNSPECIFIED
+from batch_search import mirror_term_counts
+from metrics_pipeline import PAIN_CATEGORIES, SFCC_TERMS
+from partition_classifier import classify_partitions
+from sentiment_engine import SentimentEngine
+from sfcc_data import analysis_methodology, industries, pain_points
+from synthetic_transcripts import write_synthetic_mirror
+from transcript_mirror import iter_mirror_batches, partition_paths
+from transcript_snippets import mirror_snippets
+
+BENCHMARK_DIR = os.environ.get("SFCC_BENCHMARK_DIR", "benchmark_data")
+RESULTS_FILE = os.environ.get("SFCC_BENCHMARK_RESULTS", "benchmark_results.jsonl")
+
+DEFAULT_SCALES = [1000, 10000, 100000]
+SYNTHETIC_DAYS = 365
+
+# Read the whole mirror regardless of when it was generated
+ALL_DAYS = 36500
+
+# Snippet extraction stops after this many transcripts
+SNIPPET_LIMIT = 100000
+
+# Slower than the previous run by more than this fraction is a regression
+REGRESSION_TOLERANCE = 0.10
+
+
+class BenchmarkContext:
+    """
+    Inputs shared by the benchmarks of one scale
+
+    Args:
+        rows (int): Synthetic transcripts in the mirror
+        seed (int): Seed of the synthetic data
+        mirror_dir (str): Mirror holding the synthetic transcripts
+        workers (int): Processes for the classification benchmark
+    """
+
+    def __init__(self, rows, seed, mirror_dir, workers=1):
+        self.rows = rows
+        self.seed = seed
+        self.mirror_dir = mirror_dir
+        self.workers = workers
+        self._facts = None
+        self._cube = None
+
+    @property
+    def facts(self):
+        """Synthetic fact rows, one per transcript, built on first use"""
+        if self._facts is None:
+            rng = np.random.default_rng(self.seed)
+            end = pd.Timestamp.now(tz="UTC").normalize().tz_localize(None)
+            self._facts = pd.DataFrame({
+                "Date": end - pd.to_timedelta(rng.integers(0, SYNTHETIC_DAYS, self.rows), unit="D"),
+                "Industry": rng.choice(industries + [UNSPECIFIED], self.rows),
+                "Category": rng.choice(PAIN_CATEGORIES, self.rows),
+                "Sentiment": rng.choice(SENTIMENTS, self.rows),
+                "Mentions": 1,
+            })
+        return self._facts
+
+    @property
+    def cube(self):
+        if self._cube is None:
+            self._cube = AggregateCube.from_facts(self.facts, industries=industries, categories=list(pain_points))
+        return self._cube
+
+
+def bench_keyword_search(ctx):
+    return sum(batch.num_rows for batch in iter_mirror_batches(
+        SFCC_TERMS, days_back=ALL_DAYS, columns=["call_uuid"], mirror_dir=ctx.mirror_dir))
+
+
+def bench_term_counts(ctx):
+    terms = analysis_methodology["strength_keywords"] + analysis_methodology["pain_point_keywords"]
+    mirror_term_counts(terms, days_back=ALL_DAYS, mirror_dir=ctx.mirror_dir)
+    return ctx.rows
+
+
+def bench_snippets(ctx):
+    return len(mirror_snippets(["sfcc", "cost"], days_back=ALL_DAYS, limit=SNIPPET_LIMIT, mirror_dir=ctx.mirror_dir))
+
+
+def bench_sentiment(ctx):
+    engine = SentimentEngine()
+    for batch in iter_mirror_batches(days_back=ALL_DAYS, columns=["transcript_text"], batch_size=10000,
+                                     mirror_dir=ctx.mirror_dir):
+        engine.score_documents(batch.column("transcript_text").to_pylist())
+    return ctx.rows
+
+
+def bench_classification(ctx):
+    paths = [path for _, path in partition_paths(mirror_dir=ctx.mirror_dir)]
+    classify_partitions(paths, ctx.workers)
+    return ctx.rows
+
+
+def bench_aggregation(ctx):
+    AggregateCube.from_facts(ctx.facts, industries=industries, categories=list(pain_points))
+    return ctx.rows
+
+
+def bench_dashboard_filter(ctx):
+    cube = ctx.cube
+    quarters = sorted(ctx.facts["Date"].dt.to_period("Q").unique())
+    queries = 0
+    for i, start in enumerate(quarters):
+        for end in quarters[i:]:
+            cube.series(start, end, categories=PAIN_CATEGORIES)
+            cube.total(start, end, categories=PAIN_CATEGORIES)
+            cube.totals_by("Industry", start, end, industries=industries[:4])
+            queries += 3
+    return queries
+
+
+BENCHMARKS = {
+    "keyword_search": bench_keyword_search,
+    "term_counts": bench_term_counts,
+    "snippets": bench_snippets,
+    "sentiment": bench_sentiment,
+    "classification": bench_classification,
+    "aggregation": bench_aggregation,
+    "dashboard_filter": bench_dashboard_filter,
+}
+
+
+def synthetic_mirror(rows, seed=0, benchmark_dir=BENCHMARK_DIR):
+    """
+    Path of the synthetic mirror for a scale, generating it on first use
+
+    Args:
+        rows (int): Synthetic transcripts
+        seed (int): Seed of the synthetic data
+        benchmark_dir (str): Directory holding generated mirrors
+
+    Returns:
+        str: Mirror directory
+    """
+    mirror_dir = os.path.join(benchmark_dir, f"mirror-{rows}-seed{seed}")
+    marker = os.path.join(mirror_dir, "_synthetic.json")
+    if not os.path.exists(marker):
+        print(f"Generating {rows} synthetic transcripts in {mirror_dir}...")
+        write_synthetic_mirror(rows, mirror_dir, seed, SYNTHETIC_DAYS)
+        with open(marker, "w") as f:
+            json.dump({"rows": rows, "seed": seed, "days": SYNTHETIC_DAYS}, f)
+    return mirror_dir
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_results(results_file=RESULTS_FILE):
+    """
+    Stored benchmark results
+
+    Args:
+        results_file (str): JSON lines file
+
+    Returns:
+        list: Result records, oldest first
+    """
+    if not os.path.exists(results_file):
+        return []
+    with open(results_file) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _previous(results, record):
+    for previous in reversed(results):
+        if all(previous.get(key) == record[key] for key in ("benchmark", "rows", "seed")):
+            return previous
+    return None
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, names=None, repeat=3, seed=0, workers=1,
+                   benchmark_dir=BENCHMARK_DIR, results_file=RESULTS_FILE):
+    """
+    Run benchmarks at each scale, store and compare the results
+
+    Args:
+        scales (list): Synthetic transcript counts
+        names (list): Benchmarks to run, all of BENCHMARKS if None
+        repeat (int): Timed runs per benchmark, the best is kept
+        seed (int): Seed of the synthetic data
+        workers (int): Processes for the classification benchmark
+        benchmark_dir (str): Directory holding generated mirrors
+        results_file (str): JSON lines file results are appended to
+
+    Returns:
+        list: Records of this run, each with `change` (fraction slower than
+        the previous run, None if there is none) and `regression`
+    """
+    history = load_results(results_file)
+    run_id = datetime.now(timezone.utc).isoformat()
+    commit = _git_commit()
+    records = []
+
+    for rows in scales:
+        ctx = BenchmarkContext(rows, seed, synthetic_mirror(rows, seed, benchmark_dir), workers)
+        for name in names or BENCHMARKS:
+            timings = []
+            for _ in range(repeat):
+                started_at = time.perf_counter()
+                items = BENCHMARKS[name](ctx)
+                timings.append(time.perf_counter() - started_at)
+            seconds = min(timings)
+            record = {
+                "run_id": run_id,
+                "commit": commit,
+                "python": platform.python_version(),
+                "benchmark": name,
+                "rows": rows,
+                "seed": seed,
+                "items": items,
+                "seconds": round(seconds, 6),
+                "items_per_second": round(items / seconds, 1) if seconds else None,
+            }
+            previous = _previous(history, record)
+            change = (seconds / previous["seconds"] - 1) if previous and previous["seconds"] else None
+            records.append(dict(record, change=change,
+                                regression=change is not None and change > REGRESSION_TOLERANCE))
+            flag = ""
+            if change is not None:
+                flag = f"  {change:+.0%} vs {previous['commit'] or previous['run_id']}"
+                if change > REGRESSION_TOLERANCE:
+                    flag += "  REGRESSION"
+            print(f"{name:<18} {rows:>10} rows  {seconds:9.3f}s  {record['items_per_second'] or 0:>14,.0f}/s{flag}")
+
+            with open(results_file, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript processing on synthetic data")
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES,
+                        help="Synthetic transcript counts (default 1000 10000 100000)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="Benchmarks to run (default all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark, best kept (default 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic data (default 0)")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for the classification benchmark")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help=f"Exit with status 1 if anything is >{REGRESSION_TOLERANCE:.0%} slower than last run")
+    args = parser.parse_args()
+
+    records = run_benchmarks(args.scales, args.only, args.repeat, args.seed, args.workers)
+    regressions = [record for record in records if record["regression"]]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against the previous run")
+        if args.fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Streaming ±N-sentence context around SFCC mentions
+
+Implements the "contextual window of ±3 sentences" step of the sentiment
+methodology. Each transcript is walked once by KeywordScanner.scan(), which
+yields sentences lazily; only the last 2N + 1 sentences are kept in a ring
+buffer, so memory stays constant however long the call is. A sentence is
+emitted once its N following sentences have been read (or the transcript
+ended).
+
+Usage:
+    for window in mirror_context_windows(["sfcc"], days_back=30):
+        print(window.call_uuid, window.offset, window.sentence)
+
+    python context_window.py sfcc "commerce cloud" --days-back 30 --window 3
+"""
+import argparse
+from collections import deque, namedtuple
+
+from keyword_scanner import KeywordScanner
+from metrics_pipeline import SFCC_TERMS
+from transcript_mirror import MIRROR_DIR, iter_mirror_batches
+
+CONTEXT_SENTENCES = 3
+
+# One matching sentence with up to `window` sentences on each side; offset is
+# the character position of the sentence in the transcript
+ContextWindow = namedtuple("ContextWindow", ["sentence", "before", "after", "call_uuid", "offset"])
+
+
+def context_windows(text, call_uuid=None, scanner=None, window=CONTEXT_SENTENCES):
+    """
+    Context windows around the matching sentences of one transcript
+
+    Args:
+        text (str): Transcript text
+        call_uuid (str): Id copied into each record
+        scanner (KeywordScanner): Terms to match, SFCC_TERMS if None
+        window (int): Sentences of context on each side
+
+    Yields:
+        ContextWindow: In transcript order
+    """
+    scanner = scanner or KeywordScanner(SFCC_TERMS)
+    # (text, offset, matched) of the last 2 * window + 1 sentences; the
+    # sentence `window` positions from the right is the one being decided
+    ring = deque(maxlen=2 * window + 1)
+
+    def emit(center):
+        sentence, offset, _ = ring[center]
+        before = tuple(entry[0] for entry in list(ring)[max(0, center - window):center])
+        after = tuple(entry[0] for entry in list(ring)[center + 1:center + 1 + window])
+        return ContextWindow(sentence, before, after, call_uuid, offset)
+
+    for hits in scanner.scan(text):
+        offset = text.find(hits.text, hits.start, hits.end) if hits.text else hits.start
+        ring.append((hits.text, offset, bool(hits.hits)))
+        center = len(ring) - 1 - window
+        if center >= 0 and ring[center][2]:
+            yield emit(center)
+
+    # The last sentences have fewer than `window` sentences after them
+    for center in range(max(0, len(ring) - window), len(ring)):
+        if ring[center][2]:
+            yield emit(center)
+
+
+def mirror_context_windows(search_terms=None, days_back=30, window=CONTEXT_SENTENCES, limit=None,
+                           mirror_dir=MIRROR_DIR):
+    """
+    Context windows from the mirrored transcripts mentioning any term
+
+    Args:
+        search_terms (list): Terms to match, SFCC_TERMS if None
+        days_back (int): How many days back to search
+        window (int): Sentences of context on each side
+        limit (int): Maximum number of windows, all if None
+        mirror_dir (str): Root directory of the mirror
+
+    Yields:
+        ContextWindow: Most recent transcripts first
+    """
+    search_terms = search_terms or SFCC_TERMS
+    scanner = KeywordScanner(search_terms)
+    emitted = 0
+    for batch in iter_mirror_batches(search_terms, days_back=days_back,
+                                     columns=["call_uuid", "transcript_text"], mirror_dir=mirror_dir):
+        for call_uuid, text in zip(batch.column("call_uuid").to_pylist(),
+                                   batch.column("transcript_text").to_pylist()):
+            for record in context_windows(text, call_uuid, scanner, window):
+                yield record
+                emitted += 1
+                if emitted == limit:
+                    return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print sentences mentioning terms with surrounding context")
+    parser.add_argument("terms", nargs="*", help=f"Terms to match (default: {', '.join(SFCC_TERMS)})")
+    parser.add_argument("--days-back", type=int, default=30, help="How many days back to search (default 30)")
+    parser.add_argument("--window", type=int, default=CONTEXT_SENTENCES,
+                        help=f"Sentences of context on each side (default {CONTEXT_SENTENCES})")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum sentences to print (default 20)")
+    args = parser.parse_args()
+
+    for record in mirror_context_windows(args.terms, args.days_back, args.window, args.limit):
+        print(f"--- {record.call_uuid} @ {record.offset}")
+        for sentence in record.before:
+            print(f"    {sentence}")
+        print(f"  > {record.sentence}")
+        for sentence in record.after:
+            print(f"    {sentence}")
+
+
+if __name__ == "__main__":
+    main()
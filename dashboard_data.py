@@ -0,0 +1,266 @@
+"""
+Cached data access for the Streamlit dashboard
+
+Streamlit reruns sfcc_analysis.py from the top on every widget change. The
+loaders here are memoized with st.cache_data, keyed on the data version and the
+filter state, so a rerun only pays for filter combinations it has not seen yet.
+Entries expire after CACHE_TTL_SECONDS and each loader keeps at most
+CACHE_MAX_ENTRIES results.
+
+All loaders take `version` (see data_version()) as their first argument: when
+the underlying data changes the version changes and old entries stop matching.
+
+Facts and transcripts are served from memory-mapped Arrow files (see
+shared_store.py), so every session reads the same pages instead of holding
+its own copy. Once refresh_scheduler.py has published a snapshot, the active
+snapshot is the data version.
+"""
+import pandas as pd
+import streamlit as st
+
+import shared_store
+from aggregate_cube import UNSPECIFIED, AggregateCube
+from data_schema import FACT_SCHEMA, compact, severity_labels, severity_scores
+from metrics_pipeline import PAIN_CATEGORIES, MetricsPipeline, metrics_version
+from refresh_scheduler import SnapshotRefresher
+from sfcc_data import industries, pain_points
+
+CACHE_TTL_SECONDS = 3600
+CACHE_MAX_ENTRIES = 64
+
+# Version of the built-in sample data
+BUILTIN_DATA_VERSION = "builtin-2024"
+
+SEVERITY_MAP = {'Low': 1, 'Medium': 2, 'High': 3}
+
+
+def data_version():
+    """
+    Identifier of the data the dashboard currently shows
+
+    The active snapshot once one has been published, else the metrics derived
+    by metrics_pipeline.py once the pipeline has run, the built-in sample data
+    otherwise.
+
+    Returns:
+        str: Changes whenever the underlying data changes
+    """
+    snapshot = shared_store.active_snapshot()
+    if snapshot is not None:
+        return snapshot["snapshot"]
+    return metrics_version() or BUILTIN_DATA_VERSION
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def load_severity_data(version):
+    """Pain point definitions with an ordered categorical label and int8 severity"""
+    severity_df = pd.DataFrame.from_dict(pain_points, orient='index').reset_index()
+    severity_df.columns = ['Category', 'Description', 'Severity_Label']
+    severity_df['Severity_Label'] = severity_labels(severity_df['Severity_Label'])
+    severity_df['Severity'] = severity_scores(severity_df['Severity_Label'], SEVERITY_MAP)
+    return severity_df
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def load_time_series(version):
+    """Monthly SFCC pain point mentions"""
+    if version != BUILTIN_DATA_VERSION:
+        return load_cube(version).series(categories=PAIN_CATEGORIES)
+    dates = pd.date_range(start='2024-01-01', end='2024-12-31', freq='ME')
+    return pd.DataFrame({
+        'Date': dates,
+        'Mentions': [15, 18, 22, 25, 20, 28, 30, 27, 32, 35, 33, 38]
+    })
+
+
+def _industry_rows(cube, selected_industries=None):
+    """Industry, Count and Pain_Points per industry of the cube, in display order"""
+    members = [m for m in cube.members['Industry'] if m != UNSPECIFIED]
+    if selected_industries is not None:
+        members = [m for m in members if m in selected_industries]
+    counts = cube.totals_by('Industry', industries=members)
+    with_pain_points = cube.totals_by('Industry', industries=members, categories=PAIN_CATEGORIES)
+    return pd.DataFrame({
+        'Industry': counts.index,
+        'Count': counts.to_numpy(),
+        'Pain_Points': with_pain_points.to_numpy()
+    })
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def load_industry_data(version):
+    """Mentions and pain points per industry"""
+    if version != BUILTIN_DATA_VERSION:
+        return _industry_rows(load_cube(version))
+    return pd.DataFrame({
+        'Industry': industries,
+        'Count': [25, 18, 15, 12, 10, 8, 7, 6],
+        'Pain_Points': [15, 12, 8, 6, 5, 4, 3, 2]
+    })
+
+
+def source_facts(version):
+    """
+    Mention facts for the aggregate cube, read from their source
+
+    Pipeline facts carry one mention per SFCC transcript. The built-in sample
+    data only has monthly totals, so industry, category and sentiment are
+    UNSPECIFIED there.
+
+    Returns:
+        pandas.DataFrame: aggregate_cube.FACT_COLUMNS rows
+    """
+    if version != BUILTIN_DATA_VERSION:
+        return MetricsPipeline().load_facts()
+    facts = load_time_series(version).copy()
+    facts['Industry'] = UNSPECIFIED
+    facts['Category'] = UNSPECIFIED
+    facts['Sentiment'] = UNSPECIFIED
+    return compact(facts, FACT_SCHEMA)
+
+
+def shared_facts(version):
+    """
+    Mention facts of a version as a memory-mapped Arrow table
+
+    Only reads: snapshots are published by refresh_scheduler.py and pipeline
+    facts by metrics_pipeline.py, never from a dashboard rerun.
+
+    Returns:
+        pyarrow.Table: aggregate_cube.FACT_COLUMNS rows backed by the shared
+        store, None if this version has not been published
+    """
+    if version.startswith(shared_store.SNAPSHOT_PREFIX):
+        return shared_store.open_table(shared_store.FACTS_TABLE, shared_store.snapshot_dir(version))
+    if shared_store.table_version(shared_store.FACTS_TABLE) == version:
+        return shared_store.open_table(shared_store.FACTS_TABLE)
+    return None
+
+
+def transcripts_version():
+    """Snapshot holding the published transcripts, None if there are none"""
+    snapshot = shared_store.active_snapshot()
+    if snapshot is None or snapshot.get("transcripts") is None:
+        return None
+    return snapshot["snapshot"]
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def load_transcripts(version):
+    """
+    Published transcripts as a memory-mapped Arrow table
+
+    Cached as a resource: all sessions share one mapping of the file, and its
+    pages are only read as rows are used.
+
+    Args:
+        version (str): transcripts_version()
+    """
+    return shared_store.open_table(shared_store.TRANSCRIPTS_TABLE, shared_store.snapshot_dir(version))
+
+
+@st.cache_resource
+def background_refresher(interval, sync_days, publish_days):
+    """
+    Snapshot refresher running in the background of this server process
+
+    Cached as a resource so all sessions share one refresher thread.
+
+    Args:
+        interval (int): Seconds between full refreshes
+        sync_days (int): Days synced from the warehouse, no sync if 0
+        publish_days (int): Days of transcripts published, all if 0
+    """
+    return SnapshotRefresher(interval, sync_days=sync_days or None, publish_days=publish_days or None).start()
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def load_cube(version):
+    """
+    Monthly aggregate cube over the facts of a version
+
+    Built straight from the shared, memory-mapped facts when they are
+    published (no DataFrame copy), from source_facts() otherwise (the built-in
+    sample data, or a pruned snapshot). Cached as a resource: the cube is
+    read-only and shared by all sessions instead of being copied out of the
+    cache on every rerun.
+    """
+    table = shared_facts(version)
+    if table is not None:
+        return AggregateCube.from_table(table, freq='M', industries=industries, categories=list(pain_points))
+    return AggregateCube.from_facts(source_facts(version), freq='M',
+                                    industries=industries, categories=list(pain_points))
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def available_quarters(version):
+    """Sorted quarters present in the time series, for the quarter sliders"""
+    time_series = load_time_series(version)
+    if time_series.empty or 'Date' not in time_series.columns:
+        return []
+    return sorted(time_series['Date'].dt.to_period('Q').unique())
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def filter_time_series(version, start_quarter, end_quarter):
+    """
+    Time series rows between two quarters, inclusive
+
+    Args:
+        version (str): Data version
+        start_quarter (str): First quarter, e.g. '2024Q1'
+        end_quarter (str): Last quarter, e.g. '2024Q4'
+    """
+    return load_cube(version).series(pd.Period(start_quarter, freq='Q'), pd.Period(end_quarter, freq='Q'),
+                                     categories=PAIN_CATEGORIES)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def filter_industry_data(version, selected_industries):
+    """
+    Industry rows for the selected industries
+
+    Args:
+        version (str): Data version
+        selected_industries (tuple): Industries to keep
+    """
+    if version != BUILTIN_DATA_VERSION:
+        # Per-industry sums of the cube, no pass over the industry rows
+        return _industry_rows(load_cube(version), set(selected_industries))
+    industry_data = load_industry_data(version)
+    return industry_data[industry_data['Industry'].isin(selected_industries)].reset_index(drop=True)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def mention_metrics(version, start_quarter, end_quarter):
+    """
+    Total, monthly average and first-to-last growth of filtered mentions
+
+    Args:
+        version (str): Data version
+        start_quarter (str): First quarter, e.g. '2024Q1', or None for all data
+        end_quarter (str): Last quarter, or None for all data
+
+    Returns:
+        tuple: (total_mentions, avg_mentions, growth_percent)
+    """
+    cube = load_cube(version)
+    start = pd.Period(start_quarter, freq='Q') if start_quarter else None
+    end = pd.Period(end_quarter, freq='Q') if end_quarter else None
+    if start is None or end is None:
+        start, end = None, None
+    monthly = cube.series(start, end, categories=PAIN_CATEGORIES)['Mentions']
+    if monthly.empty:
+        # Range outside the data: report on everything
+        start, end = None, None
+        monthly = cube.series(categories=PAIN_CATEGORIES)['Mentions']
+
+    total_mentions, avg_mentions, growth = 0, 0, 0
+    if not monthly.empty:
+        # Total from two prefix-sum lookups, endpoints from the per-month series
+        total_mentions = cube.total(start, end, categories=PAIN_CATEGORIES)
+        avg_mentions = total_mentions / len(monthly)
+        if len(monthly) > 1:
+            first, last = monthly.iloc[0], monthly.iloc[-1]
+            growth = ((last / first) - 1) * 100 if first != 0 else float('inf')
+    return total_mentions, avg_mentions, growth
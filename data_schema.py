@@ -0,0 +1,188 @@
+"""
+Compact typed schemas for transcript metadata, facts and pain points
+
+Account, owner and opportunity names, industry / pain category labels and
+severities repeat across rows; held as Python object strings each row pays
+for its own string object. The schemas here give every column a compact
+type:
+
+    category   dictionary-encoded: one copy of each distinct value plus an
+               integer code per row (read straight from parquet with
+               read_dictionary, never materialized as Python strings)
+    string     Arrow-backed strings (one contiguous buffer) for free text and
+               ids that are (mostly) unique
+    numbers    the narrowest fixed-width type, nullable only where needed
+    datetimes  fixed-width datetime64
+
+memory_report() shows what each frame costs, column by column.
+
+Usage:
+    df = compact(df, TRANSCRIPT_SCHEMA)
+    print(memory_report({"transcripts": df}))
+
+    python data_schema.py --days-back 90
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+CATEGORY = "category"
+STRING = "string"
+
+# Text columns with more distinct values than this fraction of rows stay
+# strings: a dictionary of (nearly) unique values saves nothing
+MAX_CATEGORY_RATIO = 0.5
+
+TRANSCRIPT_SCHEMA = {
+    "created_at": "datetime64[us, UTC]",
+    "transcript_text": STRING,
+    "call_uuid": STRING,
+    "duration_seconds": "int32",
+    "opportunity_id": CATEGORY,
+    "account_name": CATEGORY,
+    "owner_name": CATEGORY,
+}
+
+FACT_SCHEMA = {
+    "Date": "datetime64[s]",
+    "Industry": CATEGORY,
+    "Category": CATEGORY,
+    "Sentiment": CATEGORY,
+    "Mentions": "int32",
+}
+
+# Transcript columns read from parquet as dictionaries
+DICTIONARY_COLUMNS = [column for column, dtype in TRANSCRIPT_SCHEMA.items() if dtype == CATEGORY]
+
+SEVERITY_LEVELS = ["Low", "Medium", "High"]
+SEVERITY_DTYPE = pd.CategoricalDtype(SEVERITY_LEVELS, ordered=True)
+
+# pandas >= 2 stores these as one Arrow buffer instead of one object per row
+_STRING_DTYPE = pd.StringDtype("pyarrow")
+
+
+def _compact_text(values, dtype):
+    limit = MAX_CATEGORY_RATIO * max(len(values), 1)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        distinct = len(values.cat.categories)
+    else:
+        distinct = values.nunique(dropna=True) if dtype == CATEGORY else None
+    if dtype == CATEGORY and distinct <= limit:
+        return values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype(CATEGORY)
+    return values.astype(_STRING_DTYPE)
+
+
+def _compact_number(values, dtype):
+    if values.isna().any():
+        # Nullable integers keep missing values without falling back to float
+        return values.astype(dtype.capitalize()) if dtype.startswith("int") else values.astype(dtype)
+    return values.astype(dtype)
+
+
+def compact(df, schema):
+    """
+    Convert the columns of a frame to their compact types
+
+    Columns not in the schema are left as they are.
+
+    Args:
+        df (pandas.DataFrame): Frame to convert
+        schema (dict): {column: dtype}, CATEGORY or STRING for text
+
+    Returns:
+        pandas.DataFrame: New frame with compact columns
+    """
+    columns = {}
+    for column in df.columns:
+        dtype = schema.get(column)
+        values = df[column]
+        if dtype is None:
+            columns[column] = values
+        elif dtype in (CATEGORY, STRING):
+            columns[column] = _compact_text(values, dtype)
+        elif dtype.startswith("datetime64"):
+            utc = "UTC" in dtype
+            columns[column] = pd.to_datetime(values, utc=utc).astype(dtype)
+        else:
+            columns[column] = _compact_number(values, dtype)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def severity_labels(values):
+    """
+    Severity labels as an ordered categorical (Low < Medium < High)
+
+    Args:
+        values (iterable): Severity label strings
+
+    Returns:
+        pandas.Series: SEVERITY_DTYPE values
+    """
+    return pd.Series(values, dtype=SEVERITY_DTYPE)
+
+
+def severity_scores(labels, severity_map):
+    """
+    Numeric severities of categorical labels, looked up once per category
+
+    Args:
+        labels (pandas.Series): SEVERITY_DTYPE values
+        severity_map (dict): {label: score}
+
+    Returns:
+        pandas.Series: int8 scores, 0 for missing labels
+    """
+    scores = np.array([severity_map[label] for label in labels.cat.categories] + [0], dtype=np.int8)
+    return pd.Series(scores[labels.cat.codes.to_numpy()], index=labels.index)
+
+
+def memory_report(frames, by_column=False):
+    """
+    Memory used by frames, including string and category contents
+
+    Args:
+        frames (dict): {name: pandas.DataFrame}
+        by_column (bool): One row per column instead of per frame
+
+    Returns:
+        pandas.DataFrame: Frame (and Column, Dtype), Rows, MB and Bytes/Row
+    """
+    rows = []
+    for name, df in frames.items():
+        if df is None:
+            continue
+        usage = df.memory_usage(deep=True, index=False)
+        if by_column:
+            for column, size in usage.items():
+                rows.append({"Frame": name, "Column": column, "Dtype": str(df[column].dtype),
+                             "Rows": len(df), "Bytes": int(size)})
+        else:
+            rows.append({"Frame": name, "Rows": len(df), "Bytes": int(usage.sum())})
+    report = pd.DataFrame(rows, columns=["Frame"] + (["Column", "Dtype"] if by_column else []) + ["Rows", "Bytes"])
+    report["MB"] = (report["Bytes"] / 2 ** 20).round(3)
+    report["Bytes/Row"] = (report["Bytes"] / report["Rows"].where(report["Rows"] > 0)).round(1)
+    return report.drop(columns="Bytes")
+
+
+def main():
+    from transcript_mirror import MIRROR_DIR, load_mirror
+
+    parser = argparse.ArgumentParser(description="Memory of mirrored transcripts with and without the compact schema")
+    parser.add_argument("--days-back", type=int, default=90, help="How many days of transcripts (default 90)")
+    parser.add_argument("--metadata-only", action="store_true", help="Leave out transcript_text")
+    args = parser.parse_args()
+
+    columns = [c for c in TRANSCRIPT_SCHEMA if not (args.metadata_only and c == "transcript_text")]
+    compact_df = load_mirror(args.days_back, columns, mirror_dir=MIRROR_DIR)
+    if compact_df.empty:
+        print(f"No mirrored transcripts in {MIRROR_DIR}. Run 'python transcript_mirror.py sync' first.")
+        return
+    plain = compact_df.astype({c: object for c in compact_df.columns if c != "created_at"})
+    print(memory_report({"object strings": plain, "compact": compact_df}).to_string(index=False))
+    print()
+    print(memory_report({"compact": compact_df}, by_column=True).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
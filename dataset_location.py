@@ -0,0 +1,129 @@
+"""
+Dataset location discovery with a persisted cache
+
+BigQuery jobs must run in the dataset's location. Rather than trying full
+queries in one location after another, the location is looked up once (dataset
+metadata, or concurrent dry-run probes if metadata is not readable) and cached
+on disk, so later runs go straight to a single query round-trip.
+"""
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DATASET = "shopify-dw.raw_salesloft"
+PROBE_TABLE = "transcriptions"
+
+# Locations probed when the dataset metadata cannot be read
+CANDIDATE_LOCATIONS = ['US', 'US-CENTRAL1', 'EU', 'NA']
+
+CACHE_FILE = os.environ.get(
+    "SALESLOFT_LOCATION_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "sfcc_analysis", "dataset_locations.json")
+)
+
+
+def _read_cache(cache_file=CACHE_FILE):
+    if not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def get_cached_location(dataset=DATASET, cache_file=CACHE_FILE):
+    """
+    Look up a previously discovered dataset location
+
+    Args:
+        dataset (str): Fully qualified dataset id, e.g. 'shopify-dw.raw_salesloft'
+        cache_file (str): Location cache file
+
+    Returns:
+        str: Cached location, or None
+    """
+    return _read_cache(cache_file).get(dataset)
+
+
+def cache_location(dataset, location, cache_file=CACHE_FILE):
+    """
+    Store (or with location=None, forget) the location of a dataset
+
+    Args:
+        dataset (str): Fully qualified dataset id
+        location (str): Dataset location, None to remove the entry
+        cache_file (str): Location cache file
+    """
+    cache = _read_cache(cache_file)
+    if location is None:
+        cache.pop(dataset, None)
+    else:
+        cache[dataset] = location
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    tmp_path = cache_file + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp_path, cache_file)
+
+
+def _probe(client, dataset, location):
+    """Dry-run a trivial query against the dataset in one location"""
+    from google.cloud import bigquery
+
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+    client.query(
+        f"SELECT 1 FROM `{dataset}.{PROBE_TABLE}` LIMIT 0",
+        job_config=job_config,
+        location=location
+    )
+    return location
+
+
+def discover_location(client=None, dataset=DATASET, candidates=CANDIDATE_LOCATIONS,
+                      cache_file=CACHE_FILE, refresh=False):
+    """
+    Find the location of a dataset, using the on-disk cache when possible
+
+    Tries the dataset metadata first (one cheap API call). If that is not
+    permitted, all candidate locations are probed concurrently with dry-run
+    queries, which cost nothing, and the first one to succeed wins.
+
+    Args:
+        client (bigquery.Client): Client to use, created if not provided
+        dataset (str): Fully qualified dataset id
+        candidates (list): Locations to probe if metadata is not readable
+        cache_file (str): Location cache file
+        refresh (bool): Ignore the cached value and rediscover
+
+    Returns:
+        str: Dataset location, or None if no candidate worked
+    """
+    if not refresh:
+        cached = get_cached_location(dataset, cache_file)
+        if cached:
+            return cached
+
+    if client is None:
+        from google.cloud import bigquery
+        client = bigquery.Client()
+
+    location = None
+    try:
+        location = client.get_dataset(dataset).location
+    except Exception:
+        executor = ThreadPoolExecutor(max_workers=len(candidates))
+        pending = {executor.submit(_probe, client, dataset, candidate) for candidate in candidates}
+        try:
+            while pending and location is None:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        location = future.result()
+                        break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    if location:
+        cache_location(dataset, location, cache_file)
+    return location
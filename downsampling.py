@@ -0,0 +1,164 @@
+"""
+Server-side downsampling of time series for the dashboard charts
+
+A chart sends every point it is given to the browser, so a daily or per-call
+series over several years makes the page slow to load and render. Before
+plotting, downsample_series() bounds the number of points:
+
+    1. the resolution (day, week, month, quarter) is chosen from the time
+       range shown: the finest one with at most `max_points` periods, and the
+       series gets one point per period of it
+    2. those points are picked from the original rows with
+       Largest-Triangle-Three-Buckets, which keeps the visual shape, or
+       min/max per bucket, which keeps every spike
+
+Values are never re-aggregated, so the y axis keeps its units. Series that
+already fit are returned unchanged, so the 12 monthly points of the sample
+data plot exactly as before. use_webgl() tells the chart code when to switch
+to WebGL traces.
+
+Usage:
+    plotted = downsample_series(series, start_quarter, end_quarter)
+    trace_type = go.Scattergl if use_webgl(len(plotted)) else go.Scatter
+"""
+import numpy as np
+import pandas as pd
+
+# Points a chart receives at most
+MAX_POINTS = 800
+
+# More plotted points than this render with WebGL instead of SVG
+WEBGL_THRESHOLD = 500
+
+# Traces with more points than this drop per-point markers and text labels
+LABELED_POINTS = 60
+
+# Resolutions the point budget is chosen from, finest first (period aliases)
+RESOLUTIONS = ["D", "W", "M", "Q"]
+
+
+def resolution(start, end, max_points=MAX_POINTS):
+    """
+    Finest resolution with at most `max_points` periods between two dates
+
+    Args:
+        start (Timestamp): First date shown
+        end (Timestamp): Last date shown
+        max_points (int): Periods allowed
+
+    Returns:
+        str: Period alias from RESOLUTIONS
+    """
+    for freq in RESOLUTIONS:
+        if len(pd.period_range(start, end, freq=freq)) <= max_points:
+            return freq
+    return RESOLUTIONS[-1]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets selection
+
+    Keeps the first and last point and, from each of n_out - 2 equal buckets
+    in between, the point forming the largest triangle with the previously
+    kept point and the average of the next bucket.
+
+    Args:
+        x (numpy.ndarray): Increasing x values (numeric)
+        y (numpy.ndarray): y values
+        n_out (int): Points to keep
+
+    Returns:
+        numpy.ndarray: Indices of the kept points, increasing
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Bucket i covers edges[i]:edges[i + 1] of the points between first and last
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def min_max(y, n_out):
+    """
+    Minimum and maximum of each of n_out // 2 equal buckets
+
+    Args:
+        y (numpy.ndarray): y values
+        n_out (int): Points to keep at most
+
+    Returns:
+        numpy.ndarray: Indices of the kept points, increasing
+    """
+    n = len(y)
+    if n_out >= n or n_out < 2:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(0, n, n_out // 2 + 1).astype(np.int64)
+    kept = []
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop > start:
+            kept.extend((start + np.argmin(y[start:stop]), start + np.argmax(y[start:stop])))
+    return np.unique(kept)
+
+
+def downsample_series(df, start=None, end=None, x="Date", y="Mentions", max_points=MAX_POINTS, method="lttb"):
+    """
+    At most `max_points` rows of a time series for plotting
+
+    Args:
+        df (pandas.DataFrame): Series sorted by `x`
+        start (Period or Timestamp): Start of the range shown, first row if None
+        end (Period or Timestamp): End of the range shown, last row if None
+        x (str): Datetime column
+        y (str): Value column
+        max_points (int): Points to return at most
+        method (str): "lttb" (keeps the shape) or "minmax" (keeps every
+            extreme)
+
+    Returns:
+        pandas.DataFrame: Rows of `df`, one point per period of the chosen
+        resolution on average; `df` itself if it already fits
+    """
+    if df is None or len(df) <= max_points:
+        return df
+    start = start.start_time if isinstance(start, pd.Period) else start
+    end = end.end_time if isinstance(end, pd.Period) else end
+    start = df[x].iloc[0] if start is None else start
+    end = df[x].iloc[-1] if end is None else end
+
+    points = min(max_points, len(pd.period_range(start, end, freq=resolution(start, end, max_points))))
+    if method == "minmax":
+        kept = min_max(df[y].to_numpy(), points)
+    else:
+        kept = lttb(df[x].to_numpy().astype("datetime64[ns]").astype(np.int64), df[y].to_numpy(), points)
+    return df.iloc[kept].reset_index(drop=True)
+
+
+def use_webgl(points, threshold=WEBGL_THRESHOLD):
+    """
+    Whether a trace of this many points should render with WebGL
+
+    Args:
+        points (int): Points in the trace
+
+    Returns:
+        bool
+    """
+    return points > threshold
@@ -0,0 +1,239 @@
+"""
+Single-pass multi-keyword scanner for the analysis lexicons
+
+Builds an Aho-Corasick automaton over the strength/pain-point keywords, the
+pain-point categories and the industry names, and walks each transcript once to
+produce per-sentence hit vectors. Scanning cost depends on the transcript
+length only, not on how many terms the lexicon holds.
+
+Usage:
+    scanner = KeywordScanner.from_analysis_data()
+    for sentence in scanner.scan(transcript_text):
+        print(sentence.text, scanner.group_counts(sentence.hits))
+"""
+from collections import deque, namedtuple
+
+import numpy as np
+
+from sfcc_data import analysis_methodology, industries, pain_points
+
+# Characters that end a sentence when followed by whitespace or end of text
+SENTENCE_TERMINATORS = ".!?"
+
+# One scanned sentence: position in the transcript and {term_id: count} hits
+SentenceHits = namedtuple("SentenceHits", ["index", "start", "end", "text", "hits"])
+
+# One lexicon entry: matched text, lexicon group and reporting label
+LexiconTerm = namedtuple("LexiconTerm", ["term", "group", "label"])
+
+
+def default_lexicon():
+    """
+    Build the lexicon from the analysis data in sfcc_data.py
+
+    Returns:
+        list: LexiconTerm entries for strength keywords, pain-point keywords,
+        pain-point categories and industries
+    """
+    lexicon = []
+    for keyword in analysis_methodology["strength_keywords"]:
+        lexicon.append(LexiconTerm(keyword, "strength", keyword))
+    for keyword in analysis_methodology["pain_point_keywords"]:
+        lexicon.append(LexiconTerm(keyword, "pain_point", keyword))
+    for category in pain_points:
+        lexicon.append(LexiconTerm(category, "pain_category", category))
+    industry_names = dict.fromkeys(
+        industries + list(analysis_methodology["transcript_filtering"]["sentiment_analysis"]["industry_examples"])
+    )
+    for industry in industry_names:
+        lexicon.append(LexiconTerm(industry, "industry", industry))
+    return lexicon
+
+
+class KeywordScanner:
+    """
+    Aho-Corasick automaton matching every lexicon term in one pass
+
+    Terms match case-insensitively at the start of a word. With
+    `whole_words=True` they must also end on a word boundary, otherwise
+    "cost" also counts "costs" and "complex" counts "complexity". With
+    `word_start=False` terms match anywhere, like `LIKE '%term%'`.
+
+    Args:
+        lexicon (list): LexiconTerm entries (or plain strings)
+        whole_words (bool): Require matches to end on a word boundary
+        word_start (bool): Require matches to start on a word boundary
+    """
+
+    def __init__(self, lexicon, whole_words=False, word_start=True):
+        self.terms = [
+            entry if isinstance(entry, LexiconTerm) else LexiconTerm(entry, "term", entry)
+            for entry in lexicon
+        ]
+        self.whole_words = whole_words
+        self.word_start = word_start
+        self._build([entry.term.lower() for entry in self.terms])
+
+    @classmethod
+    def from_analysis_data(cls, whole_words=False):
+        """Scanner over default_lexicon()"""
+        return cls(default_lexicon(), whole_words=whole_words)
+
+    def _build(self, patterns):
+        # Trie: one transition dict per state, outputs are (term_id, length)
+        self._goto = [{}]
+        self._output = [[]]
+        for term_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((term_id, len(pattern)))
+
+        # Failure links by BFS; outputs of the fallback state are inherited so
+        # every match is reported without walking the failure chain at scan time
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def _is_match(self, lowered, end, term_length):
+        """Apply the word boundary rules to a match ending at `end`"""
+        start = end - term_length + 1
+        if self.word_start and start > 0 and lowered[start - 1].isalnum():
+            return False
+        if self.whole_words and end + 1 < len(lowered) and lowered[end + 1].isalnum():
+            return False
+        return True
+
+    def count_terms(self, text, overlapping=True):
+        """
+        Count lexicon hits over a whole text without sentence splitting
+
+        Args:
+            text (str): Text to scan
+            overlapping (bool): Count every match; with False a match that
+                starts inside the previous match of the same term is
+                skipped, like str.count() or REPLACE-based counts in SQL
+
+        Returns:
+            dict: {term_id: count} for terms found in the text
+        """
+        if not text:
+            return {}
+        lowered = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        hits = {}
+        # First position a new match may start at, per term
+        next_start = {}
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term_id, term_length in output[state]:
+                if not self._is_match(lowered, position, term_length):
+                    continue
+                if not overlapping:
+                    if position - term_length + 1 < next_start.get(term_id, 0):
+                        continue
+                    next_start[term_id] = position + 1
+                hits[term_id] = hits.get(term_id, 0) + 1
+        return hits
+
+    def scan(self, text):
+        """
+        Scan a transcript once, yielding the lexicon hits of each sentence
+
+        Args:
+            text (str): Transcript text
+
+        Yields:
+            SentenceHits: Sentence index, character span, text and a sparse
+            {term_id: count} hit vector (sentences without hits included)
+        """
+        if not text:
+            return
+        lowered = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(lowered)
+
+        state = 0
+        sentence_index = 0
+        sentence_start = 0
+        hits = {}
+        for position, char in enumerate(lowered):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for term_id, term_length in output[state]:
+                if self._is_match(lowered, position, term_length):
+                    hits[term_id] = hits.get(term_id, 0) + 1
+
+            if char in SENTENCE_TERMINATORS and (position + 1 == length or lowered[position + 1].isspace()):
+                yield SentenceHits(sentence_index, sentence_start, position + 1,
+                                   text[sentence_start:position + 1].strip(), hits)
+                sentence_index += 1
+                sentence_start = position + 1
+                hits = {}
+
+        if text[sentence_start:].strip():
+            yield SentenceHits(sentence_index, sentence_start, length, text[sentence_start:].strip(), hits)
+
+    def to_dense(self, hits):
+        """
+        Expand a sparse hit vector to a dense per-term count array
+
+        Args:
+            hits (dict): {term_id: count} from SentenceHits.hits
+
+        Returns:
+            numpy.ndarray: int32 counts aligned with self.terms
+        """
+        vector = np.zeros(len(self.terms), dtype=np.int32)
+        for term_id, count in hits.items():
+            vector[term_id] = count
+        return vector
+
+    def group_counts(self, hits):
+        """
+        Sum a hit vector per lexicon group
+
+        Args:
+            hits (dict): {term_id: count} from SentenceHits.hits
+
+        Returns:
+            dict: {group: count}, e.g. {"strength": 1, "pain_point": 2}
+        """
+        counts = {}
+        for term_id, count in hits.items():
+            group = self.terms[term_id].group
+            counts[group] = counts.get(group, 0) + count
+        return counts
+
+    def labels(self, hits, group):
+        """
+        Labels of a given group present in a hit vector
+
+        Args:
+            hits (dict): {term_id: count} from SentenceHits.hits
+            group (str): Lexicon group, e.g. "industry" or "pain_category"
+
+        Returns:
+            set: Matched labels
+        """
+        return {self.terms[term_id].label for term_id in hits if self.terms[term_id].group == group}
@@ -0,0 +1,346 @@
+"""
+Incremental transcript-to-metrics pipeline for the dashboard
+
+Derives the dashboard's monthly mentions and per-industry counts from the
+mirrored transcripts instead of hardcoded numbers. Each SFCC transcript becomes
+one fact row (aggregate_cube.FACT_COLUMNS) tagged with its primary industry,
+primary pain-point category and sentiment:
+
+    salesloft_metrics/
+        _state.json                  mirror partition mtimes already processed
+        day=2024-06-01/facts.parquet day facts
+        facts.parquet                monthly facts
+
+After each update the monthly facts are also published to the shared store
+(shared_store.py), which is what dashboard sessions read.
+
+An update only rescans mirror days whose partition file changed since the last
+run, then re-aggregates only the months those days fall in. After a daily
+mirror sync that is usually one or two days and a single month.
+
+Usage:
+    python transcript_mirror.py sync
+    python metrics_pipeline.py update --workers 8
+    python metrics_pipeline.py status
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from aggregate_cube import FACT_COLUMNS, UNSPECIFIED
+from data_schema import FACT_SCHEMA, compact
+from keyword_scanner import KeywordScanner, LexiconTerm, default_lexicon
+from sentiment_engine import SentimentEngine, label_scores
+from sfcc_data import pain_points
+from shared_store import FACTS_TABLE, STORE_DIR, table_version, write_table
+from transcript_mirror import MIRROR_DIR, partition_paths
+
+METRICS_DIR = os.environ.get("SALESLOFT_METRICS_DIR", "salesloft_metrics")
+STATE_FILE = "_state.json"
+DAY_FACTS_FILE = "facts.parquet"
+MONTHLY_FACTS_FILE = "facts.parquet"
+
+# A transcript counts towards the metrics when it mentions one of these
+SFCC_TERMS = ["sfcc", "salesforce commerce cloud", "commerce cloud"]
+
+# Category of SFCC transcripts without any pain-point keyword. Transcripts with
+# pain-point keywords but no category name get UNSPECIFIED.
+NO_PAIN_POINT = "No Pain Point"
+
+# Categories that count as a pain-point mention
+PAIN_CATEGORIES = list(pain_points) + [UNSPECIFIED]
+
+
+def metrics_scanner():
+    """Scanner over the analysis lexicon plus SFCC_TERMS (group "product")"""
+    return KeywordScanner(default_lexicon() + [LexiconTerm(term, "product", "SFCC") for term in SFCC_TERMS])
+
+
+def _primary_label(scanner, hits, group):
+    """Label of `group` with the most hits, earliest lexicon entry on ties"""
+    counts = {}
+    for term_id in sorted(hits):
+        term = scanner.terms[term_id]
+        if term.group == group:
+            counts[term.label] = counts.get(term.label, 0) + hits[term_id]
+    if not counts:
+        return None
+    return max(counts, key=counts.get)
+
+
+def classify_transcripts(df, scanner=None, engine=None):
+    """
+    Classify the SFCC transcripts in a frame
+
+    Args:
+        df (pandas.DataFrame): Rows with created_at, transcript_text and
+            optionally account_name
+        scanner (KeywordScanner): Scanner from metrics_scanner(), built if None
+        engine (SentimentEngine): Sentiment scorer, built if None
+
+    Returns:
+        pandas.DataFrame: One row per SFCC transcript with FACT_COLUMNS (Date
+        being the created_at day), Score (mean sentence compound score) and
+        account_name
+    """
+    scanner = scanner or metrics_scanner()
+    engine = engine or SentimentEngine()
+    rows = []
+    texts = []
+    days = pd.to_datetime(df["created_at"], utc=True).dt.tz_localize(None).dt.normalize()
+    accounts = df["account_name"] if "account_name" in df.columns else [None] * len(df)
+    for day, text, account_name in zip(days, df["transcript_text"], accounts):
+        hits = scanner.count_terms(text)
+        groups = scanner.group_counts(hits)
+        if not groups.get("product"):
+            continue
+        category = _primary_label(scanner, hits, "pain_category")
+        if category is None:
+            category = UNSPECIFIED if groups.get("pain_point") else NO_PAIN_POINT
+        industry = _primary_label(scanner, hits, "industry") or UNSPECIFIED
+        rows.append((day, industry, category, UNSPECIFIED, 1, 0.0, account_name))
+        texts.append(text)
+    classified = pd.DataFrame(rows, columns=FACT_COLUMNS + ["Score", "account_name"])
+    if texts:
+        # All transcripts of the frame are scored in one batch
+        classified["Score"] = engine.score_documents(texts)
+        classified["Sentiment"] = label_scores(classified["Score"].to_numpy())
+    return classified
+
+
+def transcript_facts(df, scanner=None, engine=None):
+    """
+    Fact rows for the SFCC transcripts in a frame, one mention per transcript
+
+    Sentiment is the label of the transcript's mean sentence compound score.
+
+    Args:
+        df (pandas.DataFrame): Rows with created_at and transcript_text
+        scanner (KeywordScanner): Scanner from metrics_scanner(), built if None
+        engine (SentimentEngine): Sentiment scorer, built if None
+
+    Returns:
+        pandas.DataFrame: FACT_COLUMNS rows, Date being the created_at day
+    """
+    return classify_transcripts(df, scanner, engine)[FACT_COLUMNS]
+
+
+def _rollup(facts, freq):
+    """Sum facts per period (Date at period end) and dimension members"""
+    if facts.empty:
+        return pd.DataFrame(columns=FACT_COLUMNS)
+    facts = facts.assign(Date=facts["Date"].dt.to_period(freq).dt.to_timestamp(how="end").dt.normalize())
+    return facts.groupby(FACT_COLUMNS[:-1], as_index=False, sort=True)["Mentions"].sum()
+
+
+def _write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+class MetricsPipeline:
+    """
+    Fact store kept in step with the transcript mirror
+
+    Args:
+        metrics_dir (str): Directory holding the state, day and monthly facts
+        mirror_dir (str): Root directory of the transcript mirror
+        store_dir (str): Shared store the monthly facts are published to
+    """
+
+    def __init__(self, metrics_dir=METRICS_DIR, mirror_dir=MIRROR_DIR, store_dir=STORE_DIR):
+        self.metrics_dir = metrics_dir
+        self.mirror_dir = mirror_dir
+        self.store_dir = store_dir
+        self.state = self._read_state()
+
+    # --- Persistence ---
+
+    def _read_state(self):
+        path = os.path.join(self.metrics_dir, STATE_FILE)
+        if not os.path.exists(path):
+            return {"partitions": {}, "updated_at": None}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_state(self):
+        path = os.path.join(self.metrics_dir, STATE_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _day_path(self, day):
+        return os.path.join(self.metrics_dir, f"day={day}", DAY_FACTS_FILE)
+
+    @property
+    def monthly_path(self):
+        return os.path.join(self.metrics_dir, MONTHLY_FACTS_FILE)
+
+    # --- Updating ---
+
+    def changed_days(self):
+        """
+        Mirror days added, rewritten or removed since the last update
+
+        Returns:
+            dict: {day (str): partition path, or None for removed days}
+        """
+        processed = self.state["partitions"]
+        current = {day.isoformat(): path for day, path in partition_paths(mirror_dir=self.mirror_dir)}
+        changed = {
+            day: path for day, path in current.items()
+            if processed.get(day) != os.path.getmtime(path)
+        }
+        changed.update({day: None for day in processed if day not in current})
+        return changed
+
+    def update(self, full=False, workers=1):
+        """
+        Recompute facts for changed mirror days and the months they belong to
+
+        Args:
+            full (bool): Reprocess every mirrored day
+            workers (int): Processes classifying changed days in parallel,
+                all cores if None
+
+        Returns:
+            list: Months (YYYY-MM) that were recomputed
+        """
+        # Imported here because partition_classifier builds on this module
+        from partition_classifier import iter_classified
+
+        if full:
+            self.state["partitions"] = {}
+        changed = self.changed_days()
+        if not changed and os.path.exists(self.monthly_path):
+            self.publish_facts()
+            return []
+
+        processed = self.state["partitions"]
+        for day, path in changed.items():
+            if path is None:
+                shutil.rmtree(os.path.dirname(self._day_path(day)), ignore_errors=True)
+                processed.pop(day, None)
+
+        # Record mtimes before reading, so a rewrite during the run is picked up next time
+        days = {path: (day, os.path.getmtime(path)) for day, path in changed.items() if path is not None}
+        for path, partial in iter_classified(list(days), workers):
+            day, mtime = days[path]
+            _write_parquet(partial.facts(), self._day_path(day))
+            processed[day] = mtime
+
+        months = sorted({day[:7] for day in changed})
+        self._refresh_months(months, full or not os.path.exists(self.monthly_path))
+        self.state["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self._write_state()
+        self.publish_facts()
+        return months
+
+    def publish_facts(self):
+        """
+        Publish the monthly facts to the shared store, tagged with metrics_version()
+
+        Returns:
+            bool: True if written, False if the store already holds this
+            version or the pipeline has not run
+        """
+        version = metrics_version(self.metrics_dir)
+        if version is None or table_version(FACTS_TABLE, self.store_dir) == version:
+            return False
+        write_table(FACTS_TABLE, self.load_facts(), version, self.store_dir)
+        return True
+
+    def _refresh_months(self, months, rebuild):
+        """Replace the monthly rows of `months` with sums of their day facts"""
+        if rebuild:
+            months = sorted({day[:7] for day in self.state["partitions"]})
+            kept = pd.DataFrame(columns=FACT_COLUMNS)
+        else:
+            kept = self.load_facts()
+            if not kept.empty:
+                kept = kept[~kept["Date"].dt.strftime("%Y-%m").isin(months)]
+
+        day_frames = [
+            pd.read_parquet(self._day_path(day))
+            for day in self.state["partitions"]
+            if day[:7] in months and os.path.exists(self._day_path(day))
+        ]
+        day_frames = [frame for frame in day_frames if not frame.empty]
+        recomputed = _rollup(pd.concat(day_frames, ignore_index=True), "M") if day_frames else kept.iloc[:0]
+        frames = [frame for frame in (kept, recomputed) if not frame.empty]
+        monthly = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FACT_COLUMNS)
+        monthly["Mentions"] = monthly["Mentions"].astype("int64")
+        _write_parquet(monthly.sort_values(FACT_COLUMNS[:-1]).reset_index(drop=True), self.monthly_path)
+
+    # --- Reading ---
+
+    def load_facts(self):
+        """
+        Monthly facts for the dashboard
+
+        Returns:
+            pandas.DataFrame: FACT_COLUMNS rows, Date at month end; empty if
+            the pipeline has not run
+        """
+        if not os.path.exists(self.monthly_path):
+            return pd.DataFrame(columns=FACT_COLUMNS)
+        return compact(pd.read_parquet(self.monthly_path), FACT_SCHEMA)
+
+
+def metrics_version(metrics_dir=METRICS_DIR):
+    """
+    Identifier of the last pipeline update
+
+    Args:
+        metrics_dir (str): Directory of the fact store
+
+    Returns:
+        str: Changes on every update, None if the pipeline has not run
+    """
+    path = os.path.join(metrics_dir, STATE_FILE)
+    if not os.path.exists(path) or not os.path.exists(os.path.join(metrics_dir, MONTHLY_FACTS_FILE)):
+        return None
+    with open(path) as f:
+        updated_at = json.load(f).get("updated_at")
+    return f"metrics-{updated_at}" if updated_at else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard metrics derived from mirrored transcripts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update", help="Recompute metrics for mirror days changed since the last run")
+    update_parser.add_argument("--full", action="store_true", help="Reprocess every mirrored day")
+    update_parser.add_argument("--workers", type=int, default=1,
+                               help="Processes classifying changed days in parallel (default 1)")
+    subparsers.add_parser("status", help="Show what the fact store holds")
+    args = parser.parse_args()
+
+    pipeline = MetricsPipeline()
+    if args.command == "update":
+        months = pipeline.update(full=args.full, workers=args.workers)
+        if months:
+            print(f"Recomputed {len(months)} months: {', '.join(months)}")
+        else:
+            print("Metrics are up to date")
+    else:
+        facts = pipeline.load_facts()
+        if facts.empty:
+            print(f"No metrics found in {METRICS_DIR}. Run 'python metrics_pipeline.py update' first.")
+            return
+        print(f"Last update:  {pipeline.state['updated_at']}")
+        print(f"Mirror days:  {len(pipeline.state['partitions'])}")
+        print(f"Months:       {facts['Date'].min():%Y-%m} to {facts['Date'].max():%Y-%m}")
+        print(f"Mentions:     {facts['Mentions'].sum()}")
+
+
+if __name__ == "__main__":
+    main()
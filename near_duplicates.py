@@ -0,0 +1,272 @@
+"""
+MinHash / LSH near-duplicate detection for transcript sentences
+
+Reps repeat the same pitch on many calls and transcripts share boilerplate, so
+counting matching sentences overstates how often something was said.
+NearDuplicateDetector groups sentences whose word 3-gram shingle sets have a
+Jaccard similarity of at least `threshold`, without comparing all pairs:
+
+    1. exact duplicates (after lowercasing and tokenizing) are folded first
+    2. each distinct sentence gets a MinHash signature of `num_perm` values
+    3. signatures are cut into bands; sentences sharing a band bucket are
+       candidates, and each is checked against the bucket's first member by
+       signature agreement
+    4. verified pairs are joined into clusters (connected components)
+
+Every step is linear in the number of sentences (times bands).
+
+Usage:
+    detector = NearDuplicateDetector(threshold=0.8)
+    cluster = detector.clusters(sentences)          # representative index per sentence
+    kept = np.unique(cluster)                       # one sentence per cluster
+
+    python near_duplicates.py sfcc --days-back 30
+"""
+import argparse
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from keyword_scanner import KeywordScanner
+from metrics_pipeline import SFCC_TERMS
+from transcript_index import tokenize
+from transcript_mirror import MIRROR_DIR, iter_mirror_batches
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+THRESHOLD = 0.8
+
+# Universal hashing (a * x + b) mod a Mersenne prime; products stay below 2^63
+_PRIME = np.uint64((1 << 31) - 1)
+_SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Sentences per signature batch, bounds the temporary arrays
+SIGNATURE_BATCH = 100000
+
+
+def lsh_bands(num_perm=NUM_PERM, threshold=THRESHOLD):
+    """
+    Band count and rows per band for a similarity threshold
+
+    Picks the most selective banding whose candidate threshold
+    (1 / bands) ** (1 / rows) is at least 0.1 below `threshold`, so pairs at
+    the threshold are very likely to become candidates; verification then
+    drops the dissimilar ones.
+
+    Args:
+        num_perm (int): Signature length
+        threshold (float): Jaccard similarity to detect
+
+    Returns:
+        tuple: (bands, rows)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1.0 / bands) ** (1.0 / rows) <= threshold - 0.1:
+            best = (bands, rows)
+    return best
+
+
+class NearDuplicateDetector:
+    """
+    Cluster sentences by estimated Jaccard similarity of their shingles
+
+    Args:
+        threshold (float): Minimum similarity of near-duplicates
+        num_perm (int): MinHash signature length
+        shingle_size (int): Words per shingle
+        seed (int): Seed of the hash permutations
+    """
+
+    def __init__(self, threshold=THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+
+    def _shingles(self, token_lists):
+        """Shingle hashes of all sentences, flattened, with CSR row pointers"""
+        token_hashes = {}
+        hashes, counts = [], []
+        k = self.shingle_size
+        for tokens in token_lists:
+            ids = []
+            for token in tokens:
+                cached = token_hashes.get(token)
+                if cached is None:
+                    cached = token_hashes[token] = zlib.crc32(token.encode())
+                ids.append(cached)
+            hashes.append(ids)
+            # Sentences shorter than a shingle are one shingle of all their words
+            counts.append(max(len(ids) - k + 1, 1) if ids else 0)
+
+        indptr = np.zeros(len(token_lists) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        flat = np.fromiter((h for ids in hashes for h in ids), dtype=np.uint64)
+        lengths = np.array([len(ids) for ids in hashes], dtype=np.int64)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+
+        shingles = np.zeros(int(indptr[-1]), dtype=np.uint64)
+        if len(shingles):
+            # Shingle j of a sentence combines tokens j .. j + k - 1 (fewer if short)
+            row = np.repeat(np.arange(len(token_lists)), counts)
+            position = np.arange(len(shingles)) - indptr[row]
+            first = starts[row] + position
+            width = np.minimum(lengths[row], k)
+            shingles = flat[first].copy()
+            for offset in range(1, k):
+                use = offset < width
+                shingles[use] = shingles[use] * _SHINGLE_MULTIPLIER + flat[first[use] + offset]
+        return shingles % _PRIME, indptr
+
+    def signatures(self, sentences):
+        """
+        MinHash signatures
+
+        Args:
+            sentences (list): Sentence strings
+
+        Returns:
+            numpy.ndarray: uint64 array (sentences, num_perm); rows of empty
+            sentences are all _PRIME
+        """
+        signatures = np.full((len(sentences), self.num_perm), _PRIME, dtype=np.uint64)
+        for batch_start in range(0, len(sentences), SIGNATURE_BATCH):
+            batch = sentences[batch_start:batch_start + SIGNATURE_BATCH]
+            shingles, indptr = self._shingles([tokenize(sentence) if sentence else [] for sentence in batch])
+            non_empty = np.flatnonzero(np.diff(indptr) > 0)
+            if not len(non_empty):
+                continue
+            for perm in range(self.num_perm):
+                permuted = (self._a[perm] * shingles + self._b[perm]) % _PRIME
+                signatures[batch_start + non_empty, perm] = np.minimum.reduceat(permuted, indptr[non_empty])
+        return signatures
+
+    def _candidate_edges(self, signatures):
+        """Verified (sentence, bucket representative) pairs over all bands"""
+        sources, targets = [], []
+        for band in range(self.bands):
+            columns = signatures[:, band * self.rows:(band + 1) * self.rows]
+            band_keys = np.zeros(len(signatures), dtype=np.uint64)
+            for column in range(self.rows):
+                band_keys = band_keys * _SHINGLE_MULTIPLIER + columns[:, column]
+            _, first_index, bucket = np.unique(band_keys, return_index=True, return_inverse=True)
+            representative = first_index[bucket]
+            candidate = np.flatnonzero(representative != np.arange(len(signatures)))
+            if not len(candidate):
+                continue
+            agreement = (signatures[candidate] == signatures[representative[candidate]]).mean(axis=1)
+            verified = candidate[agreement >= self.threshold]
+            sources.append(verified)
+            targets.append(representative[verified])
+        if not sources:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.concatenate(sources), np.concatenate(targets)
+
+    def clusters(self, sentences):
+        """
+        Near-duplicate cluster of every sentence
+
+        Args:
+            sentences (list): Sentence strings
+
+        Returns:
+            numpy.ndarray: For each sentence, the index of the first sentence
+            of its cluster (its own index if it has no near-duplicate)
+        """
+        if not len(sentences):
+            return np.zeros(0, dtype=np.int64)
+        # Exact duplicates after normalization share one signature
+        normalized = [" ".join(tokenize(sentence)) if sentence else "" for sentence in sentences]
+        codes, distinct = pd.factorize(pd.Series(normalized))
+        first_occurrence = np.full(len(distinct), len(sentences), dtype=np.int64)
+        np.minimum.at(first_occurrence, codes, np.arange(len(sentences)))
+
+        signatures = self.signatures(list(distinct))
+        empty = (signatures == _PRIME).all(axis=1)
+        sources, targets = self._candidate_edges(signatures[~empty])
+        kept = np.flatnonzero(~empty)
+
+        # Connected components by min-label propagation with pointer jumping;
+        # labels are first-occurrence indices so each cluster keeps its first sentence
+        labels = first_occurrence.copy()
+        position = np.empty(len(sentences), dtype=np.int64)
+        position[first_occurrence] = np.arange(len(distinct))
+        sources, targets = kept[sources], kept[targets]
+        while True:
+            updated = labels.copy()
+            np.minimum.at(updated, sources, labels[targets])
+            np.minimum.at(updated, targets, labels[sources])
+            updated = updated[position[updated]]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        return labels[codes]
+
+
+def dedupe_counts(sentences, threshold=THRESHOLD):
+    """
+    Collapse near-duplicate sentences
+
+    Args:
+        sentences (list): Sentence strings
+        threshold (float): Minimum similarity of near-duplicates
+
+    Returns:
+        pandas.DataFrame: sentence (first of each cluster) and copies, the
+        number of sentences the cluster collapsed, most repeated first
+    """
+    clusters = NearDuplicateDetector(threshold).clusters(sentences)
+    representatives, copies = np.unique(clusters, return_counts=True)
+    deduped = pd.DataFrame({
+        "sentence": [sentences[i] for i in representatives],
+        "copies": copies,
+    })
+    return deduped.sort_values("copies", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def mirror_sentences(search_terms=None, days_back=30, mirror_dir=MIRROR_DIR):
+    """
+    Sentences of mirrored transcripts that mention any term
+
+    Args:
+        search_terms (list): Terms to match, SFCC_TERMS if None
+        days_back (int): How many days back to search
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        list: Matching sentence strings
+    """
+    search_terms = search_terms or SFCC_TERMS
+    scanner = KeywordScanner(search_terms)
+    sentences = []
+    for batch in iter_mirror_batches(search_terms, days_back=days_back, columns=["transcript_text"],
+                                     mirror_dir=mirror_dir):
+        for text in batch.column("transcript_text").to_pylist():
+            sentences.extend(sentence.text for sentence in scanner.scan(text) if sentence.hits)
+    return sentences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count relevant transcript sentences with near-duplicates collapsed")
+    parser.add_argument("terms", nargs="*", help=f"Terms to match (default: {', '.join(SFCC_TERMS)})")
+    parser.add_argument("--days-back", type=int, default=30, help="How many days back to search (default 30)")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help=f"Similarity above which sentences are duplicates (default {THRESHOLD})")
+    parser.add_argument("--top", type=int, default=10, help="Most repeated sentences to show (default 10)")
+    args = parser.parse_args()
+
+    sentences = mirror_sentences(args.terms, args.days_back)
+    deduped = dedupe_counts(sentences, args.threshold)
+    print(f"{len(sentences)} relevant sentences, {len(deduped)} after collapsing near-duplicates")
+    if not deduped.empty:
+        print(deduped.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
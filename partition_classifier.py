@@ -0,0 +1,288 @@
+"""
+Process-pool classification of mirror partitions into mergeable aggregates
+
+Keyword scanning and sentiment scoring are CPU-bound Python, so instead of
+running them in one process each mirror partition (one day of transcripts) is
+classified by a worker in a process pool. A worker returns a PartialAggregate
+for its partition; partial aggregates only hold sums, counts and sketches, so
+the parent merges them in any order and the result is the same as one
+process classifying everything.
+
+    counts      mentions per (day, industry, category, sentiment)
+    sentiment   sum and count of transcript compound scores per
+                (industry, category)
+    accounts    HyperLogLog sketch of distinct accounts per industry
+
+Usage:
+    aggregate = classify_partitions([path for _, path in partition_paths(90)], workers=8)
+    print(aggregate.industry_summary())
+
+    python partition_classifier.py --days-back 90 --workers 8
+"""
+import argparse
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from aggregate_cube import FACT_COLUMNS, UNSPECIFIED
+from metrics_pipeline import NO_PAIN_POINT, classify_transcripts, metrics_scanner
+from sentiment_engine import SentimentEngine
+from transcript_mirror import MIRROR_DIR, partition_paths
+
+# Industry key of the sketch counting accounts across all industries
+ALL_INDUSTRIES = "All"
+
+# HyperLogLog precision: 2^12 registers, about 1.6% standard error
+HLL_PRECISION = 12
+
+SUMMARY_COLUMNS = ["Industry", "Count", "Pain_Points", "Accounts", "Avg_Sentiment"]
+
+
+class HyperLogLog:
+    """
+    Distinct-count sketch with a fixed 2^precision bytes of state
+
+    Args:
+        precision (int): Number of index bits
+    """
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_many(self, values):
+        """
+        Add values (None is skipped)
+
+        Args:
+            values (iterable): Strings to count
+        """
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+             for value in values if value is not None),
+            dtype=np.uint64
+        )
+        if not len(hashes):
+            return
+        value_bits = 64 - self.precision
+        index = (hashes >> np.uint64(value_bits)).astype(np.int64)
+        # Below 2^53 the float conversion is exact, so frexp gives the bit length
+        remainder = (hashes & np.uint64((1 << value_bits) - 1)).astype(np.float64)
+        rank = (value_bits - np.frexp(remainder)[1] + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other):
+        """Fold another sketch of the same precision into this one"""
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        """
+        Estimated number of distinct values added
+
+        Returns:
+            int: Estimate, with linear counting for small cardinalities
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class PartialAggregate:
+    """
+    Mergeable counts, sentiment sums and account sketches
+
+    Args:
+        counts (dict): {(day, industry, category, sentiment): mentions}
+        sentiment (dict): {(industry, category): [score_sum, transcripts]}
+        accounts (dict): {industry: HyperLogLog}, including ALL_INDUSTRIES
+    """
+
+    def __init__(self, counts=None, sentiment=None, accounts=None):
+        self.counts = counts or {}
+        self.sentiment = sentiment or {}
+        self.accounts = accounts or {}
+
+    @classmethod
+    def from_classified(cls, classified):
+        """
+        Aggregate the output of metrics_pipeline.classify_transcripts()
+
+        Args:
+            classified (pandas.DataFrame): One row per classified transcript
+
+        Returns:
+            PartialAggregate
+        """
+        aggregate = cls()
+        if classified.empty:
+            return aggregate
+        counts = classified.groupby(FACT_COLUMNS[:-1], sort=False)["Mentions"].sum()
+        aggregate.counts = dict(zip(counts.index, counts.tolist()))
+        scores = classified.groupby(["Industry", "Category"], sort=False)["Score"].agg(["sum", "count"])
+        aggregate.sentiment = {key: [total, n] for key, total, n in zip(scores.index, scores["sum"], scores["count"])}
+        for industry, accounts in classified.groupby("Industry", sort=False)["account_name"]:
+            aggregate.accounts.setdefault(industry, HyperLogLog()).add_many(accounts.dropna())
+        aggregate.accounts.setdefault(ALL_INDUSTRIES, HyperLogLog()).add_many(classified["account_name"].dropna())
+        return aggregate
+
+    def merge(self, other):
+        """
+        Fold another partial aggregate into this one
+
+        Args:
+            other (PartialAggregate): Aggregate of a different partition
+
+        Returns:
+            PartialAggregate: self
+        """
+        for key, mentions in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + mentions
+        for key, (total, n) in other.sentiment.items():
+            current = self.sentiment.setdefault(key, [0.0, 0])
+            current[0] += total
+            current[1] += n
+        for industry, sketch in other.accounts.items():
+            if industry in self.accounts:
+                self.accounts[industry].merge(sketch)
+            else:
+                self.accounts[industry] = sketch
+        return self
+
+    def facts(self):
+        """
+        Fact rows for the dashboard
+
+        Returns:
+            pandas.DataFrame: FACT_COLUMNS rows per day
+        """
+        if not self.counts:
+            return pd.DataFrame(columns=FACT_COLUMNS)
+        facts = pd.DataFrame([key + (mentions,) for key, mentions in self.counts.items()], columns=FACT_COLUMNS)
+        return facts.sort_values(FACT_COLUMNS[:-1]).reset_index(drop=True)
+
+    def industry_summary(self):
+        """
+        Per-industry transcripts, pain points, distinct accounts and sentiment
+
+        Returns:
+            pandas.DataFrame: SUMMARY_COLUMNS, busiest industry first
+        """
+        facts = self.facts()
+        if facts.empty:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        counts = facts.groupby("Industry")["Mentions"].sum()
+        pain_points = facts[facts["Category"] != NO_PAIN_POINT].groupby("Industry")["Mentions"].sum()
+        score_sums, score_counts = {}, {}
+        for (industry, _), (total, n) in self.sentiment.items():
+            score_sums[industry] = score_sums.get(industry, 0.0) + total
+            score_counts[industry] = score_counts.get(industry, 0) + n
+        summary = pd.DataFrame({
+            "Industry": counts.index,
+            "Count": counts.to_numpy(),
+            "Pain_Points": pain_points.reindex(counts.index, fill_value=0).to_numpy(),
+            "Accounts": [self.accounts[i].estimate() if i in self.accounts else 0 for i in counts.index],
+            "Avg_Sentiment": [score_sums.get(i, 0.0) / score_counts[i] if score_counts.get(i) else 0.0
+                              for i in counts.index],
+        })
+        summary = summary.sort_values(["Count", "Industry"], ascending=[False, True]).reset_index(drop=True)
+        return summary[summary["Industry"] != UNSPECIFIED].reset_index(drop=True)
+
+
+# Scanner and sentiment engine of this process, built once per worker
+_worker = {}
+
+
+def _init_worker():
+    _worker["scanner"] = metrics_scanner()
+    _worker["engine"] = SentimentEngine()
+
+
+def classify_partition(path):
+    """
+    Classify one mirror partition file
+
+    Args:
+        path (str): Partition parquet file
+
+    Returns:
+        PartialAggregate: Aggregate of the partition's SFCC transcripts
+    """
+    if not _worker:
+        _init_worker()
+    df = pq.read_table(path, columns=["created_at", "transcript_text", "account_name"]).to_pandas()
+    return PartialAggregate.from_classified(classify_transcripts(df, _worker["scanner"], _worker["engine"]))
+
+
+def iter_classified(paths, workers=None):
+    """
+    Classify partitions in a process pool, yielding each as it finishes
+
+    Args:
+        paths (list): Partition files
+        workers (int): Worker processes, os.cpu_count() if None; 1 runs
+            in this process
+
+    Yields:
+        tuple: (path, PartialAggregate) in completion order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            yield path, classify_partition(path)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths)), initializer=_init_worker) as executor:
+        futures = {executor.submit(classify_partition, path): path for path in paths}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def classify_partitions(paths, workers=None):
+    """
+    Classify partitions in a process pool and merge the results
+
+    Args:
+        paths (list): Partition files
+        workers (int): Worker processes, os.cpu_count() if None
+
+    Returns:
+        PartialAggregate: Merged aggregate of all partitions
+    """
+    merged = PartialAggregate()
+    for _, partial in iter_classified(paths, workers):
+        merged.merge(partial)
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify mirrored transcripts by industry, pain point and sentiment")
+    parser.add_argument("--days-back", type=int, default=90, help="How many days of transcripts (default 90)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", help="Write the industry summary to this CSV file instead of printing it")
+    args = parser.parse_args()
+
+    paths = [path for _, path in partition_paths(args.days_back, MIRROR_DIR)]
+    if not paths:
+        print(f"No mirrored partitions in {MIRROR_DIR}. Run 'python transcript_mirror.py sync' first.")
+        return
+    aggregate = classify_partitions(paths, args.workers)
+    summary = aggregate.industry_summary()
+    total_accounts = aggregate.accounts[ALL_INDUSTRIES].estimate() if ALL_INDUSTRIES in aggregate.accounts else 0
+    print(f"Classified {len(paths)} partitions, ~{total_accounts} distinct accounts")
+    if args.output:
+        summary.to_csv(args.output, index=False)
+        print(f"Wrote {len(summary)} industries to {args.output}")
+    else:
+        print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Dry-run cost planning and bytes-scanned budget for transcript queries
+
+Every warehouse search is dry-run first. The dry run is free and reports how
+many bytes the query would scan; queries above the budget are not run. Instead
+the caller gets a suggested `days_back` that would fit, and can fall back to the
+local transcript mirror if it holds the window.
+
+The budget defaults to 50 GiB and can be changed with the
+SALESLOFT_MAX_BYTES_SCANNED environment variable (in bytes).
+"""
+import math
+import os
+from datetime import timedelta
+
+from transcript_mirror import mirror_covers
+
+MAX_BYTES_SCANNED = int(os.environ.get("SALESLOFT_MAX_BYTES_SCANNED", 50 * 1024 ** 3))
+
+# On-demand pricing, used for the cost estimate only
+PRICE_PER_TIB_USD = 6.25
+
+# Rough bytes a single slot scans per second; turns bytes into slot time
+BYTES_PER_SLOT_SECOND = 64 * 1024 ** 2
+
+
+def format_bytes(num_bytes):
+    """Human readable byte count, e.g. '12.3 GiB'"""
+    value = float(num_bytes)
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if value < 1024 or unit == "TiB":
+            return f"{value:.1f} {unit}"
+        value /= 1024
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a query would scan more bytes than the budget allows"""
+
+    def __init__(self, plan):
+        super().__init__(plan.summary())
+        self.plan = plan
+
+
+class QueryPlan:
+    """
+    Dry-run estimate for one query
+
+    Args:
+        bytes_processed (int): Bytes the query would scan
+        budget_bytes (int): Bytes-scanned budget
+        days_back (int): Search window the query covers, if known
+    """
+
+    def __init__(self, bytes_processed, budget_bytes=MAX_BYTES_SCANNED, days_back=None):
+        self.bytes_processed = bytes_processed or 0
+        self.budget_bytes = budget_bytes
+        self.days_back = days_back
+
+    @property
+    def within_budget(self):
+        return self.bytes_processed <= self.budget_bytes
+
+    @property
+    def estimated_cost_usd(self):
+        return self.bytes_processed / 1024 ** 4 * PRICE_PER_TIB_USD
+
+    @property
+    def estimated_slot_seconds(self):
+        return self.bytes_processed / BYTES_PER_SLOT_SECOND
+
+    @property
+    def suggested_days_back(self):
+        """Largest window that fits the budget, assuming bytes scale with days"""
+        if self.within_budget or not self.days_back or not self.bytes_processed:
+            return None
+        return max(1, math.floor(self.days_back * self.budget_bytes / self.bytes_processed))
+
+    @property
+    def mirror_fallback(self):
+        """True if the local mirror holds the window, however stale it is"""
+        return bool(self.days_back) and mirror_covers(self.days_back, max_staleness=timedelta.max)
+
+    def summary(self):
+        text = (
+            f"Estimated scan: {format_bytes(self.bytes_processed)} "
+            f"(~${self.estimated_cost_usd:.2f}, ~{self.estimated_slot_seconds:.0f} slot-seconds), "
+            f"budget {format_bytes(self.budget_bytes)}"
+        )
+        if not self.within_budget:
+            text += " - over budget"
+            if self.suggested_days_back:
+                text += f"; try days_back={self.suggested_days_back} or less"
+            if self.mirror_fallback:
+                text += "; the local mirror covers this window"
+        return text
+
+
+def plan_query(client, query, job_config=None, location=None, days_back=None,
+               budget_bytes=MAX_BYTES_SCANNED):
+    """
+    Dry-run a query and compare its scan size against the budget
+
+    Args:
+        client (bigquery.Client): Client to run the dry run with
+        query (str): SQL to plan
+        job_config (bigquery.QueryJobConfig): Config the real query will use
+        location (str): Dataset location
+        days_back (int): Search window, used to suggest a narrower one
+        budget_bytes (int): Bytes-scanned budget
+
+    Returns:
+        QueryPlan: Estimate for the query
+    """
+    from google.cloud import bigquery
+
+    if job_config is not None:
+        dry_config = bigquery.QueryJobConfig.from_api_repr(job_config.to_api_repr())
+    else:
+        dry_config = bigquery.QueryJobConfig()
+    dry_config.dry_run = True
+    dry_config.use_query_cache = False
+
+    job = client.query(query, job_config=dry_config, location=location)
+    return QueryPlan(job.total_bytes_processed, budget_bytes=budget_bytes, days_back=days_back)
+
+
+def apply_budget(job_config, budget_bytes=MAX_BYTES_SCANNED):
+    """
+    Cap the bytes a real query may bill so a bad estimate cannot run away
+
+    Args:
+        job_config (bigquery.QueryJobConfig): Config to update in place
+        budget_bytes (int): Bytes-scanned budget
+
+    Returns:
+        bigquery.QueryJobConfig: The same config
+    """
+    job_config.maximum_bytes_billed = budget_bytes
+    return job_config
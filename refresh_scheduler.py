@@ -0,0 +1,302 @@
+"""
+Background refresh of the dashboard data
+
+Refreshing inline in sfcc_analysis.py would make every viewer wait for the
+warehouse query and the metrics update. The refresher runs them in a
+background thread instead, in the Streamlit process or as its own process,
+and publishes the result as a new immutable snapshot (see shared_store.py):
+
+    1. sync the mirror from the warehouse (full refreshes only, when
+       sync_days is set)
+    2. update the metrics (metrics_pipeline.py)
+    3. write a snapshot of the facts and transcripts, then atomically swap
+       the active-snapshot pointer
+
+Sessions read the pointer once per rerun and never see a half-built snapshot
+or wait on a refresh. If any step fails the pointer is left alone, so the
+last successful snapshot keeps being served; the failure is recorded in
+refresh_status.json and retried on the next trigger.
+
+A refresh is triggered every `interval` seconds, and when the mirror
+watermark changes (another process synced the mirror), checked every `poll`
+seconds. A lock file keeps refreshers in different processes from running at
+the same time.
+
+Usage:
+    python refresh_scheduler.py run --interval 3600 --sync-days 90 --publish-days 365
+    python refresh_scheduler.py once
+    python refresh_scheduler.py status
+
+    SFCC_REFRESH_INTERVAL=3600 streamlit run sfcc_analysis.py   # refresh inside the app
+"""
+import argparse
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import shared_store
+from metrics_pipeline import METRICS_DIR, MetricsPipeline, metrics_version
+from transcript_mirror import MIRROR_DIR, read_watermark, sync_transcripts
+
+# Seconds between full refreshes of the in-app refresher, 0 disables it
+REFRESH_INTERVAL = int(os.environ.get("SFCC_REFRESH_INTERVAL", "0"))
+# Days of history synced from the warehouse on full refreshes, 0 skips the sync
+SYNC_DAYS = int(os.environ.get("SFCC_REFRESH_SYNC_DAYS", "0"))
+# Days of transcripts published in each snapshot, 0 publishes the whole mirror
+PUBLISH_DAYS = int(os.environ.get("SFCC_REFRESH_PUBLISH_DAYS", "0"))
+POLL_SECONDS = 60
+
+LOCK_FILE = "refresh.lock"
+STATUS_FILE = "refresh_status.json"
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _synced_at(mirror_dir=MIRROR_DIR):
+    state = read_watermark(mirror_dir)
+    return state["synced_at"].isoformat() if state else None
+
+
+@contextmanager
+def _refresh_lock(store_dir=shared_store.STORE_DIR):
+    """Yields True if this process holds the refresh lock, False if another one does"""
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, LOCK_FILE), "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def refresh_status(store_dir=shared_store.STORE_DIR):
+    """
+    Outcome of the last refresh attempts
+
+    Args:
+        store_dir (str): Store directory
+
+    Returns:
+        dict: last_attempt, last_success, last_error (None after a success)
+        and snapshot; None if no refresh has run
+    """
+    path = os.path.join(store_dir, STATUS_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_status(status, store_dir=shared_store.STORE_DIR):
+    path = os.path.join(store_dir, STATUS_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(status, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def refresh(sync_days=None, workers=1, transcripts=True, publish_days=None, mirror_dir=MIRROR_DIR,
+            metrics_dir=METRICS_DIR, store_dir=shared_store.STORE_DIR):
+    """
+    Rebuild the dashboard data and publish it as the active snapshot
+
+    Raises on failure; the active snapshot is only replaced by a complete one.
+
+    Args:
+        sync_days (int): Sync this many days from the warehouse first, no
+            sync if None
+        workers (int): Processes classifying changed mirror days
+        transcripts (bool): Also publish the mirrored transcripts
+        publish_days (int): Days of transcripts to publish, the whole
+            mirror if None; independent of `sync_days`, so every snapshot
+            holds the same window whatever triggered it
+        mirror_dir (str): Root directory of the mirror
+        metrics_dir (str): Directory of the fact store
+        store_dir (str): Store directory
+
+    Returns:
+        dict: The new shared_store.active_snapshot()
+    """
+    if sync_days:
+        sync_transcripts(sync_days, mirror_dir=mirror_dir)
+    # Read before the update, so a sync during the run triggers another refresh
+    synced_at = _synced_at(mirror_dir)
+    pipeline = MetricsPipeline(metrics_dir, mirror_dir, store_dir=store_dir)
+    pipeline.update(workers=workers)
+    facts = pipeline.load_facts()
+    if facts.empty:
+        raise ValueError(f"No facts in {metrics_dir}; is the mirror in {mirror_dir} empty?")
+    return shared_store.publish_snapshot(
+        facts, metrics_version(metrics_dir), transcripts=transcripts, days_back=publish_days,
+        details={"mirror_synced_at": synced_at, "publish_days": publish_days},
+        mirror_dir=mirror_dir, store_dir=store_dir)
+
+
+class SnapshotRefresher:
+    """
+    Runs refresh() in a background thread on a schedule and on mirror syncs
+
+    Args:
+        interval (int): Seconds between full refreshes (with the warehouse
+            sync), None to only refresh on mirror syncs
+        poll (int): Seconds between checks of the mirror watermark
+        sync_days (int): Days synced from the warehouse on full refreshes,
+            no sync if None
+        workers (int): Processes classifying changed mirror days
+        publish_days (int): Days of transcripts published in every
+            snapshot, the whole mirror if None
+        mirror_dir (str): Root directory of the mirror
+        metrics_dir (str): Directory of the fact store
+        store_dir (str): Store directory
+    """
+
+    def __init__(self, interval=3600, poll=POLL_SECONDS, sync_days=None, workers=1, publish_days=None,
+                 mirror_dir=MIRROR_DIR, metrics_dir=METRICS_DIR, store_dir=shared_store.STORE_DIR):
+        self.interval = interval
+        self.poll = poll
+        self.sync_days = sync_days
+        self.workers = workers
+        self.publish_days = publish_days
+        self.mirror_dir = mirror_dir
+        self.metrics_dir = metrics_dir
+        self.store_dir = store_dir
+        self._stop = threading.Event()
+        self._thread = None
+        # Monotonic time of the last full refresh attempt
+        self._last_full = None
+        # Mirror watermark the last attempt was built from
+        active = shared_store.active_snapshot(store_dir)
+        self._built_synced_at = active.get("mirror_synced_at") if active else None
+
+    def due(self):
+        """
+        Kind of refresh due now
+
+        Returns:
+            str: "full" (schedule, or no snapshot yet), "mirror" (the mirror
+            was synced since the last build) or None
+        """
+        if shared_store.active_snapshot(self.store_dir) is None and self._last_full is None:
+            return "full"
+        if self.interval and (self._last_full is None or time.monotonic() - self._last_full >= self.interval):
+            return "full"
+        synced_at = _synced_at(self.mirror_dir)
+        if synced_at is not None and synced_at != self._built_synced_at:
+            return "mirror"
+        return None
+
+    def run_once(self, kind="full"):
+        """
+        Refresh now, unless another process is refreshing
+
+        Args:
+            kind (str): "full" also syncs the mirror, "mirror" only rebuilds
+
+        Returns:
+            dict: The new active snapshot, None if the refresh failed or was
+            skipped
+        """
+        with _refresh_lock(self.store_dir) as locked:
+            if not locked:
+                print("Another refresh is running; skipping this one")
+                return None
+            if kind == "full":
+                self._last_full = time.monotonic()
+            status = refresh_status(self.store_dir) or {}
+            status["last_attempt"] = _utcnow().isoformat()
+            try:
+                info = refresh(self.sync_days if kind == "full" else None, self.workers,
+                               publish_days=self.publish_days, mirror_dir=self.mirror_dir, metrics_dir=self.metrics_dir, store_dir=self.store_dir)
+            except Exception as e:
+                # Retried on the next trigger, not on every poll
+                self._built_synced_at = _synced_at(self.mirror_dir)
+                status["last_error"] = f"{type(e).__name__}: {e}"
+                _write_status(status, self.store_dir)
+                active = shared_store.active_snapshot(self.store_dir)
+                print(f"Refresh failed ({status['last_error']}); "
+                      f"still serving {active['snapshot'] if active else 'the unsnapshotted data'}")
+                return None
+            self._built_synced_at = info.get("mirror_synced_at")
+            status.update(last_success=info["created_at"], last_error=None, snapshot=info["snapshot"])
+            _write_status(status, self.store_dir)
+            print(f"Published {info['snapshot']}")
+            return info
+
+    def _run(self):
+        while not self._stop.is_set():
+            kind = self.due()
+            if kind is not None:
+                self.run_once(kind)
+            self._stop.wait(self.poll)
+
+    def start(self):
+        """Start refreshing in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="snapshot-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """Stop after the refresh in progress, if any"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh the dashboard data in the background")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("run", "Refresh on a schedule and on mirror syncs until interrupted"),
+                            ("once", "Refresh now")):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--sync-days", type=int, default=None,
+                               help="Sync this many days from the warehouse on full refreshes")
+        subparser.add_argument("--workers", type=int, default=1, help="Processes classifying changed days")
+        subparser.add_argument("--publish-days", type=int, default=None,
+                               help="Days of transcripts published in each snapshot (default: the whole mirror)")
+    run_parser = subparsers.choices["run"]
+    run_parser.add_argument("--interval", type=int, default=3600, help="Seconds between full refreshes (default 3600)")
+    run_parser.add_argument("--poll", type=int, default=POLL_SECONDS,
+                            help=f"Seconds between mirror watermark checks (default {POLL_SECONDS})")
+    subparsers.add_parser("status", help="Show the active snapshot and the last refresh")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        active = shared_store.active_snapshot()
+        print(f"Active snapshot: {active['snapshot'] if active else 'none'}")
+        for field, value in (refresh_status() or {}).items():
+            print(f"{field}: {value}")
+        return
+
+    refresher = SnapshotRefresher(args.interval if args.command == "run" else None,
+                                  getattr(args, "poll", POLL_SECONDS), args.sync_days, args.workers,
+                                  args.publish_days)
+    if args.command == "once":
+        refresher.run_once()
+        return
+    refresher.start()
+    try:
+        while refresher.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping after the refresh in progress...")
+        refresher.stop()
+
+
+if __name__ == "__main__":
+    main()
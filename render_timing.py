@@ -0,0 +1,200 @@
+"""
+Per-section render timing for the Streamlit dashboard
+
+Streamlit reruns sfcc_analysis.py from the top on every widget change. A
+RenderTimer records how long each section of one rerun took and how much the
+process memory changed while it ran, so the slow part of a rerun (data
+loading, filtering, figure construction, chart and dataframe serialization)
+can be found without a profiler.
+
+Top-level sections of the script run one after another, so they are marked
+with start(); nested work (a figure inside a tab) uses the section() context
+manager. Each span records:
+
+    name          section name, nested spans are "parent/child"
+    seconds       wall time
+    rss_delta     change in resident memory (bytes), None where unavailable
+    alloc_delta   change in traced Python allocations (bytes), only when
+                  tracemalloc is on (SFCC_TRACEMALLOC=1, slows reruns)
+
+finish() appends one JSON line per rerun to RENDER_LOG and returns the
+spans; render_panel() shows them in a sidebar expander.
+
+Usage:
+    timer = RenderTimer()
+    timer.start("data_load")
+    ...
+    with timer.section("trend_chart"):
+        st.plotly_chart(fig)
+    timer.finish()
+"""
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# JSON lines file of per-rerun timings; empty disables the log
+RENDER_LOG = os.environ.get("SFCC_RENDER_LOG", "render_timings.jsonl")
+
+# Trace Python allocations as well as resident memory
+TRACE_MALLOC = os.environ.get("SFCC_TRACEMALLOC", "") == "1"
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = None
+
+
+def resident_memory():
+    """
+    Resident set size of this process
+
+    Returns:
+        int: Bytes, or None where /proc is unavailable
+    """
+    if _PAGE_SIZE is None:
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _delta(end, start):
+    return end - start if end is not None and start is not None else None
+
+
+class RenderTimer:
+    """
+    Timed, memory-annotated spans of one script run
+
+    Args:
+        log_path (str): JSON lines file finish() appends to, None or "" to
+            skip writing
+        trace_malloc (bool): Also record traced Python allocations
+    """
+
+    def __init__(self, log_path=RENDER_LOG, trace_malloc=TRACE_MALLOC):
+        self.log_path = log_path
+        self.trace_malloc = trace_malloc
+        if trace_malloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.started_at = datetime.now(timezone.utc)
+        self.spans = []
+        self._stack = []
+        self._current = None
+        self._run_start = self._snapshot()
+
+    def _snapshot(self):
+        allocated = tracemalloc.get_traced_memory()[0] if self.trace_malloc else None
+        return time.perf_counter(), resident_memory(), allocated
+
+    def _record(self, name, start):
+        end = self._snapshot()
+        self.spans.append({
+            "name": name,
+            "seconds": round(end[0] - start[0], 6),
+            "rss_delta": _delta(end[1], start[1]),
+            "alloc_delta": _delta(end[2], start[2]),
+        })
+
+    def start(self, name):
+        """
+        End the current top-level section and start the next one
+
+        Args:
+            name (str): Section name
+        """
+        self.stop()
+        self._current = (name, self._snapshot())
+
+    def stop(self):
+        """End the current top-level section, if any"""
+        if self._current is not None:
+            self._record(*self._current)
+            self._current = None
+
+    @contextmanager
+    def section(self, name):
+        """
+        Time a block, nested under the current top-level section and any
+        enclosing section() blocks
+
+        Args:
+            name (str): Section name
+        """
+        self._stack.append(name)
+        parent = [self._current[0]] if self._current is not None else []
+        full_name = "/".join(parent + self._stack)
+        start = self._snapshot()
+        try:
+            yield
+        finally:
+            self._record(full_name, start)
+            self._stack.pop()
+
+    def finish(self, **fields):
+        """
+        End the run and write its JSON log line
+
+        Args:
+            **fields: Extra values for the log record (view, filters...)
+
+        Returns:
+            dict: The record: run start, total seconds, rss and spans
+        """
+        self.stop()
+        end = self._snapshot()
+        record = {
+            "started_at": self.started_at.isoformat(),
+            "seconds": round(end[0] - self._run_start[0], 6),
+            "rss": end[1],
+            "rss_delta": _delta(end[1], self._run_start[1]),
+            **fields,
+            "spans": self.spans,
+        }
+        if self.log_path:
+            try:
+                with open(self.log_path, "a") as f:
+                    f.write(json.dumps(record, default=str) + "\n")
+            except OSError as e:
+                print(f"Could not write render timings to {self.log_path}: {e}")
+        return record
+
+    def to_frame(self):
+        """
+        Spans of this run, slowest first
+
+        Returns:
+            pandas.DataFrame: Section, ms, RSS delta (MB) and, when tracing,
+            alloc delta (MB)
+        """
+        spans = pd.DataFrame(self.spans, columns=["name", "seconds", "rss_delta", "alloc_delta"])
+        frame = pd.DataFrame({
+            "Section": spans["name"],
+            "ms": (spans["seconds"] * 1000).round(1),
+            "RSS Δ (MB)": (spans["rss_delta"].astype(float) / 2 ** 20).round(2),
+        })
+        if self.trace_malloc:
+            frame["Alloc Δ (MB)"] = (spans["alloc_delta"].astype(float) / 2 ** 20).round(2)
+        return frame.sort_values("ms", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def render_panel(record, timer, container):
+    """
+    Show a finished run's timings
+
+    Args:
+        record (dict): Result of RenderTimer.finish()
+        timer (RenderTimer): The finished timer
+        container: Streamlit container to draw into (st.sidebar)
+    """
+    panel = container.expander("⏱️ Render Timings", expanded=True)
+    rss = f", RSS {record['rss'] / 2 ** 20:.0f} MB" if record["rss"] is not None else ""
+    panel.caption(f"Rerun took {record['seconds'] * 1000:.0f} ms{rss}")
+    panel.dataframe(timer.to_frame(), hide_index=True, use_container_width=True)
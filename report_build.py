@@ -0,0 +1,266 @@
+"""
+Static HTML / PDF report built from the dashboard's aggregates
+
+Most people only need a snapshot of the numbers, not a live Streamlit
+session. This renders report_templates/ with jinja2 into REPORT_DIR/index.html,
+and with pdfkit (wkhtmltopdf) into REPORT_DIR/sfcc_report.pdf, from the same
+cached loaders the dashboard uses (dashboard_data.py), so both show the same
+figures.
+
+Each section is rendered on its own and fingerprinted: a SHA-256 of its
+template source and its input data. Rendered sections and their fingerprints
+are kept in REPORT_DIR/_sections/, so a rebuild only re-renders sections
+whose inputs changed, and the page and PDF are only rewritten when some
+section did.
+
+Usage:
+    python report_build.py
+    python report_build.py --no-pdf --force
+"""
+import argparse
+import hashlib
+import json
+import os
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup
+
+import dashboard_data
+from aggregate_cube import SENTIMENTS
+from sfcc_data import analysis_methodology
+
+REPORT_DIR = os.environ.get("SFCC_REPORT_DIR", "report_build")
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_templates")
+
+SECTIONS_DIR = "_sections"
+MANIFEST_FILE = "_manifest.json"
+HTML_FILE = "index.html"
+PDF_FILE = "sfcc_report.pdf"
+
+REPORT_TITLE = "SFCC B2B/Enterprise Market Analysis: Strengths & Pain Points"
+
+# Size of the inline SVG trend chart
+CHART_WIDTH = 860
+CHART_HEIGHT = 240
+
+PDF_OPTIONS = {"page-size": "A4", "encoding": "UTF-8", "print-media-type": None, "quiet": ""}
+
+
+def _environment():
+    return Environment(loader=FileSystemLoader(TEMPLATE_DIR),
+                       autoescape=select_autoescape(enabled_extensions=("html.j2",)))
+
+
+def _period_label(period):
+    return period.strftime("%Y-Q%q")
+
+
+def _trend_bars(series):
+    """Bars of the inline SVG chart, one per time series row"""
+    if series.empty:
+        return []
+    peak = max(int(series["Mentions"].max()), 1)
+    width = CHART_WIDTH / len(series)
+    bars = []
+    for i, (date, mentions) in enumerate(zip(series["Date"], series["Mentions"])):
+        height = round(int(mentions) / peak * (CHART_HEIGHT - 30), 1)
+        bars.append({
+            "x": round(i * width + width * 0.1, 1),
+            "y": round(CHART_HEIGHT - 20 - height, 1),
+            "width": round(width * 0.8, 1),
+            "height": height,
+            "label": date.strftime("%b %y"),
+            "mentions": int(mentions),
+        })
+    return bars
+
+
+def section_inputs(version):
+    """
+    Input data of each report section
+
+    Args:
+        version (str): Data version (see dashboard_data.data_version())
+
+    Returns:
+        dict: {section name: JSON-serializable context}, in page order
+    """
+    series = dashboard_data.load_time_series(version)
+    industry_data = dashboard_data.load_industry_data(version)
+    severity = dashboard_data.load_severity_data(version)
+    quarters = dashboard_data.available_quarters(version)
+    total, average, growth = dashboard_data.mention_metrics(version, None, None)
+
+    by_quarter = series.groupby(series["Date"].dt.to_period("Q"))["Mentions"].sum()
+    period = f"{_period_label(quarters[0])} - {_period_label(quarters[-1])}" if quarters else "No data"
+    sentiment = dashboard_data.load_cube(version).totals_by("Sentiment").reindex(SENTIMENTS, fill_value=0)
+    filtering = analysis_methodology.get("transcript_filtering", {})
+
+    return {
+        "summary": {
+            "title": REPORT_TITLE,
+            "period": period,
+            "source": filtering.get("source", "N/A"),
+            "strength_keywords": analysis_methodology.get("strength_keywords", []),
+        },
+        "metrics": {
+            "period": period,
+            "total": int(total),
+            "average": round(float(average), 1),
+            "growth": None if growth == float("inf") else round(float(growth)),
+            "quarters": [{"label": _period_label(q), "mentions": int(m)} for q, m in by_quarter.items()],
+        },
+        "trend": {
+            "width": CHART_WIDTH,
+            "height": CHART_HEIGHT,
+            "bars": _trend_bars(series),
+        },
+        "industries": {
+            "rows": industry_data.to_dict("records"),
+        },
+        "sentiment": {
+            "counts": [{"label": label, "mentions": int(n)} for label, n in sentiment.items()],
+            "total": int(sentiment.sum()),
+        },
+        "pain_points": {
+            "rows": severity[["Category", "Description", "Severity_Label"]].astype(str).to_dict("records"),
+        },
+        "methodology": {
+            "criteria": filtering.get("filtering_criteria", []),
+            "process": filtering.get("filtering_process", []),
+            "pain_point_keywords": analysis_methodology.get("pain_point_keywords", []),
+        },
+        "footer": {
+            "version": version,
+        },
+    }
+
+
+def fingerprint(template_source, context):
+    """
+    Fingerprint of a section: changes when its template or inputs change
+
+    Args:
+        template_source (str): Section template text
+        context (dict): Section inputs
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    payload = json.dumps({"template": template_source, "context": context}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _write_atomic(path, data):
+    mode = "wb" if isinstance(data, bytes) else "w"
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _load_manifest(report_dir):
+    path = os.path.join(report_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"sections": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_pdf(html, path):
+    try:
+        import pdfkit
+    except ImportError:
+        print("pdfkit is not installed; skipping the PDF (pip install pdfkit)")
+        return False
+    try:
+        pdf = pdfkit.from_string(html, False, options=PDF_OPTIONS)
+    except OSError as e:
+        # pdfkit raises OSError when the wkhtmltopdf binary is missing or fails
+        print(f"Could not render the PDF: {e}")
+        return False
+    _write_atomic(path, pdf)
+    return True
+
+
+def build_report(report_dir=REPORT_DIR, pdf=True, force=False, version=None):
+    """
+    Render the sections whose inputs changed and assemble the report
+
+    Args:
+        report_dir (str): Output directory
+        pdf (bool): Also write the PDF
+        force (bool): Re-render every section
+        version (str): Data version, dashboard_data.data_version() if None
+
+    Returns:
+        dict: rendered (section names re-rendered), reused (names taken
+        from the previous build), html and pdf (paths written, None if
+        unchanged or skipped)
+    """
+    version = version or dashboard_data.data_version()
+    environment = _environment()
+    sections_dir = os.path.join(report_dir, SECTIONS_DIR)
+    os.makedirs(sections_dir, exist_ok=True)
+    manifest = {} if force else _load_manifest(report_dir)
+    previous = manifest.get("sections", {})
+
+    fragments, fingerprints, rendered, reused = {}, {}, [], []
+    for name, context in section_inputs(version).items():
+        template_name = f"{name}.html.j2"
+        source = environment.loader.get_source(environment, template_name)[0]
+        digest = fingerprint(source, context)
+        fragment_path = os.path.join(sections_dir, f"{name}.html")
+        if previous.get(name) == digest and os.path.exists(fragment_path):
+            with open(fragment_path) as f:
+                fragments[name] = f.read()
+            reused.append(name)
+        else:
+            fragments[name] = environment.get_template(template_name).render(**context)
+            _write_atomic(fragment_path, fragments[name])
+            rendered.append(name)
+        fingerprints[name] = digest
+
+    layout_source = environment.loader.get_source(environment, "layout.html.j2")[0]
+    page_digest = fingerprint(layout_source, fingerprints)
+    html_path = os.path.join(report_dir, HTML_FILE)
+    pdf_path = os.path.join(report_dir, PDF_FILE)
+    result = {"rendered": rendered, "reused": reused, "html": None, "pdf": None}
+
+    page_changed = manifest.get("page") != page_digest or not os.path.exists(html_path)
+    if page_changed:
+        html = environment.get_template("layout.html.j2").render(
+            title=REPORT_TITLE, sections={name: Markup(fragment) for name, fragment in fragments.items()})
+        _write_atomic(html_path, html)
+        result["html"] = html_path
+    if pdf and (manifest.get("pdf") != page_digest or not os.path.exists(pdf_path)):
+        with open(html_path) as f:
+            if _write_pdf(f.read(), pdf_path):
+                result["pdf"] = pdf_path
+
+    # The PDF fingerprint only moves when a PDF of this page was written
+    pdf_digest = page_digest if result["pdf"] else manifest.get("pdf")
+    _write_atomic(os.path.join(report_dir, MANIFEST_FILE), json.dumps(
+        {"version": version, "page": page_digest, "pdf": pdf_digest, "sections": fingerprints}, indent=2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static SFCC report (HTML and PDF) from the dashboard data")
+    parser.add_argument("--output-dir", default=REPORT_DIR, help=f"Output directory (default {REPORT_DIR})")
+    parser.add_argument("--no-pdf", action="store_true", help="Only build the HTML page")
+    parser.add_argument("--force", action="store_true", help="Re-render every section")
+    args = parser.parse_args()
+
+    result = build_report(args.output_dir, pdf=not args.no_pdf, force=args.force)
+    print(f"Rendered {len(result['rendered'])} section(s): {', '.join(result['rendered']) or '-'}; "
+          f"reused {len(result['reused'])}")
+    for kind in ("html", "pdf"):
+        if result[kind]:
+            print(f"Wrote {result[kind]}")
+    if not result["html"]:
+        print(f"{os.path.join(args.output_dir, HTML_FILE)} is up to date")
+
+
+if __name__ == "__main__":
+    main()
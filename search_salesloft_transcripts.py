@@ -1,8 +1,16 @@
 from google.cloud import bigquery
+import heapq
 import pandas as pd
+import pyarrow as pa
 from datetime import datetime, timedelta
 
-def search_salesloft_transcripts(search_terms=None, days_back=30, limit=100):
+from data_schema import TRANSCRIPT_SCHEMA, compact
+from partition_classifier import HyperLogLog
+from query_planner import QueryBudgetExceeded, apply_budget, plan_query
+from transcript_index import ranked_search
+from transcript_mirror import iter_mirror_batches, mirror_covers, search_mirror
+
+def search_salesloft_transcripts(search_terms=None, days_back=30, limit=100, use_mirror=True, ranked=False):
     """
     Search Salesloft transcripts for specific terms
     
@@ -10,9 +18,50 @@ def search_salesloft_transcripts(search_terms=None, days_back=30, limit=100):
         search_terms (list): List of terms to search for in transcripts
         days_back (int): How many days back to search
         limit (int): Maximum number of results to return
+        use_mirror (bool): Answer from the local transcript mirror when it
+            covers the requested window (see transcript_mirror.py)
+        ranked (bool): Order mirror results by BM25 relevance using the local
+            inverted index (see transcript_index.py) instead of recency
     """
+    if use_mirror and mirror_covers(days_back):
+        if ranked and search_terms:
+            return ranked_search(search_terms, days_back=days_back, limit=limit)
+        return search_mirror(search_terms, days_back=days_back, limit=limit)
+
     client = bigquery.Client()
+    final_query = build_search_query(search_terms, days_back, limit)
     
+    try:
+        # Dry-run first so oversized scans never reach the warehouse
+        job_config = apply_budget(search_job_config(search_terms, days_back))
+        plan = plan_query(client, final_query, job_config=job_config, days_back=days_back)
+        print(plan.summary())
+        if not plan.within_budget:
+            if use_mirror and plan.mirror_fallback:
+                print("Answering from the local mirror instead (it may be stale)")
+                return search_mirror(search_terms, days_back=days_back, limit=limit)
+            return None
+        
+        # Execute query
+        df = client.query(final_query, job_config=job_config).to_dataframe()
+        return compact(df, TRANSCRIPT_SCHEMA)
+    except Exception as e:
+        print(f"Error executing query: {str(e)}")
+        return None
+
+def build_search_query(search_terms=None, days_back=30, limit=100):
+    """
+    Build the transcript search SQL
+    
+    Search terms and the window are bound as query parameters (see
+    search_job_config()), so any number of terms is one array parameter
+    instead of a chain of OR-ed LIKE clauses.
+    
+    Args:
+        search_terms (list): List of terms to search for in transcripts
+        days_back (int): How many days back to search
+        limit (int): Maximum number of results to return, no limit if None
+    """
     # Base query to get transcripts
     base_query = """
     WITH transcripts AS (
@@ -27,71 +76,180 @@ def search_salesloft_transcripts(search_terms=None, days_back=30, limit=100):
         FROM `shopify-dw.raw_salesloft.transcriptions` t
         LEFT JOIN `shopify-dw.raw_salesloft.conversations` c
         ON t.call_uuid = c.call_uuid
-        WHERE t.created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days} DAY)
+        WHERE t.created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @days_back DAY)
     )
     """
+    limit_clause = f"LIMIT {int(limit)}" if limit is not None else ""
     
     # If search terms provided, add search conditions
     if search_terms and len(search_terms) > 0:
-        search_conditions = " OR ".join([
-            f"LOWER(transcript_text) LIKE LOWER('%{term}%')"
-            for term in search_terms
-        ])
-        search_query = base_query + f"""
+        return base_query + f"""
         SELECT * FROM transcripts 
-        WHERE {search_conditions}
+        WHERE EXISTS (
+            SELECT 1 FROM UNNEST(@terms) AS term
+            WHERE STRPOS(LOWER(transcript_text), LOWER(term)) > 0
+        )
         ORDER BY created_at DESC
-        LIMIT {limit}
+        {limit_clause}
         """
-    else:
-        search_query = base_query + f"""
+    return base_query + f"""
         SELECT * FROM transcripts
         ORDER BY created_at DESC
-        LIMIT {limit}
+        {limit_clause}
         """
+
+def search_job_config(search_terms=None, days_back=30):
+    """
+    Job config binding the parameters of build_search_query()
+    
+    Args:
+        search_terms (list): List of terms to search for in transcripts
+        days_back (int): How many days back to search
+    """
+    return bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ArrayQueryParameter("terms", "STRING", list(search_terms or [])),
+        bigquery.ScalarQueryParameter("days_back", "INT64", days_back),
+    ])
+
+def stream_salesloft_transcripts(search_terms=None, days_back=30, limit=None, page_size=1000, use_mirror=True):
+    """
+    Search Salesloft transcripts, yielding results page by page
     
-    # Format query with days parameter
-    final_query = search_query.format(days=days_back)
+    Unlike search_salesloft_transcripts(), results are never materialized as
+    one DataFrame: only the current page is held in memory.
     
-    try:
-        # Execute query
-        df = client.query(final_query).to_dataframe()
-        return df
-    except Exception as e:
-        print(f"Error executing query: {str(e)}")
-        return None
+    Args:
+        search_terms (list): List of terms to search for in transcripts
+        days_back (int): How many days back to search
+        limit (int): Maximum number of results to return, no limit if None
+        page_size (int): Rows per yielded page
+        use_mirror (bool): Stream from the local transcript mirror when it
+            covers the requested window (see transcript_mirror.py)
+    
+    Raises:
+        QueryBudgetExceeded: The warehouse query would scan more than the
+            bytes budget (see query_planner.py) and the mirror cannot stand in
+    
+    Yields:
+        pyarrow.RecordBatch: One page of results, most recent first
+    """
+    if use_mirror and mirror_covers(days_back):
+        yield from iter_mirror_batches(search_terms, days_back=days_back, limit=limit, batch_size=page_size)
+        return
 
-def analyze_transcript_results(df):
+    client = bigquery.Client()
+    final_query = build_search_query(search_terms, days_back, limit)
+    job_config = apply_budget(search_job_config(search_terms, days_back))
+    plan = plan_query(client, final_query, job_config=job_config, days_back=days_back)
+    print(plan.summary())
+    if not plan.within_budget:
+        if use_mirror and plan.mirror_fallback:
+            print("Streaming from the local mirror instead (it may be stale)")
+            yield from iter_mirror_batches(search_terms, days_back=days_back, limit=limit, batch_size=page_size)
+            return
+        raise QueryBudgetExceeded(plan)
+    
+    rows = client.query(final_query, job_config=job_config).result(page_size=page_size)
+    yield from rows.to_arrow_iterable()
+
+class TranscriptAggregator:
+    """
+    Incremental summary of transcript search results
+    
+    Consumes result pages one at a time and keeps only counts, a HyperLogLog
+    sketch of the opportunity ids (fixed size, about 1.6% error) and the
+    `recent_n` most recent conversations, so memory does not grow with the
+    number of transcripts or opportunities.
+    
+    Args:
+        recent_n (int): Number of most recent conversations to keep
+    """
+    RECENT_COLUMNS = ['created_at', 'account_name', 'owner_name', 'duration_seconds']
+
+    def __init__(self, recent_n=5):
+        self.recent_n = recent_n
+        self.count = 0
+        self.opportunities = HyperLogLog()
+        self.has_opportunities = False
+        self._recent = []
+        self._seq = 0
+
+    def update(self, batch):
+        """
+        Add one page of results
+        
+        Args:
+            batch (pyarrow.RecordBatch): Page of transcript rows
+        """
+        self.count += batch.num_rows
+        names = batch.schema.names
+        if 'opportunity_id' in names:
+            self.has_opportunities = True
+            self.opportunities.add_many(batch.column('opportunity_id').to_pylist())
+
+        # Min-heap on created_at holding the most recent rows seen so far
+        columns = [batch.column(name).to_pylist() if name in names else [None] * batch.num_rows
+                   for name in self.RECENT_COLUMNS]
+        for row in zip(*columns):
+            if row[0] is None:
+                continue
+            self._seq += 1
+            entry = (row[0], self._seq, row)
+            if len(self._recent) < self.recent_n:
+                heapq.heappush(self._recent, entry)
+            elif entry > self._recent[0]:
+                heapq.heapreplace(self._recent, entry)
+
+    def recent(self):
+        """Most recent conversations as a DataFrame, newest first"""
+        rows = [row for _, _, row in sorted(self._recent, reverse=True)]
+        return pd.DataFrame(rows, columns=self.RECENT_COLUMNS)
+
+def analyze_transcript_results(results):
     """
     Analyze the transcript search results
     
     Args:
-        df (pandas.DataFrame): DataFrame containing transcript results
+        results (pandas.DataFrame or iterable): DataFrame containing transcript
+            results, or pages of pyarrow.RecordBatch from
+            stream_salesloft_transcripts()
     """
-    if df is None or df.empty:
+    if results is None:
+        print("No results to analyze")
+        return
+    if isinstance(results, pd.DataFrame):
+        results = pa.Table.from_pandas(results, preserve_index=False).to_batches()
+
+    aggregator = TranscriptAggregator(recent_n=5)
+    for batch in results:
+        aggregator.update(batch)
+    
+    if aggregator.count == 0:
         print("No results to analyze")
         return
     
-    print(f"\nFound {len(df)} matching transcripts")
+    print(f"\nFound {aggregator.count} matching transcripts")
     print("\nMost recent conversations:")
-    recent = df.head(5)[['created_at', 'account_name', 'owner_name', 'duration_seconds']]
-    print(recent.to_string())
+    print(aggregator.recent().to_string())
     
-    if 'opportunity_id' in df.columns:
-        print("\nUnique opportunities mentioned:", df['opportunity_id'].nunique())
+    if aggregator.has_opportunities:
+        print("\nUnique opportunities mentioned (approx.):", aggregator.opportunities.estimate())
 
 def main():
     # Example usage
     search_terms = ['BigCommerce', 'competitor', 'migration']
     print(f"Searching for terms: {search_terms}")
     
-    results = search_salesloft_transcripts(
+    results = stream_salesloft_transcripts(
         search_terms=search_terms,
         days_back=30,
         limit=100
     )
     
-    analyze_transcript_results(results)
+    try:
+        analyze_transcript_results(results)
+    except Exception as e:
+        print(f"Error executing query: {str(e)}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,234 @@
+"""
+Vectorized lexicon sentiment scoring for transcript sentences
+
+Implements the VADER-style scoring described in
+analysis_methodology["transcript_filtering"]["sentiment_analysis"] for whole
+arrays of sentences at once. Tokens are mapped to vocabulary ids once; after
+that every step is a numpy array operation over all tokens of the batch:
+
+    valence     token -> lexicon weight lookup (the sentence x vocabulary
+                indicator matrix in CSR form times the weight vector)
+    boosters    "very", "slightly", ... within 3 tokens scale the valence
+    negation    "not", "never", ... within 3 tokens flip and damp it
+    contrast    words before "but" count half, words after it 1.5x
+    compound    sum / sqrt(sum^2 + alpha), thresholded at +/-0.2 into
+                Positive / Neutral / Negative
+
+Usage:
+    engine = SentimentEngine()
+    labels = engine.classify(["The platform is not flexible at all.", ...])
+"""
+import re
+
+import numpy as np
+
+from aggregate_cube import SENTIMENTS
+from sfcc_data import analysis_methodology
+
+# Compound score thresholds from the methodology
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+# Normalization constant of the compound score (VADER uses 15)
+ALPHA = 15.0
+
+# How many preceding tokens a negator or booster reaches, with the weight of
+# a booster at distance 1, 2 and 3
+WINDOW = 3
+BOOSTER_DECAY = [1.0, 0.95, 0.9]
+
+NEGATION_SCALAR = -0.74
+BOOSTER_INCREMENT = 0.293
+
+# Weight of the domain keywords in analysis_methodology; low enough that a
+# keyword alone ("integration") stays Neutral
+DOMAIN_KEYWORD_WEIGHT = 0.5
+
+# General evaluative words, VADER scale (-4 to 4)
+GENERAL_LEXICON = {
+    "good": 1.9, "great": 3.1, "excellent": 3.2, "love": 3.2, "like": 1.5, "happy": 2.7,
+    "easy": 1.9, "fast": 1.5, "helpful": 1.8, "impressive": 2.3, "amazing": 2.8, "smooth": 1.5,
+    "best": 3.2, "better": 1.9, "superior": 2.1, "powerful": 1.7, "reliable": 1.8, "flexible": 1.6,
+    "bad": -2.5, "terrible": -3.1, "awful": -3.1, "hate": -2.7, "poor": -2.1, "worse": -2.1,
+    "worst": -3.1, "painful": -2.4, "frustrating": -2.5, "frustrated": -2.4, "broken": -2.1,
+    "expensive": -1.8, "slow": -1.5, "difficult": -1.6, "complicated": -1.6, "clunky": -1.6,
+    "outdated": -1.6, "problem": -1.7, "issue": -1.2, "risk": -1.1, "concern": -1.1, "worry": -1.8,
+    "unsustainable": -2.0, "struggle": -1.7, "struggling": -1.8,
+}
+
+NEGATORS = {
+    "not", "no", "never", "none", "nothing", "neither", "nor", "without", "hardly", "barely",
+    "cannot", "cant", "can't", "dont", "don't", "doesnt", "doesn't", "didnt", "didn't",
+    "isnt", "isn't", "wasnt", "wasn't", "arent", "aren't", "wont", "won't", "wouldnt", "wouldn't",
+    "shouldnt", "shouldn't", "couldnt", "couldn't", "aint", "ain't",
+}
+
+BOOSTERS = {
+    "very": BOOSTER_INCREMENT, "really": BOOSTER_INCREMENT, "extremely": BOOSTER_INCREMENT,
+    "incredibly": BOOSTER_INCREMENT, "so": BOOSTER_INCREMENT, "super": BOOSTER_INCREMENT,
+    "highly": BOOSTER_INCREMENT, "too": BOOSTER_INCREMENT, "significantly": BOOSTER_INCREMENT,
+    "slightly": -BOOSTER_INCREMENT, "somewhat": -BOOSTER_INCREMENT, "marginally": -BOOSTER_INCREMENT,
+    "occasionally": -BOOSTER_INCREMENT, "partly": -BOOSTER_INCREMENT,
+}
+
+CONTRAST_WORDS = {"but", "however"}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?])\s+")
+
+
+def default_sentiment_lexicon():
+    """
+    Lexicon built from the analysis keywords plus GENERAL_LEXICON
+
+    Strength keywords get +DOMAIN_KEYWORD_WEIGHT and pain-point keywords
+    -DOMAIN_KEYWORD_WEIGHT unless GENERAL_LEXICON scores them already.
+
+    Returns:
+        dict: {token: valence}
+    """
+    lexicon = {}
+    for keyword in analysis_methodology["strength_keywords"]:
+        lexicon[keyword] = DOMAIN_KEYWORD_WEIGHT
+    for keyword in analysis_methodology["pain_point_keywords"]:
+        lexicon[keyword] = -DOMAIN_KEYWORD_WEIGHT
+    lexicon.update(GENERAL_LEXICON)
+    return lexicon
+
+
+def label_scores(scores):
+    """
+    Threshold compound scores into SENTIMENTS
+
+    Args:
+        scores (numpy.ndarray): Compound scores in [-1, 1]
+
+    Returns:
+        numpy.ndarray: 'Positive', 'Neutral' or 'Negative' per score
+    """
+    scores = np.asarray(scores)
+    codes = np.where(scores > POSITIVE_THRESHOLD, 0, np.where(scores < NEGATIVE_THRESHOLD, 2, 1))
+    return np.array(SENTIMENTS, dtype=object)[codes]
+
+
+class SentimentEngine:
+    """
+    Batch lexicon sentiment scorer
+
+    Args:
+        lexicon (dict): {token: valence}, default_sentiment_lexicon() if None
+        negators (set): Tokens that negate the following WINDOW tokens
+        boosters (dict): {token: increment} for intensifiers and dampeners
+        alpha (float): Compound score normalization constant
+    """
+
+    def __init__(self, lexicon=None, negators=NEGATORS, boosters=BOOSTERS, alpha=ALPHA):
+        lexicon = default_sentiment_lexicon() if lexicon is None else lexicon
+        self.alpha = alpha
+        # Id 0 is reserved for tokens outside the vocabulary
+        self.vocabulary = {}
+        for token in list(lexicon) + list(negators) + list(boosters) + list(CONTRAST_WORDS):
+            self.vocabulary.setdefault(token, len(self.vocabulary) + 1)
+        size = len(self.vocabulary) + 1
+        self.valence = np.zeros(size)
+        self.is_negator = np.zeros(size, dtype=bool)
+        self.booster = np.zeros(size)
+        self.is_contrast = np.zeros(size, dtype=bool)
+        for token, value in lexicon.items():
+            self.valence[self.vocabulary[token]] = value
+        for token in negators:
+            self.is_negator[self.vocabulary[token]] = True
+        for token, value in boosters.items():
+            self.booster[self.vocabulary[token]] = value
+        for token in CONTRAST_WORDS:
+            self.is_contrast[self.vocabulary[token]] = True
+
+    def _encode(self, sentences):
+        """
+        Token ids of all sentences, flattened, with CSR-style row pointers
+
+        Returns:
+            tuple: (token_ids, indptr), sentence i owns
+            token_ids[indptr[i]:indptr[i + 1]]
+        """
+        tokenized = [TOKEN_PATTERN.findall(sentence.lower()) if sentence else [] for sentence in sentences]
+        indptr = np.zeros(len(tokenized) + 1, dtype=np.int64)
+        np.cumsum([len(tokens) for tokens in tokenized], out=indptr[1:])
+        get = self.vocabulary.get
+        token_ids = np.fromiter(
+            (get(token, 0) for tokens in tokenized for token in tokens),
+            dtype=np.int64, count=int(indptr[-1])
+        )
+        return token_ids, indptr
+
+    def score(self, sentences):
+        """
+        Compound sentiment score of every sentence
+
+        Args:
+            sentences (list): Sentence strings (None or empty scores 0)
+
+        Returns:
+            numpy.ndarray: float64 scores in [-1, 1], aligned with `sentences`
+        """
+        token_ids, indptr = self._encode(sentences)
+        n_sentences = len(indptr) - 1
+        if not len(token_ids):
+            return np.zeros(n_sentences)
+        row = np.repeat(np.arange(n_sentences), np.diff(indptr))
+        valence = self.valence[token_ids]
+        scored = valence != 0
+
+        # Look back up to WINDOW tokens without crossing sentence boundaries
+        negated = np.zeros(len(token_ids), dtype=bool)
+        for distance in range(1, WINDOW + 1):
+            previous = np.empty(len(token_ids), dtype=np.int64)
+            previous[:distance] = 0
+            previous[distance:] = token_ids[:-distance]
+            same_sentence = np.zeros(len(token_ids), dtype=bool)
+            same_sentence[distance:] = row[distance:] == row[:-distance]
+            boost = self.booster[previous] * BOOSTER_DECAY[distance - 1] * same_sentence
+            valence = valence + np.sign(valence) * boost
+            negated |= self.is_negator[previous] & same_sentence
+        valence = np.where(negated & scored, valence * NEGATION_SCALAR, valence)
+
+        # Contrast: half weight before the first "but" of a sentence, 1.5x after it
+        contrast = self.is_contrast[token_ids]
+        if contrast.any():
+            contrasts_so_far = np.concatenate([[0], np.cumsum(contrast)])
+            seen = contrasts_so_far[:-1] - contrasts_so_far[indptr[:-1]][row]
+            has_contrast = np.bincount(row, weights=contrast, minlength=n_sentences)[row] > 0
+            valence = np.where(has_contrast & (seen == 0) & ~contrast, valence * 0.5, valence)
+            valence = np.where(seen > 0, valence * 1.5, valence)
+
+        # Row sums of the sentence x token valence matrix
+        totals = np.bincount(row, weights=valence, minlength=n_sentences)
+        return totals / np.sqrt(totals * totals + self.alpha)
+
+    def classify(self, sentences):
+        """
+        Sentiment label of every sentence
+
+        Args:
+            sentences (list): Sentence strings
+
+        Returns:
+            numpy.ndarray: SENTIMENTS labels aligned with `sentences`
+        """
+        return label_scores(self.score(sentences))
+
+    def score_documents(self, texts):
+        """
+        Mean sentence compound score of every document
+
+        Args:
+            texts (list): Transcript texts
+
+        Returns:
+            numpy.ndarray: float64 scores aligned with `texts`, 0 for empty texts
+        """
+        split = [SENTENCE_PATTERN.split(text) if text else [] for text in texts]
+        counts = np.array([len(sentences) for sentences in split], dtype=np.int64)
+        scores = self.score([sentence for sentences in split for sentence in sentences])
+        totals = np.bincount(np.repeat(np.arange(len(texts)), counts), weights=scores, minlength=len(texts))
+        return np.divide(totals, counts, out=np.zeros(len(texts)), where=counts > 0)
@@ -0,0 +1,428 @@
+"""
+Static analysis data shared by the dashboard and the transcript processing scripts
+
+Kept out of sfcc_analysis.py so that it can be imported without running the
+Streamlit app.
+"""
+
+# Define pain points data
+pain_points = {
+    "Cost": {"description": "High implementation and maintenance costs, licensing fees", "severity": "High"},
+    "Complexity": {"description": "Complex architecture, steep learning curve, customization challenges", "severity": "High"},
+    "Feature Limitations": {"description": "Content management limitations, site speed concerns", "severity": "Medium"},
+    "Legacy Status": {"description": "Often referred to as a legacy platform", "severity": "High"},
+    "Integration Challenges": {"description": "Complex integration management and maintenance", "severity": "Medium"},
+    "Technology": {
+        "description": "API limitations for advanced integrations, performance impact of custom feature development, complexity of multi-tenant implementations",
+        "severity": "High"
+    },
+    "Distribution": {
+        "description": "Inventory synchronization challenges, complex shipping and fulfillment rules, multi-warehouse management complexity",
+        "severity": "High"
+    },
+    "Automotive": {
+        "description": "Complex parts catalog management, dealer-specific pricing structures, integration with DMS systems",
+        "severity": "High"
+    },
+    "Professional Services": {
+        "description": "Service package customization complexity, project-based pricing challenges, resource allocation integration",
+        "severity": "High"
+    }
+}
+
+# Industries covered by the analysis
+industries = ['Retail', 'Manufacturing', 'Technology', 'Healthcare', 'Financial', 'Distribution', 'Automotive', 'Professional Services']
+
+# Analysis methodology and keywords
+analysis_methodology = {
+    "strength_keywords": [
+        "better", "strong", "strength", "advantage", "benefit",
+        "good", "great", "excel", "superior", "best", "leading",
+        "powerful", "robust", "reliable", "scalable", "flexible",
+        "feature", "capability", "performance", "enterprise", "b2b"
+    ],
+    "pain_point_keywords": [
+        "issue", "problem", "challenge", "difficult", "complex",
+        "expensive", "cost", "limitation", "legacy", "old",
+        "slow", "complicated", "concern", "worry", "risk",
+        "integration", "maintenance", "development", "effort"
+    ],
+    "transcript_filtering": {
+        "source": "Salesloft transcripts (shopify-dw.raw_salesloft.transcription_sentences)",
+        "total_sentences": "109 relevant sentences",
+        "filtering_criteria": [
+            "Contains SFCC or Salesforce Commerce Cloud mentions",
+            "B2B or Enterprise context",
+            "Excludes general/unrelated discussions",
+            "Focus on direct customer/prospect feedback"
+        ],
+        "filtering_process": [
+            "1. Initial keyword search for 'SFCC', 'Salesforce Commerce Cloud'",
+            "2. Context validation for B2B/Enterprise relevance",
+            "3. Sentiment analysis using natural language processing",
+            "4. Manual review for accuracy and relevance",
+            "5. Categorization by industry and pain point type"
+        ],
+        "example_sentences": {
+            "Critical": [
+                "The total cost of ownership for SFCC is extremely high, requiring significant ongoing development resources.",
+                "Development costs are becoming unsustainable with SFCC, especially for B2B customizations.",
+                "We're spending too much on maintaining SFCC integrations and custom features."
+            ],
+            "High": [
+                "Integration with SFCC is complex and requires specialized knowledge, making it difficult to maintain.",
+                "The platform's legacy architecture makes modern feature implementation challenging.",
+                "Teams struggle with the complexity of SFCC's B2B commerce capabilities."
+            ],
+            "Medium": [
+                "Content management in SFCC has some limitations that affect site performance.",
+                "The platform's B2B feature set needs improvement in certain areas.",
+                "Search functionality could be more robust for enterprise catalogs."
+            ],
+            "Low": [
+                "The platform occasionally shows performance issues during peak loads.",
+                "Some minor usability concerns in the admin interface.",
+                "Documentation could be more comprehensive for advanced features."
+            ]
+        },
+        "sentiment_analysis": {
+            "approach": [
+                "1. Text Preprocessing:",
+                "   - Tokenization using NLTK word_tokenize",
+                "   - Stopword removal with custom B2B/commerce domain stopwords",
+                "   - Lemmatization using WordNetLemmatizer",
+                "   - Special handling for industry-specific terms",
+                
+                "2. Feature Extraction:",
+                "   - TF-IDF vectorization with n-gram range (1,3)",
+                "   - Custom feature weights for domain-specific terms",
+                "   - Contextual window of ±3 sentences",
+                "   - Entity recognition for product/feature mentions",
+                
+                "3. Sentiment Classification:",
+                "   - VADER sentiment analysis with custom lexicon",
+                "   - Compound score thresholds: >0.2 (positive), <-0.2 (negative)",
+                "   - Industry-specific modifier boosting",
+                "   - Aspect-based sentiment for specific features",
+                
+                "4. Context Analysis:",
+                "   - B2B/Enterprise context validation",
+                "   - Technical term recognition",
+                "   - Cost/effort mention weighting",
+                "   - Integration complexity scoring",
+                
+                "5. Manual Validation:",
+                "   - Expert review of edge cases",
+                "   - Context verification",
+                "   - Severity assessment",
+                "   - Final categorization"
+            ],
+            "industry_examples": {
+                "Retail": {
+                    "Pain Points": [
+                        "Complex product catalog management requiring significant development effort",
+                        "High costs for B2C to B2B feature adaptations",
+                        "Performance issues with large multi-brand catalogs"
+                    ],
+                    "Technical Challenges": [
+                        "Multi-catalog data synchronization across brands",
+                        "Custom pricing engine for tiered wholesale pricing",
+                        "Real-time inventory sync across multiple storefronts",
+                        "Complex promotion rules for B2B customers"
+                    ],
+                    "Integrations": [
+                        "ERP: SAP, Oracle NetSuite, Microsoft Dynamics",
+                        "PIM: Akeneo, InRiver, Salsify",
+                        "OMS: Manhattan Associates, IBM Sterling",
+                        "WMS: HighJump, JDA Warehouse Management"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "Multi-Brand Wholesale Portal",
+                            "Requirements": [
+                                "Unified login for multiple brand catalogs",
+                                "Brand-specific pricing and promotions",
+                                "Custom order workflows by brand",
+                                "Consolidated ordering across brands"
+                            ],
+                            "Implementation Challenges": [
+                                "Complex data model for multi-brand structure",
+                                "Performance optimization for large catalogs",
+                                "Custom development for order splitting"
+                            ]
+                        }
+                    ]
+                },
+                "Manufacturing": {
+                    "Pain Points": [
+                        "Complex pricing and quote management implementation",
+                        "Integration challenges with ERP systems",
+                        "Custom workflow development costs"
+                    ],
+                    "Technical Challenges": [
+                        "Complex product configurator implementation",
+                        "Real-time pricing calculations for custom products",
+                        "Integration with CAD/PLM systems",
+                        "Multi-level approval workflow engine"
+                    ],
+                    "Integrations": [
+                        "ERP: SAP S/4HANA, Oracle EBS, IFS",
+                        "PLM: Siemens Teamcenter, PTC Windchill",
+                        "CPQ: Oracle CPQ, Tacton, Pros",
+                        "CAD: AutoCAD, SolidWorks, Catia"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "Custom Equipment Configuration",
+                            "Requirements": [
+                                "Dynamic product configuration rules",
+                                "Real-time pricing calculation",
+                                "Engineering validation workflow",
+                                "Custom quote generation"
+                            ],
+                            "Implementation Challenges": [
+                                "Complex rule engine development",
+                                "Performance optimization for configurations",
+                                "Integration with engineering systems"
+                            ]
+                        }
+                    ]
+                },
+                "Healthcare": {
+                    "Pain Points": [
+                        "Compliance and security feature implementation costs",
+                        "Complex healthcare product catalog management",
+                        "Integration with healthcare-specific systems"
+                    ],
+                    "Technical Challenges": [
+                        "HIPAA compliance implementation",
+                        "Medical device tracking system",
+                        "Regulatory documentation management",
+                        "Secure payment processing"
+                    ],
+                    "Integrations": [
+                        "EMR: Epic, Cerner, Allscripts",
+                        "PACS: GE Healthcare, Philips",
+                        "RIS: Merge Healthcare, McKesson",
+                        "Practice Management: athenahealth, eClinicalWorks"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "Medical Supply Procurement",
+                            "Requirements": [
+                                "HIPAA-compliant ordering process",
+                                "Regulatory documentation tracking",
+                                "Lot number and expiration tracking",
+                                "Controlled substance ordering workflow"
+                            ],
+                            "Implementation Challenges": [
+                                "Security compliance development",
+                                "Integration with healthcare systems",
+                                "Audit trail implementation"
+                            ]
+                        }
+                    ]
+                },
+                "Financial Services": {
+                    "Pain Points": [
+                        "Security compliance implementation overhead",
+                        "Complex product bundling requirements",
+                        "Integration with financial systems"
+                    ],
+                    "Technical Challenges": [
+                        "PCI DSS compliance implementation",
+                        "Complex financial product configurator",
+                        "Multi-currency support",
+                        "Real-time rate calculation engine"
+                    ],
+                    "Integrations": [
+                        "Core Banking: FIS, Fiserv, Temenos",
+                        "Payment Gateways: Stripe, Adyen",
+                        "Risk Management: Moody's, Bloomberg",
+                        "KYC/AML: LexisNexis, Thomson Reuters"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "Financial Product Marketplace",
+                            "Requirements": [
+                                "Dynamic product bundling",
+                                "Real-time rate calculations",
+                                "Compliance workflow automation",
+                                "Document generation and management"
+                            ],
+                            "Implementation Challenges": [
+                                "Complex calculation engine development",
+                                "Security compliance implementation",
+                                "Integration with banking systems"
+                            ]
+                        }
+                    ]
+                },
+                "Technology": {
+                    "Pain Points": [
+                        "API limitations for advanced integrations",
+                        "Performance impact of custom feature development",
+                        "Complexity of multi-tenant implementations"
+                    ],
+                    "Technical Challenges": [
+                        "Multi-tenant architecture implementation",
+                        "API rate limiting and scalability",
+                        "Subscription billing integration",
+                        "SSO and identity management"
+                    ],
+                    "Integrations": [
+                        "Billing: Stripe, Chargebee, Recurly",
+                        "Identity: Okta, Auth0, Azure AD",
+                        "CRM: Salesforce, HubSpot",
+                        "Analytics: Mixpanel, Amplitude"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "SaaS Marketplace Platform",
+                            "Requirements": [
+                                "Multi-tenant product catalog",
+                                "Usage-based pricing model",
+                                "Automated provisioning workflow",
+                                "License management system"
+                            ],
+                            "Implementation Challenges": [
+                                "Complex tenant isolation",
+                                "Real-time usage tracking",
+                                "Integration with billing systems"
+                            ]
+                        }
+                    ]
+                },
+                "Distribution": {
+                    "Pain Points": [
+                        "Inventory synchronization challenges",
+                        "Complex shipping and fulfillment rules",
+                        "Multi-warehouse management complexity"
+                    ],
+                    "Technical Challenges": [
+                        "Real-time inventory allocation engine",
+                        "Dynamic routing optimization",
+                        "Multi-location fulfillment logic",
+                        "Advanced shipping rate calculation"
+                    ],
+                    "Integrations": [
+                        "WMS: Manhattan Associates, HighJump",
+                        "TMS: MercuryGate, BluJay",
+                        "Inventory: NetSuite WMS, Fishbowl",
+                        "Shipping: FedEx, UPS, DHL APIs"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "Multi-Warehouse Distribution",
+                            "Requirements": [
+                                "Real-time inventory visibility",
+                                "Intelligent order routing",
+                                "Split shipment management",
+                                "Automated replenishment"
+                            ],
+                            "Implementation Challenges": [
+                                "Complex inventory allocation logic",
+                                "Real-time synchronization",
+                                "Performance at scale"
+                            ]
+                        }
+                    ]
+                },
+                "Automotive": {
+                    "Pain Points": [
+                        "Complex parts catalog management",
+                        "Dealer-specific pricing structures",
+                        "Integration with DMS systems"
+                    ],
+                    "Technical Challenges": [
+                        "VIN-based parts compatibility",
+                        "Complex fitment logic",
+                        "Real-time DMS integration",
+                        "Multi-brand catalog management"
+                    ],
+                    "Integrations": [
+                        "DMS: CDK Global, Reynolds & Reynolds",
+                        "Parts Data: MOTOR, Snap-on",
+                        "Estimating: Mitchell, CCC ONE",
+                        "Inventory: WHI Solutions, PartsTrader"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "Dealer Parts Portal",
+                            "Requirements": [
+                                "VIN decoder integration",
+                                "Real-time inventory lookup",
+                                "Fitment validation",
+                                "Dealer-specific pricing"
+                            ],
+                            "Implementation Challenges": [
+                                "Complex parts relationships",
+                                "Multiple data source integration",
+                                "Performance optimization"
+                            ]
+                        }
+                    ]
+                },
+                "Professional Services": {
+                    "Pain Points": [
+                        "Service package customization complexity",
+                        "Project-based pricing challenges",
+                        "Resource allocation integration"
+                    ],
+                    "Technical Challenges": [
+                        "Dynamic service configuration",
+                        "Resource availability tracking",
+                        "Project milestone billing",
+                        "Time tracking integration"
+                    ],
+                    "Integrations": [
+                        "PSA: FinancialForce, OpenAir",
+                        "Time Tracking: Harvest, Toggl",
+                        "Project Management: Jira, Monday.com",
+                        "Resource Planning: Resource Guru, Float"
+                    ],
+                    "Detailed Use Cases": [
+                        {
+                            "Scenario": "Professional Services Automation",
+                            "Requirements": [
+                                "Service package configuration",
+                                "Resource availability checking",
+                                "Milestone-based billing",
+                                "Project timeline management"
+                            ],
+                            "Implementation Challenges": [
+                                "Complex pricing rules",
+                                "Resource allocation logic",
+                                "Integration complexity"
+                            ]
+                        }
+                    ]
+                }
+            },
+            "sentiment_examples": {
+                "Positive": [
+                    "SFCC's B2B capabilities are robust for basic commerce needs.",
+                    "The platform handles large catalogs effectively.",
+                    "Integration with other Salesforce products is seamless."
+                ],
+                "Neutral": [
+                    "SFCC requires significant development resources.",
+                    "The platform has both strengths and limitations.",
+                    "Migration process involves multiple steps."
+                ],
+                "Negative": [
+                    "Cost of ownership is becoming a major concern.",
+                    "Integration complexity creates ongoing challenges.",
+                    "Legacy architecture limits modern feature implementation."
+                ]
+            }
+        },
+        "time_period": "Q2 2024 - Q1 2025",
+        "analysis_approach": [
+            "Semantic analysis for context understanding",
+            "Keyword-based strength/weakness identification",
+            "Manual verification of sentiment accuracy",
+            "Severity assessment based on frequency and impact"
+        ]
+    }
+}
@@ -0,0 +1,306 @@
+"""
+Memory-mapped Arrow store shared by all dashboard sessions
+
+Streamlit runs every browser session in the same process, but frames loaded
+per rerun (or returned by st.cache_data, which hands out copies) are held
+once per viewer. The store keeps transcripts and dashboard facts in
+uncompressed Arrow IPC (Feather v2) files:
+
+    salesloft_store/
+        facts.arrow          dashboard facts, tagged with the data version
+        active.json          pointer to the snapshot the dashboard serves
+        snapshots/
+            snapshot-<time>/ immutable facts.arrow and transcripts.arrow
+                             (mirrored transcripts, newest first)
+
+Tables are opened with pyarrow.memory_map(): opening reads only the schema
+and batch offsets, and column buffers point straight into the mapped file, so
+there is no parse step and every session (and process) reading the same file
+shares the same page-cache pages instead of holding its own copy.
+
+Files are written to a temporary name and swapped in with os.replace();
+sessions that still have the old file mapped keep reading it until they
+reopen. metrics_pipeline.py publishes facts.arrow after each update; the
+dashboard only reads the store.
+
+Snapshots are written once into a new directory and only then made active by
+atomically replacing active.json, so a reader sees either the old or the new
+snapshot, never a half-built one. The previous snapshot is kept for sessions
+still rendering from it; older ones are removed. refresh_scheduler.py builds
+snapshots in the background.
+
+Usage:
+    python shared_store.py publish            # snapshot of the metrics and mirror
+    python shared_store.py status
+
+    table = open_table(TRANSCRIPTS_TABLE)     # zero-copy pyarrow.Table
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from transcript_mirror import MIRROR_COLUMNS, MIRROR_DIR, partition_paths
+
+STORE_DIR = os.environ.get("SFCC_STORE_DIR", "salesloft_store")
+
+FACTS_TABLE = "facts"
+TRANSCRIPTS_TABLE = "transcripts"
+
+# Schema metadata key holding the version a table was published from
+VERSION_KEY = b"sfcc_version"
+
+SNAPSHOTS_DIR = "snapshots"
+SNAPSHOT_PREFIX = "snapshot-"
+ACTIVE_FILE = "active.json"
+
+
+def table_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f"{name}.arrow")
+
+
+def _with_version(schema, version):
+    return schema.with_metadata({**(schema.metadata or {}), VERSION_KEY: str(version).encode()})
+
+
+def write_table(name, data, version, store_dir=STORE_DIR):
+    """
+    Publish a table to the store
+
+    Args:
+        name (str): Table name
+        data (pyarrow.Table or pandas.DataFrame): Rows to publish
+        version (str): Version of the source data, returned by table_version()
+        store_dir (str): Store directory
+
+    Returns:
+        str: Path of the published file
+    """
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    os.makedirs(store_dir, exist_ok=True)
+    path = table_path(name, store_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    # No compression: compressed buffers would have to be decoded into memory
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, _with_version(table.schema, version)) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_table(name, store_dir=STORE_DIR):
+    """
+    Open a published table without reading its data
+
+    Args:
+        name (str): Table name
+        store_dir (str): Store directory
+
+    Returns:
+        pyarrow.Table: Columns backed by the memory-mapped file, None if the
+        table has not been published
+    """
+    path = table_path(name, store_dir)
+    if not os.path.exists(path):
+        return None
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def table_version(name, store_dir=STORE_DIR):
+    """
+    Version a table was published from
+
+    Args:
+        name (str): Table name
+        store_dir (str): Store directory
+
+    Returns:
+        str: Version, None if the table has not been published
+    """
+    path = table_path(name, store_dir)
+    if not os.path.exists(path):
+        return None
+    with pa.memory_map(path, "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    version = metadata.get(VERSION_KEY)
+    return version.decode() if version is not None else None
+
+
+def mirror_version(days_back=None, mirror_dir=MIRROR_DIR):
+    """
+    Identifier of the mirror's current contents
+
+    Args:
+        days_back (int): Only days inside this window, all if None
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        str: Changes whenever a partition is added, rewritten or removed
+    """
+    partitions = partition_paths(days_back, mirror_dir)
+    latest = max((os.path.getmtime(path) for _, path in partitions), default=0)
+    newest = partitions[0][0] if partitions else None
+    return f"mirror-{newest}-{len(partitions)}-{latest:.6f}"
+
+
+def publish_transcripts(days_back=None, columns=None, mirror_dir=MIRROR_DIR, store_dir=STORE_DIR):
+    """
+    Publish mirrored transcripts to the store, one partition at a time
+
+    Args:
+        days_back (int): Only days inside this window, all if None
+        columns (list): Columns to publish, all mirror columns if None
+        mirror_dir (str): Root directory of the mirror
+        store_dir (str): Store directory
+
+    Returns:
+        int: Rows published, None if the mirror is empty
+    """
+    partitions = partition_paths(days_back, mirror_dir)
+    if not partitions:
+        print(f"No mirrored partitions in {mirror_dir}. Run 'python transcript_mirror.py sync' first.")
+        return None
+    columns = list(columns or MIRROR_COLUMNS)
+    # Days are written with their own inferred types (a day without joined
+    # conversations has null-typed columns), so promote across all of them
+    schema = pa.unify_schemas([pq.read_schema(path).remove_metadata() for _, path in partitions],
+                              promote_options="permissive")
+    schema = pa.schema([schema.field(column) for column in columns])
+
+    os.makedirs(store_dir, exist_ok=True)
+    path = table_path(TRANSCRIPTS_TABLE, store_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    rows = 0
+    # Partitions are newest day first and each is sorted newest first
+    with pa.OSFile(tmp_path, "wb") as sink, \
+            pa.ipc.new_file(sink, _with_version(schema, mirror_version(days_back, mirror_dir))) as writer:
+        for _, partition in partitions:
+            table = pq.read_table(partition, columns=columns).cast(schema)
+            writer.write_table(table)
+            rows += table.num_rows
+    os.replace(tmp_path, path)
+    return rows
+
+
+def snapshot_dir(snapshot, store_dir=STORE_DIR):
+    return os.path.join(store_dir, SNAPSHOTS_DIR, snapshot)
+
+
+def active_snapshot(store_dir=STORE_DIR):
+    """
+    Snapshot the dashboard currently serves
+
+    Args:
+        store_dir (str): Store directory
+
+    Returns:
+        dict: snapshot (name, also the dashboard data version),
+        source_version, transcripts (rows, None if not published),
+        created_at, previous and any details given to publish_snapshot();
+        None if no snapshot has been published
+    """
+    path = os.path.join(store_dir, ACTIVE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _prune_snapshots(keep, store_dir=STORE_DIR):
+    """Remove snapshots older than the oldest kept one"""
+    root = os.path.join(store_dir, SNAPSHOTS_DIR)
+    oldest = min(keep)
+    for name in os.listdir(root):
+        # Names sort by creation time; newer ones may still be being written
+        if name.startswith(SNAPSHOT_PREFIX) and name < oldest:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def publish_snapshot(facts, source_version, transcripts=True, days_back=None, details=None,
+                     mirror_dir=MIRROR_DIR, store_dir=STORE_DIR):
+    """
+    Write a new immutable snapshot and make it the active one
+
+    The active snapshot is only replaced once the new one is complete; if
+    writing fails, the partial snapshot is removed and the error raised.
+
+    Args:
+        facts (pandas.DataFrame): Dashboard facts
+        source_version (str): Version of the data the facts were derived from
+        transcripts (bool): Also publish the mirrored transcripts
+        days_back (int): Only transcripts inside this window, all if None
+        details (dict): Extra fields recorded in the snapshot pointer
+        mirror_dir (str): Root directory of the mirror
+        store_dir (str): Store directory
+
+    Returns:
+        dict: The new active_snapshot()
+    """
+    created_at = datetime.now(timezone.utc)
+    snapshot = f"{SNAPSHOT_PREFIX}{created_at:%Y%m%dT%H%M%S%fZ}"
+    directory = snapshot_dir(snapshot, store_dir)
+    try:
+        write_table(FACTS_TABLE, facts, snapshot, directory)
+        rows = publish_transcripts(days_back, mirror_dir=mirror_dir, store_dir=directory) if transcripts else None
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    previous = active_snapshot(store_dir)
+    info = {
+        **(details or {}),
+        "snapshot": snapshot,
+        "source_version": source_version,
+        "transcripts": rows,
+        "created_at": created_at.isoformat(),
+        "previous": previous["snapshot"] if previous else None,
+    }
+    path = os.path.join(store_dir, ACTIVE_FILE)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(info, f, indent=2)
+    # The swap: readers see the old pointer or the new one, never a partial file
+    os.replace(tmp_path, path)
+    _prune_snapshots([name for name in (snapshot, info["previous"]) if name], store_dir)
+    return info
+
+
+def main():
+    from metrics_pipeline import MetricsPipeline, metrics_version
+
+    parser = argparse.ArgumentParser(description="Memory-mapped Arrow store shared by dashboard sessions")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    publish_parser = subparsers.add_parser("publish", help="Publish the current metrics and mirror as a snapshot")
+    publish_parser.add_argument("--days-back", type=int, default=None, help="Only publish recent transcripts")
+    publish_parser.add_argument("--facts-only", action="store_true", help="Skip the transcripts")
+    subparsers.add_parser("status", help="Show the active snapshot")
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        facts = MetricsPipeline().load_facts()
+        if facts.empty:
+            print("No metrics to publish. Run 'python metrics_pipeline.py update' first.")
+            return
+        info = publish_snapshot(facts, metrics_version(), transcripts=not args.facts_only, days_back=args.days_back)
+        print(f"Published {info['snapshot']} ({len(facts)} facts, {info['transcripts'] or 0} transcripts)")
+    else:
+        info = active_snapshot()
+        if info is None:
+            print("No snapshot published")
+            return
+        print(f"Active: {info['snapshot']} from {info['source_version']}, created {info['created_at']}")
+        for name in (FACTS_TABLE, TRANSCRIPTS_TABLE):
+            directory = snapshot_dir(info["snapshot"])
+            table = open_table(name, directory)
+            if table is None:
+                print(f"{name}: not published")
+                continue
+            size = os.path.getsize(table_path(name, directory)) / 2 ** 20
+            print(f"{name}: {table.num_rows} rows, {size:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,149 @@
 from google.cloud import bigquery
-from google.api_core import retry
+from google.api_core import exceptions, retry
 
-def search_transcripts(search_term, days_back=30, location='US'):
+from dataset_location import discover_location, get_cached_location
+from query_planner import apply_budget, plan_query
+from transcript_mirror import mirror_covers
+from transcript_snippets import SNIPPET_QUERY, fetch_full_transcript, mirror_snippets, snippet_job_config
+
+def print_results(rows, search_term):
+    """
+    Print transcript search results with the excerpts around each match
+    
+    Args:
+        rows (iterable): Rows with created_at, account_name, owner_name and
+            matches (per-term match counts and snippets, see
+            transcript_snippets.py) attributes
+        search_term (str): Term that was searched for
+    
+    Returns:
+        list: The printed rows, so a full transcript can be fetched later
+    """
+    printed = []
+    
+    for row in rows:
+        printed.append(row)
+        print(f"[{len(printed)}] Date: {row.created_at}")
+        print(f"Account: {row.account_name}")
+        print(f"Owner: {row.owner_name}")
+        for match in row.matches:
+            print(f"Transcript excerpts ({match['match_count']} mentions of '{match['term']}'):")
+            for snippet in match['snippets']:
+                print(f"...{snippet}...")
+        print("-" * 80 + "\n")
+    
+    if not printed:
+        print("No matching transcripts found.")
+    return printed
+
+def print_mirror_results(search_term, days_back=30):
+    """
+    Search the local transcript mirror and print the results
+    
+    Args:
+        search_term (str): Term to search for in transcripts
+        days_back (int): How many days back to search
+    
+    Returns:
+        list: The printed rows
+    """
+    results = mirror_snippets([search_term], days_back=days_back, limit=10)
+    print(f"\nResults for search term '{search_term}' (local mirror):\n")
+    return print_results(results.itertuples(index=False), search_term)
+
+def search_transcripts(search_term, days_back=30, location='US', use_mirror=True):
     """
     Simple function to search Salesloft transcripts
     
     Args:
         search_term (str): Term to search for in transcripts
         days_back (int): How many days back to search
-        location (str): Dataset location (e.g., 'US', 'EU', 'US-CENTRAL1')
+        location (str): Dataset location (e.g., 'US', 'EU', 'US-CENTRAL1').
+            The default 'US' uses the discovered and cached dataset location
+            (see dataset_location.py)
+        use_mirror (bool): Answer from the local transcript mirror when it
+            covers the requested window (see transcript_mirror.py)
+    
+    Returns:
+        list: Result rows with call_uuid and created_at, for
+        fetch_full_transcript()
     """
-    # Initialize client with location
-    client = bigquery.Client(location=location)
+    if use_mirror and mirror_covers(days_back):
+        return print_mirror_results(search_term, days_back)
+
+    # 'US' is the default and means "use the discovered dataset location"
+    auto_location = location == 'US'
+    client = bigquery.Client()
+    if auto_location:
+        location = discover_location(client) or location
+    
+    # Only match counts and excerpts come back, not the full transcripts
+    query = SNIPPET_QUERY
+    job_config = apply_budget(snippet_job_config(
+        [search_term], days_back=days_back, limit=10,
+        use_query_cache=True,
+        labels={'purpose': 'salesloft_search'}
+    ))
     
-    # List of locations to try if the first one fails
-    locations = ['US', 'US-CENTRAL1', 'EU', 'NA'] if location == 'US' else [location]
+    # Execute query, retrying only transient errors and for a bounded time
+    @retry.Retry(predicate=retry.if_transient_error, timeout=120)
+    def run_with_retry(try_location):
+        query_job = client.query(
+            query,
+            job_config=job_config,
+            location=try_location
+        )
+        return query_job.result()
     
-    for try_location in locations:
+    for attempt in range(2):
         try:
-            # Set job config with location
-            job_config = bigquery.QueryJobConfig(
-                use_query_cache=True,
-                labels={'purpose': 'salesloft_search'}
-            )
-            
-            query = f"""
-            SELECT 
-                t.created_at,
-                t.transcript_text,
-                c.account_name,
-                c.owner_name
-            FROM `shopify-dw.raw_salesloft.transcriptions` t
-            LEFT JOIN `shopify-dw.raw_salesloft.conversations` c
-            ON t.call_uuid = c.call_uuid
-            WHERE t.created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL {days_back} DAY)
-            AND LOWER(t.transcript_text) LIKE LOWER('%{search_term}%')
-            ORDER BY t.created_at DESC
-            LIMIT 10
-            """
-            
-            # Execute query with retry
-            @retry.Retry(predicate=retry.if_exception_type(Exception))
-            def run_with_retry():
-                query_job = client.query(
-                    query,
-                    job_config=job_config,
-                    location=try_location
-                )
-                return query_job.result()
-            
-            results = run_with_retry()
-            
-            # If we get here, the query succeeded
-            print(f"\nResults for search term '{search_term}' (location: {try_location}):\n")
-            result_count = 0
-            
-            for row in results:
-                result_count += 1
-                print(f"Date: {row.created_at}")
-                print(f"Account: {row.account_name}")
-                print(f"Owner: {row.owner_name}")
-                print("Transcript excerpt:")
-                transcript = row.transcript_text.lower()
-                term_pos = transcript.find(search_term.lower())
-                start = max(0, term_pos - 100)
-                end = min(len(transcript), term_pos + 100)
-                print(f"...{transcript[start:end]}...")
-                print("-" * 80 + "\n")
-            
-            if result_count == 0:
-                print("No matching transcripts found.")
-            
-            # If we get here without exception, we found the right location
-            return
+            # Dry-run first so oversized scans never reach the warehouse
+            plan = plan_query(client, query, job_config=job_config, location=location, days_back=days_back)
+            print(plan.summary())
+            if not plan.within_budget:
+                if use_mirror and plan.mirror_fallback:
+                    print("Answering from the local mirror instead (it may be stale)")
+                    return print_mirror_results(search_term, days_back)
+                return []
             
+            results = run_with_retry(location)
+            print(f"\nResults for search term '{search_term}' (location: {location}):\n")
+            return print_results(results, search_term)
+        except exceptions.NotFound as e:
+            # A stale cached location surfaces as "dataset not found in location"
+            if auto_location and attempt == 0:
+                print(f"Dataset not found in location {location}, rediscovering location...")
+                location = discover_location(client, refresh=True) or location
+                continue
+            error = e
         except Exception as e:
-            if try_location == locations[-1]:
-                print(f"Error executing query in all locations: {str(e)}")
-                print("Please ensure you have:")
-                print("1. Proper authentication (run 'gcloud auth application-default login')")
-                print("2. Access to the shopify-dw project")
-                print("3. Permissions for the raw_salesloft dataset")
-            else:
-                print(f"Failed in location {try_location}, trying next location...")
+            error = e
+        
+        print(f"Error executing query in location {location}: {str(error)}")
+        print("Please ensure you have:")
+        print("1. Proper authentication (run 'gcloud auth application-default login')")
+        print("2. Access to the shopify-dw project")
+        print("3. Permissions for the raw_salesloft dataset")
+        return []
 
 if __name__ == "__main__":
     # Example usage
     search_term = input("Enter search term: ")
     days = int(input("How many days back to search (default 30): ") or "30")
     location = input("Enter dataset location (default US): ") or "US"
-    search_transcripts(search_term, days, location) 
\ No newline at end of file
+    rows = search_transcripts(search_term, days, location)
+    
+    # Full transcripts are only downloaded on request
+    while rows:
+        choice = input("Show full transcript for result number (Enter to quit): ")
+        if not choice:
+            break
+        if not choice.isdigit() or not 1 <= int(choice) <= len(rows):
+            print(f"Enter a number between 1 and {len(rows)}")
+            continue
+        row = rows[int(choice) - 1]
+        transcript = fetch_full_transcript(
+            row.call_uuid, created_at=row.created_at,
+            location=get_cached_location() if location == 'US' else location
+        )
+        print(transcript if transcript else "Transcript not found.")
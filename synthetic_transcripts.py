@@ -0,0 +1,177 @@
+"""
+Deterministic synthetic Salesloft transcripts for benchmarks
+
+Produces rows with the columns the search modules select (MIRROR_COLUMNS),
+with transcripts assembled from sentences that mention SFCC, the analysis
+keywords, pain-point categories and industries at realistic rates. The same
+seed always gives the same rows; timestamps are offsets back from `end`, newest
+row first.
+
+Rows are generated in fixed chunks of CHUNK_ROWS, each from its own seeded
+generator, so 10M rows can be streamed (or written to a mirror) without
+holding them all in memory.
+
+Usage:
+    for chunk in iter_synthetic_transcripts(100000, seed=0):
+        ...
+
+    python synthetic_transcripts.py 1000000 --mirror-dir /tmp/bench_mirror
+"""
+import argparse
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from sfcc_data import analysis_methodology, industries, pain_points
+from transcript_mirror import MIRROR_COLUMNS, _write_partitions, _write_watermark
+
+CHUNK_ROWS = 10000
+
+# Transcript length in sentences
+MIN_SENTENCES = 10
+MAX_SENTENCES = 60
+
+ACCOUNTS_PER_ROW = 0.05
+OWNERS = 50
+
+_TEMPLATES = [
+    "We have been on {product} for a few years now and the {pain} keeps coming up.",
+    "Honestly the {strength} side of {product} is fine for our {industry} business.",
+    "Our {industry} team says {product} is {pain_adjective} to maintain.",
+    "The {category} piece is the main reason we are looking at alternatives.",
+    "I would not say {product} is {strength}, it is more of a {pain} for us.",
+    "Can you walk me through how you handle {category} for {industry} customers?",
+    "That sounds {strength_adjective}, we really need something more {strength}.",
+]
+
+_FILLER = [
+    "Thanks for making the time today.",
+    "Let me share my screen for a second.",
+    "Can everyone hear me okay?",
+    "We can follow up with a deck after this call.",
+    "I will loop in our solutions engineer next week.",
+    "Does Thursday at two work for the next session?",
+    "Sorry, I was on mute.",
+    "Let me check with the rest of the team and get back to you.",
+]
+
+
+def _sentence_pool(rng, size=2000):
+    """Sentences mixing the analysis vocabulary into the templates"""
+    vocabulary = {
+        "product": ["SFCC", "Salesforce Commerce Cloud", "Commerce Cloud", "the current platform"],
+        "pain": analysis_methodology["pain_point_keywords"],
+        "pain_adjective": ["expensive", "complex", "slow", "difficult", "complicated"],
+        "strength": analysis_methodology["strength_keywords"],
+        "strength_adjective": ["great", "good", "powerful", "reliable", "flexible"],
+        "industry": industries,
+        "category": list(pain_points),
+    }
+    pool = []
+    for _ in range(size):
+        template = _TEMPLATES[rng.integers(len(_TEMPLATES))]
+        pool.append(template.format(**{key: values[rng.integers(len(values))] for key, values in vocabulary.items()}))
+    return np.array(pool + _FILLER * (size // len(_FILLER) // 2), dtype=object)
+
+
+def _chunk(chunk_index, rows, n_total, seed, days, end, pool):
+    rng = np.random.default_rng([seed, chunk_index])
+    first_row = chunk_index * CHUNK_ROWS
+    n_accounts = max(1, int(n_total * ACCOUNTS_PER_ROW))
+
+    lengths = rng.integers(MIN_SENTENCES, MAX_SENTENCES + 1, rows)
+    sentence_ids = rng.integers(0, len(pool), int(lengths.sum()))
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    texts = [" ".join(pool[sentence_ids[bounds[i]:bounds[i + 1]]]) for i in range(rows)]
+
+    # Rows run newest to oldest, so every chunk covers a contiguous time range
+    offsets = (first_row + np.arange(rows) + rng.random(rows)) / n_total * days * 86400
+    accounts = rng.integers(0, n_accounts, rows)
+    return pd.DataFrame({
+        "created_at": pd.to_datetime(end, utc=True) - pd.to_timedelta(offsets, unit="s"),
+        "transcript_text": texts,
+        "call_uuid": [str(uuid.UUID(bytes=rng.bytes(16), version=4)) for _ in range(rows)],
+        "duration_seconds": rng.integers(300, 3600, rows),
+        "opportunity_id": [f"006{first_row + i:012d}" for i in range(rows)],
+        "account_name": [f"{industries[a % len(industries)]} Account {a:07d}" for a in accounts],
+        "owner_name": [f"Rep {o:03d}" for o in rng.integers(0, OWNERS, rows)],
+    })[MIRROR_COLUMNS]
+
+
+def iter_synthetic_transcripts(n, seed=0, days=365, end=None):
+    """
+    Synthetic transcript rows in chunks of CHUNK_ROWS
+
+    Args:
+        n (int): Total rows
+        seed (int): Seed; the same seed gives the same rows
+        days (int): Spread of created_at back from `end`
+        end (datetime): Latest timestamp, start of today (UTC) if None
+
+    Yields:
+        pandas.DataFrame: MIRROR_COLUMNS rows
+    """
+    if end is None:
+        end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    pool = _sentence_pool(np.random.default_rng(seed))
+    for chunk_index, first_row in enumerate(range(0, n, CHUNK_ROWS)):
+        yield _chunk(chunk_index, min(CHUNK_ROWS, n - first_row), n, seed, days, end, pool)
+
+
+def synthetic_transcripts(n, seed=0, days=365, end=None):
+    """All rows of iter_synthetic_transcripts() in one frame"""
+    return pd.concat(list(iter_synthetic_transcripts(n, seed, days, end)), ignore_index=True)
+
+
+def write_synthetic_mirror(n, mirror_dir, seed=0, days=365):
+    """
+    Write synthetic transcripts as a transcript mirror
+
+    Args:
+        n (int): Total rows
+        mirror_dir (str): Mirror root to create
+        seed (int): Seed of the rows
+        days (int): Days of history
+
+    Returns:
+        int: Rows written
+    """
+    end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    # Chunks are in time order, so only the day spanning two chunks is carried over
+    carry = None
+    for chunk in iter_synthetic_transcripts(n, seed, days, end):
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        days_in_chunk = chunk["created_at"].dt.date
+        last_day = days_in_chunk.iloc[-1]
+        _write_partitions(chunk[days_in_chunk != last_day], mirror_dir)
+        carry = chunk[days_in_chunk == last_day]
+    if carry is not None:
+        _write_partitions(carry, mirror_dir)
+    _write_watermark(end - timedelta(days=days), datetime.now(timezone.utc), mirror_dir)
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic Salesloft transcripts")
+    parser.add_argument("rows", type=int, help="Number of transcripts")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default 0)")
+    parser.add_argument("--days", type=int, default=365, help="Days of history (default 365)")
+    parser.add_argument("--mirror-dir", help="Write a transcript mirror here")
+    parser.add_argument("--output", help="Write a parquet file here")
+    args = parser.parse_args()
+
+    if args.mirror_dir:
+        write_synthetic_mirror(args.rows, args.mirror_dir, args.seed, args.days)
+        print(f"Wrote {args.rows} transcripts to mirror {args.mirror_dir}")
+    elif args.output:
+        synthetic_transcripts(args.rows, args.seed, args.days).to_parquet(args.output, index=False)
+        print(f"Wrote {args.rows} transcripts to {args.output}")
+    else:
+        print(synthetic_transcripts(min(args.rows, 5), args.seed, args.days).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Server-side paginated, sortable, filterable tables for the dashboard
+
+st.dataframe serializes every row it is given to the browser on every rerun.
+paginated_table() keeps the table server-side as a pyarrow Table and sends
+one page at a time:
+
+    filter   column filters (text contains, numeric / date ranges) evaluated
+             with pyarrow.compute into a row selection
+    sort     only the sort column is gathered and sorted; the result is the
+             row order, not a sorted copy of the table
+    page     a zero-copy slice of the table (or a take() of one page of row
+             indices) handed to st.dataframe as Arrow
+
+The Arrow table and the row order are cached per table key, sort and filter
+state, so paging through a table with millions of rows only costs the
+page slice.
+
+Usage:
+    paginated_table("industry", current_industry_data, key=(data_version, industries))
+"""
+import math
+from datetime import timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import streamlit as st
+
+from dashboard_data import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+
+PAGE_SIZES = [50, 100, 500, 1000]
+DEFAULT_PAGE_SIZE = 100
+
+NO_SORT = "(none)"
+
+
+def _column_kind(arrow_type):
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+        return "number"
+    if pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+        return "date"
+    return "text"
+
+
+def _scalar(value, arrow_type):
+    # Dates from st.date_input compare against timestamp columns at midnight
+    if pa.types.is_timestamp(arrow_type):
+        return pa.scalar(pd.Timestamp(value).to_pydatetime()).cast(arrow_type)
+    return value
+
+
+def _sort_keys(values):
+    """Values Arrow can sort: codes of ordered categoricals, decoded labels otherwise"""
+    if not pa.types.is_dictionary(values.type):
+        return values
+    if not values.type.ordered:
+        return pc.cast(values, values.type.value_type)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.unify_dictionaries()
+        return pa.chunked_array([chunk.indices for chunk in values.chunks], type=values.type.index_type)
+    return values.indices
+
+
+def row_selection(table, filters=(), sort_by=None, descending=False):
+    """
+    Rows of a table that pass the filters, in sort order
+
+    Args:
+        table (pyarrow.Table): Table to view
+        filters (tuple): (column, op, value) triples; op is "contains"
+            (case-insensitive), ">=", "<=" or "<"
+        sort_by (str): Column to sort on, table order if None
+        descending (bool): Sort direction (nulls always last); ordered
+            categoricals sort in category order
+
+    Returns:
+        pyarrow.Array: Row indices, or None for all rows in table order
+    """
+    mask = None
+    for column, op, value in filters:
+        values = table[column]
+        if op == "contains":
+            condition = pc.match_substring(pc.cast(values, pa.string()), value, ignore_case=True)
+        else:
+            compare = {">=": pc.greater_equal, "<=": pc.less_equal, "<": pc.less}[op]
+            condition = compare(values, _scalar(value, values.type))
+        condition = pc.fill_null(condition, False)
+        mask = condition if mask is None else pc.and_(mask, condition)
+
+    indices = None if mask is None else pc.indices_nonzero(mask)
+    if sort_by is None:
+        return indices
+    keys = _sort_keys(table[sort_by] if indices is None else pc.take(table[sort_by], indices))
+    order = pc.array_sort_indices(keys, order="descending" if descending else "ascending", null_placement="at_end")
+    return order if indices is None else pc.take(indices, order)
+
+
+def page_of(table, indices, page, page_size):
+    """
+    One page of a table
+
+    Args:
+        table (pyarrow.Table): Table to view
+        indices (pyarrow.Array): Row selection from row_selection()
+        page (int): Page number, from 0
+        page_size (int): Rows per page
+
+    Returns:
+        pyarrow.Table: At most page_size rows
+    """
+    offset = page * page_size
+    if indices is None:
+        return table.slice(offset, page_size)
+    return table.take(indices.slice(offset, page_size))
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def _arrow_table(name, key, _df):
+    """Arrow copy of a frame, converted once per table key"""
+    if isinstance(_df, pa.Table):
+        return _df
+    return pa.Table.from_pandas(_df, preserve_index=False)
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES)
+def _cached_selection(name, key, filters, sort_by, descending, _table):
+    """Row selection of a cached table per filter and sort state"""
+    return row_selection(_table, filters, sort_by, descending)
+
+
+def _filter_widgets(name, table):
+    """Column filter inputs; returns the (column, op, value) triples set"""
+    filters = []
+    columns = st.columns(len(table.column_names))
+    for container, column in zip(columns, table.column_names):
+        kind = _column_kind(table[column].type)
+        widget_key = f"{name}_filter_{column}"
+        if kind == "text":
+            text = container.text_input(column, key=widget_key, placeholder="contains...")
+            if text:
+                filters.append((column, "contains", text))
+        elif kind == "number":
+            low = container.number_input(f"{column} ≥", value=None, key=f"{widget_key}_min")
+            high = container.number_input(f"{column} ≤", value=None, key=f"{widget_key}_max")
+            if low is not None:
+                filters.append((column, ">=", low))
+            if high is not None:
+                filters.append((column, "<=", high))
+        else:
+            low = container.date_input(f"{column} from", value=None, key=f"{widget_key}_min")
+            high = container.date_input(f"{column} to", value=None, key=f"{widget_key}_max")
+            if low is not None:
+                filters.append((column, ">=", low))
+            if high is not None:
+                # Inclusive of the whole end day
+                filters.append((column, "<", high + timedelta(days=1)))
+    return tuple(filters)
+
+
+def paginated_table(name, df, key):
+    """
+    Show a table one page at a time with server-side sort and filters
+
+    Args:
+        name (str): Table name, unique on the page (prefixes widget keys)
+        df (pandas.DataFrame or pyarrow.Table): Table to show; Arrow
+            tables (e.g. memory-mapped ones) are used as they are
+        key (tuple): Identifies the contents of `df` (data version, filter
+            state...); cached conversions and row orders are reused while
+            it is unchanged
+    """
+    table = _arrow_table(name, key, df)
+    with st.expander("Sort & filter", expanded=False):
+        sort_column, direction = st.columns([3, 1])
+        sort_by = sort_column.selectbox("Sort by", [NO_SORT] + table.column_names, key=f"{name}_sort")
+        descending = direction.checkbox("Descending", key=f"{name}_descending")
+        filters = _filter_widgets(name, table)
+
+    sort_by = None if sort_by == NO_SORT else sort_by
+    indices = _cached_selection(name, key, filters, sort_by, descending, table)
+    rows = table.num_rows if indices is None else len(indices)
+
+    size_column, page_column, info_column = st.columns([1, 1, 3])
+    page_size = size_column.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
+                                      key=f"{name}_page_size")
+    pages = max(1, math.ceil(rows / page_size))
+    # Not bounded by max_value: a narrower filter can leave a stale page number behind
+    page = page_column.number_input("Page", min_value=1, value=1, step=1, key=f"{name}_page")
+    page = min(page, pages) - 1
+
+    first = page * page_size
+    filtered = f" (filtered from {table.num_rows:,})" if rows != table.num_rows else ""
+    info_column.caption(f"Rows {min(first + 1, rows):,}–{min(first + page_size, rows):,} of {rows:,}{filtered}, "
+                        f"page {page + 1} of {pages}")
+    st.dataframe(page_of(table, indices, page, page_size), use_container_width=True, hide_index=True)
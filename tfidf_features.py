@@ -0,0 +1,255 @@
+"""
+Out-of-core hashed TF-IDF features for transcripts
+
+Implements the "TF-IDF vectorization with n-gram range (1,3)" and "custom
+feature weights for domain-specific terms" steps of the sentiment methodology
+without a vocabulary: every 1-3-gram is hashed into N_FEATURES columns, so
+memory is fixed by N_FEATURES and the chunk size, never by the corpus.
+
+Two streaming passes over the transcripts:
+
+    1. each chunk is turned into a hashed term-count matrix, written to disk,
+       and its document frequencies are added to a single N_FEATURES array
+    2. once IDF is known, each chunk is reloaded, IDF-weighted, L2-normalized
+       and written out as the final TF-IDF chunk
+
+    salesloft_features/
+        manifest.json          parameters, document count, chunk list
+        idf.npy                IDF per hashed column
+        chunk-00001.npz        TF-IDF rows of one chunk (CSR)
+        ...
+
+Chunks are CSR matrices in the scipy.sparse.save_npz layout (data, indices,
+indptr, format, shape) plus `row_ids` with the call_uuid of each row, so
+`scipy.sparse.load_npz` reads them directly.
+
+Usage:
+    python tfidf_features.py build --days-back 90
+"""
+import argparse
+import json
+import os
+import zlib
+
+import numpy as np
+
+from sfcc_data import analysis_methodology
+from transcript_index import tokenize
+from transcript_mirror import MIRROR_DIR, iter_mirror_batches
+
+FEATURES_DIR = os.environ.get("SALESLOFT_FEATURES_DIR", "salesloft_features")
+MANIFEST_FILE = "manifest.json"
+IDF_FILE = "idf.npy"
+
+N_FEATURES = 2 ** 20
+NGRAM_RANGE = (1, 3)
+CHUNK_SIZE = 1000
+
+# Multiplier for n-grams containing a strength or pain-point keyword
+DOMAIN_WEIGHT = 2.0
+
+# Mixing constants for combining token hashes into n-gram hashes
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_NGRAM_SALT = 0xC2B2AE3D27D4EB4F
+
+
+def domain_terms():
+    """Strength and pain-point keywords from analysis_methodology"""
+    return set(analysis_methodology["strength_keywords"]) | set(analysis_methodology["pain_point_keywords"])
+
+
+class HashedNgramCounter:
+    """
+    Stateless hashed n-gram term counts
+
+    Args:
+        n_features (int): Number of hashed columns
+        ngram_range (tuple): Smallest and largest n-gram length
+        domain_weight (float): Multiplier for n-grams with a domain term
+        domain_vocabulary (set): Domain terms, domain_terms() if None
+    """
+
+    def __init__(self, n_features=N_FEATURES, ngram_range=NGRAM_RANGE, domain_weight=DOMAIN_WEIGHT,
+                 domain_vocabulary=None):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.domain_weight = domain_weight
+        self.domain_vocabulary = domain_terms() if domain_vocabulary is None else set(domain_vocabulary)
+
+    def _token_arrays(self, texts):
+        """Token hashes, domain flags and document row of every token"""
+        tokenized = [tokenize(text) if text else [] for text in texts]
+        lengths = np.fromiter((len(tokens) for tokens in tokenized), dtype=np.int64, count=len(tokenized))
+        # crc32 is stable across processes, unlike hash()
+        token_hashes = {}
+        hashes, flags = [], []
+        for tokens in tokenized:
+            for token in tokens:
+                cached = token_hashes.get(token)
+                if cached is None:
+                    cached = token_hashes[token] = (zlib.crc32(token.encode()), token in self.domain_vocabulary)
+                hashes.append(cached[0])
+                flags.append(cached[1])
+        rows = np.repeat(np.arange(len(texts)), lengths)
+        return np.array(hashes, dtype=np.uint64), np.array(flags, dtype=bool), rows
+
+    def counts(self, texts):
+        """
+        Hashed, domain-weighted n-gram counts of a chunk of documents
+
+        Args:
+            texts (list): Document texts
+
+        Returns:
+            tuple: CSR arrays (data, indices, indptr) with one row per text,
+            columns sorted within each row
+        """
+        hashes, flags, rows = self._token_arrays(texts)
+        keys, weights = [], []
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            count = len(hashes) - n + 1
+            if count <= 0:
+                continue
+            combined = hashes[:count] ^ np.uint64((_NGRAM_SALT * n) % 2 ** 64)
+            has_domain_term = flags[:count].copy()
+            for offset in range(1, n):
+                combined = combined * _HASH_MULTIPLIER + hashes[offset:offset + count]
+                has_domain_term |= flags[offset:offset + count]
+            # N-grams must not span two documents
+            valid = rows[:count] == rows[n - 1:n - 1 + count]
+            columns = (combined[valid] % np.uint64(self.n_features)).astype(np.int64)
+            keys.append(rows[:count][valid] * self.n_features + columns)
+            weights.append(np.where(has_domain_term[valid], self.domain_weight, 1.0))
+
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        if not keys:
+            return np.zeros(0), np.zeros(0, dtype=np.int32), indptr
+        unique_keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+        data = np.bincount(inverse, weights=np.concatenate(weights))
+        np.cumsum(np.bincount(unique_keys // self.n_features, minlength=len(texts)), out=indptr[1:])
+        return data, (unique_keys % self.n_features).astype(np.int32), indptr
+
+
+def _save_csr(path, data, indices, indptr, n_features, row_ids):
+    tmp_path = path + ".tmp.npz"
+    np.savez_compressed(
+        tmp_path, data=data, indices=indices, indptr=indptr,
+        format=np.array("csr"), shape=np.array([len(indptr) - 1, n_features]),
+        row_ids=np.asarray(row_ids, dtype=str)
+    )
+    os.replace(tmp_path, path)
+
+
+def load_chunk(path):
+    """
+    Read one feature chunk
+
+    Args:
+        path (str): Chunk file
+
+    Returns:
+        dict: data, indices, indptr, shape and row_ids arrays
+    """
+    with np.load(path) as chunk:
+        return {key: chunk[key] for key in ("data", "indices", "indptr", "shape", "row_ids")}
+
+
+def build_features(batches, output_dir=FEATURES_DIR, n_features=N_FEATURES, ngram_range=NGRAM_RANGE,
+                   domain_weight=DOMAIN_WEIGHT):
+    """
+    Stream documents into TF-IDF chunks on disk
+
+    Args:
+        batches (iterable): (row_ids, texts) pairs, one per chunk
+        output_dir (str): Directory for the manifest, IDF and chunks
+        n_features (int): Number of hashed columns
+        ngram_range (tuple): Smallest and largest n-gram length
+        domain_weight (float): Multiplier for n-grams with a domain term
+
+    Returns:
+        dict: The manifest written to output_dir
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    for name in os.listdir(output_dir):
+        if name.startswith("chunk-") and name.endswith(".npz"):
+            os.remove(os.path.join(output_dir, name))
+    counter = HashedNgramCounter(n_features, ngram_range, domain_weight)
+    document_frequency = np.zeros(n_features, dtype=np.int64)
+    n_documents = 0
+    chunks = []
+
+    # Pass 1: term counts per chunk and document frequencies
+    for row_ids, texts in batches:
+        data, indices, indptr = counter.counts(texts)
+        document_frequency += np.bincount(indices, minlength=n_features)
+        n_documents += len(texts)
+        name = f"chunk-{len(chunks) + 1:05d}.npz"
+        _save_csr(os.path.join(output_dir, name), data, indices, indptr, n_features, row_ids)
+        chunks.append(name)
+
+    # Smoothed IDF, as in the usual TF-IDF definition
+    idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+    np.save(os.path.join(output_dir, IDF_FILE), idf)
+
+    # Pass 2: rewrite each chunk as L2-normalized TF-IDF
+    for name in chunks:
+        path = os.path.join(output_dir, name)
+        chunk = load_chunk(path)
+        data = chunk["data"] * idf[chunk["indices"]]
+        rows = np.repeat(np.arange(len(chunk["indptr"]) - 1), np.diff(chunk["indptr"]))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(chunk["indptr"]) - 1))
+        data = data / np.where(norms > 0, norms, 1.0)[rows]
+        _save_csr(path, data, chunk["indices"], chunk["indptr"], n_features, chunk["row_ids"])
+
+    manifest = {
+        "n_features": n_features,
+        "ngram_range": list(ngram_range),
+        "domain_weight": domain_weight,
+        "n_documents": n_documents,
+        "chunks": chunks,
+    }
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+def mirror_batches(days_back=90, chunk_size=CHUNK_SIZE, mirror_dir=MIRROR_DIR):
+    """
+    (call_uuid list, transcript_text list) chunks from the transcript mirror
+
+    Args:
+        days_back (int): How many days of transcripts to include
+        chunk_size (int): Transcripts per chunk
+        mirror_dir (str): Root directory of the mirror
+
+    Yields:
+        tuple: (row_ids, texts)
+    """
+    for batch in iter_mirror_batches(days_back=days_back, columns=["call_uuid", "transcript_text"],
+                                     batch_size=chunk_size, mirror_dir=mirror_dir):
+        yield batch.column("call_uuid").to_pylist(), batch.column("transcript_text").to_pylist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hashed TF-IDF features for mirrored transcripts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Rebuild the feature chunks from the mirror")
+    build_parser.add_argument("--days-back", type=int, default=90, help="How many days of transcripts (default 90)")
+    build_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                              help=f"Transcripts per chunk (default {CHUNK_SIZE})")
+    build_parser.add_argument("--n-features", type=int, default=N_FEATURES,
+                              help=f"Hashed feature columns (default {N_FEATURES})")
+    build_parser.add_argument("--output", default=FEATURES_DIR, help=f"Output directory (default {FEATURES_DIR})")
+    args = parser.parse_args()
+
+    manifest = build_features(
+        mirror_batches(args.days_back, args.chunk_size),
+        output_dir=args.output, n_features=args.n_features
+    )
+    print(f"Wrote {manifest['n_documents']} documents in {len(manifest['chunks'])} chunks to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+"""
+Positional inverted index over mirrored Salesloft transcripts
+
+Replaces the `LOWER(transcript_text) LIKE '%term%'` scans with term lookups and
+BM25 ranking. The index lives next to the transcript mirror:
+
+    salesloft_index/
+        manifest.json          segment list, corpus stats, indexed partitions
+        segment-00001.pkl      postings {term: {doc: positions}} for one append
+        ...
+
+Each `update_from_mirror()` run only reads mirror partitions that changed since
+the last run and appends their new transcripts as a fresh segment, so indexing
+cost is proportional to the new data rather than the corpus. Once there are
+more than MAX_SEGMENTS segments the smallest are merged into one. Mirror syncs
+and ranked_search() run the update, so queries never answer from a stale index.
+
+Query syntax:
+    sfcc migration                 both terms (AND)
+    bigcommerce OR shopify         either term
+    "commerce cloud" pricing       phrase AND term
+
+Usage:
+    python transcript_index.py update
+    python transcript_index.py search '"commerce cloud" OR sfcc' --top 20
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from transcript_mirror import MIRROR_COLUMNS, MIRROR_DIR, load_calls, partition_paths
+
+INDEX_DIR = os.environ.get("SALESLOFT_INDEX_DIR", "salesloft_index")
+MANIFEST_FILE = "manifest.json"
+
+# Segments kept before the smallest ones are merged
+MAX_SEGMENTS = 8
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# Indexes loaded by load_index(): {index_dir: (manifest stamp, TranscriptIndex)}
+_loaded = {}
+# Held while a cached index is updated or searched: a merge renumbers the
+# segments a running search is resolving (segment, doc) keys against
+_update_lock = threading.Lock()
+
+
+def tokenize(text):
+    """
+    Split text into lowercase alphanumeric tokens
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: Tokens in order of appearance
+    """
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def parse_query(query):
+    """
+    Parse a query string into OR-ed clauses of AND-ed terms/phrases
+
+    Args:
+        query (str): Query such as '"commerce cloud" migration OR sfcc'
+
+    Returns:
+        list: One list per OR clause, each holding token tuples (a single
+        term is a 1-tuple, a phrase holds several tokens)
+    """
+    clauses = [[]]
+    for phrase, word in QUERY_PATTERN.findall(query):
+        if word == "OR":
+            clauses.append([])
+            continue
+        if word == "AND":
+            continue
+        tokens = tuple(tokenize(phrase or word))
+        if tokens:
+            clauses[-1].append(tokens)
+    return [clause for clause in clauses if clause]
+
+
+class TranscriptIndex:
+    """
+    Segmented positional inverted index with BM25 top-k retrieval
+
+    Args:
+        index_dir (str): Directory holding the manifest and segments
+    """
+
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        self.manifest = self._read_manifest()
+        self.segments = [self._load_segment(name) for name in self.manifest["segments"]]
+        self.doc_ids = {
+            call_uuid
+            for segment in self.segments
+            for call_uuid in segment["call_uuid"]
+        }
+
+    # --- Persistence ---
+
+    def _read_manifest(self):
+        path = os.path.join(self.index_dir, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return {"segments": [], "doc_count": 0, "total_length": 0, "partitions": {}}
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        path = os.path.join(self.index_dir, MANIFEST_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _load_segment(self, name):
+        with open(os.path.join(self.index_dir, name), "rb") as f:
+            return pickle.load(f)
+
+    def _write_segment(self, segment):
+        """Write a segment under a new name and return the name"""
+        numbers = [int(name[len("segment-"):-len(".pkl")]) for name in self.manifest["segments"]]
+        name = f"segment-{max(numbers, default=0) + 1:05d}.pkl"
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(os.path.join(self.index_dir, name), "wb") as f:
+            pickle.dump(segment, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return name
+
+    @property
+    def doc_count(self):
+        return self.manifest["doc_count"]
+
+    @property
+    def avg_length(self):
+        return self.manifest["total_length"] / self.doc_count if self.doc_count else 0.0
+
+    # --- Indexing ---
+
+    def add_documents(self, df):
+        """
+        Append transcripts as a new segment, skipping already indexed calls
+
+        Args:
+            df (pandas.DataFrame): Rows with call_uuid, created_at and
+                transcript_text
+
+        Returns:
+            int: Number of transcripts added
+        """
+        df = df[~df["call_uuid"].isin(self.doc_ids)].drop_duplicates("call_uuid")
+        if df.empty:
+            return 0
+
+        postings = {}
+        lengths = array("I")
+        for local_id, text in enumerate(df["transcript_text"].fillna("")):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for position, token in enumerate(tokens):
+                doc_positions = postings.setdefault(token, {})
+                if local_id not in doc_positions:
+                    doc_positions[local_id] = array("I")
+                doc_positions[local_id].append(position)
+
+        created_at = pd.to_datetime(df["created_at"], utc=True)
+        segment = {
+            "call_uuid": df["call_uuid"].tolist(),
+            "created_at": array("q", created_at.dt.as_unit("ns").astype("int64").tolist()),
+            "length": lengths,
+            "postings": postings,
+        }
+
+        name = self._write_segment(segment)
+        self.segments.append(segment)
+        self.doc_ids.update(segment["call_uuid"])
+        self.manifest["segments"].append(name)
+        self.manifest["doc_count"] += len(lengths)
+        self.manifest["total_length"] += sum(lengths)
+        self._write_manifest()
+        self.merge_segments()
+        return len(lengths)
+
+    def merge_segments(self, max_segments=MAX_SEGMENTS):
+        """
+        Merge the smallest segments once there are more than `max_segments`
+
+        Half of the limit is left afterwards, so merges stay infrequent and
+        mostly rewrite the small segments appended by recent updates.
+
+        Args:
+            max_segments (int): Segments allowed before merging
+
+        Returns:
+            int: Number of segments merged, 0 if none
+        """
+        if len(self.segments) <= max_segments:
+            return 0
+        by_size = sorted(range(len(self.segments)), key=lambda i: len(self.segments[i]["length"]))
+        merging = sorted(by_size[:len(self.segments) - max_segments // 2])
+
+        merged = {"call_uuid": [], "created_at": array("q"), "length": array("I"), "postings": {}}
+        for i in merging:
+            segment = self.segments[i]
+            offset = len(merged["length"])
+            merged["call_uuid"].extend(segment["call_uuid"])
+            merged["created_at"].extend(segment["created_at"])
+            merged["length"].extend(segment["length"])
+            for token, doc_positions in segment["postings"].items():
+                target = merged["postings"].setdefault(token, {})
+                for local_id, positions in doc_positions.items():
+                    target[local_id + offset] = positions
+
+        name = self._write_segment(merged)
+        old_names = [self.manifest["segments"][i] for i in merging]
+        kept = [i for i in range(len(self.segments)) if i not in merging]
+        self.segments = [self.segments[i] for i in kept] + [merged]
+        self.manifest["segments"] = [self.manifest["segments"][i] for i in kept] + [name]
+        # The manifest switches to the merged segment before the old files go
+        self._write_manifest()
+        for old_name in old_names:
+            os.remove(os.path.join(self.index_dir, old_name))
+        return len(merging)
+
+    def update_from_mirror(self, mirror_dir=MIRROR_DIR):
+        """
+        Index transcripts from mirror partitions written since the last update
+
+        Args:
+            mirror_dir (str): Root directory of the transcript mirror
+
+        Returns:
+            int: Number of transcripts added
+        """
+        indexed = self.manifest["partitions"]
+        changed = []
+        for day, path in partition_paths(mirror_dir=mirror_dir):
+            mtime = os.path.getmtime(path)
+            if indexed.get(day.isoformat()) != mtime:
+                changed.append((day.isoformat(), path, mtime))
+        if not changed:
+            return 0
+
+        df = pd.concat(
+            [pq.read_table(path, columns=["call_uuid", "created_at", "transcript_text"]).to_pandas()
+             for _, path, _ in changed],
+            ignore_index=True
+        )
+        added = self.add_documents(df)
+        for day, _, mtime in changed:
+            indexed[day] = mtime
+        self._write_manifest()
+        return added
+
+    # --- Retrieval ---
+
+    def _term_postings(self, token):
+        """Yield (segment_no, local_id, positions) for a token across segments"""
+        for segment_no, segment in enumerate(self.segments):
+            for local_id, positions in segment["postings"].get(token, {}).items():
+                yield segment_no, local_id, positions
+
+    def _phrase_frequencies(self, tokens):
+        """Map (segment_no, local_id) -> occurrences of a term or phrase"""
+        if len(tokens) == 1:
+            return {
+                (segment_no, local_id): len(positions)
+                for segment_no, local_id, positions in self._term_postings(tokens[0])
+            }
+
+        # Intersect the documents holding every token, then verify by position
+        per_token = [
+            {(s, d): p for s, d, p in self._term_postings(token)}
+            for token in tokens
+        ]
+        candidates = set(per_token[0])
+        for token_postings in per_token[1:]:
+            candidates &= token_postings.keys()
+
+        frequencies = {}
+        for doc in candidates:
+            starts = set(per_token[0][doc])
+            for offset, token_postings in enumerate(per_token[1:], start=1):
+                starts &= {position - offset for position in token_postings[doc]}
+                if not starts:
+                    break
+            if starts:
+                frequencies[doc] = len(starts)
+        return frequencies
+
+    def _bm25(self, tf, df, length):
+        idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+        norm = 1 - BM25_B + BM25_B * length / (self.avg_length or 1)
+        return idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+    def search(self, query, k=10, days_back=None):
+        """
+        Return the top-k transcripts for a query ranked by BM25
+
+        Matching transcripts are scored one at a time into a size-k heap, so
+        only k results are held however many transcripts match.
+
+        Args:
+            query (str): Query string, see parse_query()
+            k (int): Number of results to return
+            days_back (int): Only consider transcripts created within this
+                many days, all if None
+
+        Returns:
+            pandas.DataFrame: call_uuid, created_at and score, best first
+        """
+        clauses = parse_query(query)
+        if not clauses or not self.doc_count:
+            return pd.DataFrame(columns=["call_uuid", "created_at", "score"])
+
+        min_created = None
+        if days_back is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=days_back)
+            min_created = pd.Timestamp(cutoff).value
+
+        frequencies = {}
+        clause_docs = []
+        for clause in clauses:
+            docs = None
+            for tokens in clause:
+                if tokens not in frequencies:
+                    frequencies[tokens] = self._phrase_frequencies(tokens)
+                docs = set(frequencies[tokens]) if docs is None else docs & frequencies[tokens].keys()
+            clause_docs.append(docs)
+
+        # Bounded heap of (score, doc): each document's final score is pushed
+        # once and only the best k are kept
+        heap = []
+        for doc in set().union(*clause_docs):
+            segment_no, local_id = doc
+            segment = self.segments[segment_no]
+            if min_created is not None and segment["created_at"][local_id] < min_created:
+                continue
+            length = segment["length"][local_id]
+            # A document matching several OR clauses keeps its best clause score
+            score = max(
+                sum(self._bm25(frequencies[tokens][doc], len(frequencies[tokens]), length) for tokens in clause)
+                for clause, docs in zip(clauses, clause_docs) if doc in docs
+            )
+            if len(heap) < k:
+                heapq.heappush(heap, (score, doc))
+            elif heap and (score, doc) > heap[0]:
+                heapq.heapreplace(heap, (score, doc))
+        top = [(doc, score) for score, doc in sorted(heap, reverse=True)]
+
+        return pd.DataFrame({
+            "call_uuid": [self.segments[s]["call_uuid"][d] for (s, d), _ in top],
+            "created_at": pd.to_datetime(
+                [self.segments[s]["created_at"][d] for (s, d), _ in top], utc=True
+            ),
+            "score": [score for _, score in top],
+        })
+
+
+def _manifest_stamp(index_dir):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_ino
+
+
+def load_index(index_dir=INDEX_DIR):
+    """
+    Index of a directory, loaded once per process
+
+    The segments are only read again when the manifest changes (an update by
+    another process), so repeated queries do not pay the load.
+
+    Args:
+        index_dir (str): Directory holding the manifest and segments
+
+    Returns:
+        TranscriptIndex: Shared by all callers in the process
+    """
+    stamp = _manifest_stamp(index_dir)
+    cached = _loaded.get(index_dir)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, TranscriptIndex(index_dir))
+        _loaded[index_dir] = cached
+    return cached[1]
+
+
+def current_search(query, k=10, days_back=None, index_dir=INDEX_DIR, mirror_dir=MIRROR_DIR):
+    """
+    Bring the index up to date with the mirror, then search it
+
+    Args:
+        query (str): Query string, see parse_query()
+        k (int): Number of results to return
+        days_back (int): Only consider transcripts created within this
+            many days, all if None
+        index_dir (str): Directory of the inverted index
+        mirror_dir (str): Root directory of the transcript mirror
+
+    Returns:
+        pandas.DataFrame: call_uuid, created_at and score, best first
+    """
+    with _update_lock:
+        index = load_index(index_dir)
+        # Picks up mirror syncs; only changed partitions are read
+        index.update_from_mirror(mirror_dir)
+        _loaded[index_dir] = (_manifest_stamp(index_dir), index)
+        return index.search(query, k=k, days_back=days_back)
+
+
+def ranked_search(search_terms, days_back=30, limit=100, match_all=False,
+                  index_dir=INDEX_DIR, mirror_dir=MIRROR_DIR):
+    """
+    Ranked transcript search answered from the local index and mirror
+
+    Args:
+        search_terms (list): Terms or phrases to search for
+        days_back (int): How many days back to search
+        limit (int): Maximum number of results to return
+        match_all (bool): Require every term instead of any term
+        index_dir (str): Directory of the inverted index
+        mirror_dir (str): Root directory of the transcript mirror
+
+    Returns:
+        pandas.DataFrame: Mirror columns plus `score`, best match first
+    """
+    # Quotes would end the phrase early; they separate tokens anyway
+    quoted = ['"{}"'.format(term.replace('"', ' ')) for term in search_terms]
+    query = " ".join(quoted) if match_all else " OR ".join(quoted)
+    hits = current_search(query, k=limit, days_back=days_back, index_dir=index_dir, mirror_dir=mirror_dir)
+    if hits.empty:
+        return pd.DataFrame(columns=["call_uuid", "score"] + [c for c in MIRROR_COLUMNS if c != "call_uuid"])
+    # Only the partitions of the hit days are read, filtered to the hits
+    transcripts = load_calls(hits, mirror_dir=mirror_dir)
+    return hits[["call_uuid", "score"]].merge(transcripts, on="call_uuid", how="inner")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inverted index over mirrored Salesloft transcripts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("update", help="Index transcripts added to the mirror since the last update")
+    search_parser = subparsers.add_parser("search", help="Ranked search over the index")
+    search_parser.add_argument("query", help='Query, e.g. \'"commerce cloud" migration OR sfcc\'')
+    search_parser.add_argument("--top", type=int, default=10, help="Number of results (default 10)")
+    search_parser.add_argument("--days-back", type=int, default=None, help="Restrict to recent transcripts")
+    args = parser.parse_args()
+
+    if args.command == "update":
+        index = TranscriptIndex()
+        added = index.update_from_mirror()
+        print(f"Indexed {added} new transcripts ({index.doc_count} total)")
+    else:
+        results = current_search(args.query, k=args.top, days_back=args.days_back)
+        if results.empty:
+            print("No matching transcripts found.")
+        else:
+            print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""
+Local day-partitioned mirror of Salesloft transcripts
+
+Transcripts older than a day never change in the warehouse, so instead of
+rescanning `shopify-dw.raw_salesloft.transcriptions` on every search we keep a
+local copy partitioned by `created_at` day:
+
+    salesloft_mirror/
+        _watermark.json
+        day=2024-06-01/transcripts.parquet
+        day=2024-06-02/transcripts.parquet
+        ...
+
+`_watermark.json` records the oldest mirrored day and the time up to which the
+mirror is complete. A sync only pulls rows from the watermark day onwards (plus
+any older days needed to extend the window), and the search functions answer
+from the mirror whenever it covers the requested `days_back` window.
+
+Usage:
+    python transcript_mirror.py sync --days-back 90
+    python transcript_mirror.py status
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from data_schema import DICTIONARY_COLUMNS, TRANSCRIPT_SCHEMA, compact
+
+MIRROR_DIR = os.environ.get("SALESLOFT_MIRROR_DIR", "salesloft_mirror")
+WATERMARK_FILE = "_watermark.json"
+PARTITION_FILE = "transcripts.parquet"
+
+# How old the watermark may be before searches go back to the warehouse
+DEFAULT_MAX_STALENESS = timedelta(hours=24)
+
+MIRROR_COLUMNS = [
+    "created_at",
+    "transcript_text",
+    "call_uuid",
+    "duration_seconds",
+    "opportunity_id",
+    "account_name",
+    "owner_name",
+]
+
+SYNC_QUERY = """
+SELECT
+    t.created_at,
+    t.transcript_text,
+    t.call_uuid,
+    t.duration_seconds,
+    c.opportunity_id,
+    c.account_name,
+    c.owner_name
+FROM `shopify-dw.raw_salesloft.transcriptions` t
+LEFT JOIN `shopify-dw.raw_salesloft.conversations` c
+ON t.call_uuid = c.call_uuid
+WHERE t.created_at >= @since
+AND t.created_at < @until
+"""
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+def _start_of_day(ts):
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _partition_dir(day, mirror_dir=MIRROR_DIR):
+    return os.path.join(mirror_dir, f"day={day.isoformat()}")
+
+
+def read_watermark(mirror_dir=MIRROR_DIR):
+    """
+    Read the mirror high-watermark
+
+    Args:
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        dict: `earliest` (first mirrored day) and `watermark` (mirror is
+        complete up to this time) as timezone-aware datetimes, or None if the
+        mirror has never been synced
+    """
+    path = os.path.join(mirror_dir, WATERMARK_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    return {
+        "earliest": datetime.fromisoformat(state["earliest"]),
+        "watermark": datetime.fromisoformat(state["watermark"]),
+        "synced_at": datetime.fromisoformat(state["synced_at"]),
+    }
+
+
+def _write_watermark(earliest, watermark, mirror_dir=MIRROR_DIR):
+    path = os.path.join(mirror_dir, WATERMARK_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "earliest": earliest.isoformat(),
+            "watermark": watermark.isoformat(),
+            "synced_at": _utcnow().isoformat(),
+        }, f, indent=2)
+    # Atomic swap so readers never see a half-written watermark
+    os.replace(tmp_path, path)
+
+
+def _fetch_range(client, since, until):
+    from google.cloud import bigquery
+
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ScalarQueryParameter("since", "TIMESTAMP", since),
+            bigquery.ScalarQueryParameter("until", "TIMESTAMP", until),
+        ],
+        labels={'purpose': 'salesloft_mirror_sync'}
+    )
+    return client.query(SYNC_QUERY, job_config=job_config).to_dataframe()
+
+
+def _write_partitions(df, mirror_dir=MIRROR_DIR):
+    """Write one parquet file per `created_at` day, replacing existing days"""
+    if df.empty:
+        return 0
+    df = df[MIRROR_COLUMNS]
+    days = df["created_at"].dt.date
+    for day, day_df in df.groupby(days, sort=True):
+        partition_dir = _partition_dir(day, mirror_dir)
+        os.makedirs(partition_dir, exist_ok=True)
+        path = os.path.join(partition_dir, PARTITION_FILE)
+        tmp_path = path + ".tmp"
+        table = pa.Table.from_pandas(
+            day_df.sort_values("created_at", ascending=False),
+            preserve_index=False
+        )
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, path)
+    return len(df)
+
+
+def sync_transcripts(days_back=90, client=None, mirror_dir=MIRROR_DIR):
+    """
+    Pull new transcripts from the warehouse into the local mirror
+
+    Only days on or after the current watermark day are fetched, plus any
+    older days needed to extend the mirror to `days_back`. The watermark day
+    itself is always re-fetched because it may have been partial at the last
+    sync.
+
+    Args:
+        days_back (int): How many days of history the mirror should hold
+        client (bigquery.Client): Client to use, created if not provided
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        int: Number of transcript rows written
+    """
+    if client is None:
+        from google.cloud import bigquery
+        client = bigquery.Client()
+
+    now = _utcnow()
+    wanted_earliest = _start_of_day(now - timedelta(days=days_back))
+    state = read_watermark(mirror_dir)
+    os.makedirs(mirror_dir, exist_ok=True)
+
+    # (since, until) ranges still missing from the mirror
+    ranges = []
+    if state is None:
+        ranges.append((wanted_earliest, now))
+        earliest = wanted_earliest
+    else:
+        earliest = state["earliest"]
+        if wanted_earliest < earliest:
+            ranges.append((wanted_earliest, earliest))
+            earliest = wanted_earliest
+        ranges.append((_start_of_day(state["watermark"]), now))
+
+    rows_written = 0
+    for since, until in ranges:
+        print(f"Syncing transcripts from {since:%Y-%m-%d %H:%M} to {until:%Y-%m-%d %H:%M} UTC...")
+        df = _fetch_range(client, since, until)
+        rows_written += _write_partitions(df, mirror_dir)
+
+    _write_watermark(earliest, now, mirror_dir)
+    return rows_written
+
+
+def mirror_covers(days_back, mirror_dir=MIRROR_DIR, max_staleness=DEFAULT_MAX_STALENESS):
+    """
+    Check whether the mirror can answer a search over the last `days_back` days
+
+    Args:
+        days_back (int): Requested search window in days
+        mirror_dir (str): Root directory of the mirror
+        max_staleness (timedelta): Maximum age of the watermark
+
+    Returns:
+        bool: True if the whole window is mirrored and the watermark is fresh
+    """
+    state = read_watermark(mirror_dir)
+    if state is None:
+        return False
+    now = _utcnow()
+    return (
+        state["earliest"] <= now - timedelta(days=days_back)
+        and now - state["watermark"] <= max_staleness
+    )
+
+
+def partition_paths(days_back=None, mirror_dir=MIRROR_DIR):
+    """
+    List mirrored partition files, newest day first
+
+    Args:
+        days_back (int): Only include days inside this window, all if None
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        list: (day, path) tuples
+    """
+    if not os.path.isdir(mirror_dir):
+        return []
+    cutoff_day = None
+    if days_back is not None:
+        cutoff_day = (_utcnow() - timedelta(days=days_back)).date()
+
+    partitions = []
+    for name in os.listdir(mirror_dir):
+        if not name.startswith("day="):
+            continue
+        day = datetime.strptime(name[len("day="):], "%Y-%m-%d").date()
+        if cutoff_day is not None and day < cutoff_day:
+            continue
+        path = os.path.join(mirror_dir, name, PARTITION_FILE)
+        if os.path.exists(path):
+            partitions.append((day, path))
+    return sorted(partitions, reverse=True)
+
+
+def load_mirror(days_back, columns=None, mirror_dir=MIRROR_DIR):
+    """
+    Load mirrored transcripts created within the last `days_back` days
+
+    Args:
+        days_back (int): How many days back to load
+        columns (list): Columns to read, all mirror columns if None
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        pandas.DataFrame: Transcripts ordered by `created_at` descending, with
+        the compact column types of data_schema.TRANSCRIPT_SCHEMA
+    """
+    columns = list(columns or MIRROR_COLUMNS)
+    read_columns = columns if "created_at" in columns else ["created_at"] + columns
+    # Repeated names are read as dictionaries and arrive as categoricals
+    dictionary_columns = [column for column in read_columns if column in DICTIONARY_COLUMNS]
+    tables = [
+        pq.read_table(path, columns=read_columns, read_dictionary=dictionary_columns)
+        for _, path in partition_paths(days_back, mirror_dir)
+    ]
+    if not tables:
+        return pd.DataFrame(columns=columns)
+
+    df = compact(pa.concat_tables(tables).to_pandas(), TRANSCRIPT_SCHEMA)
+    cutoff = pd.Timestamp(_utcnow() - timedelta(days=days_back))
+    df = df[df["created_at"] >= cutoff]
+    return df.sort_values("created_at", ascending=False)[columns].reset_index(drop=True)
+
+
+def load_calls(calls, columns=None, mirror_dir=MIRROR_DIR):
+    """
+    Load specific mirrored transcripts, reading only the days they fall on
+
+    Args:
+        calls (pandas.DataFrame): call_uuid and created_at of the transcripts
+        columns (list): Columns to read, all mirror columns if None
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        pandas.DataFrame: The transcripts found, in no particular order, with
+        the compact column types of data_schema.TRANSCRIPT_SCHEMA
+    """
+    columns = list(columns or MIRROR_COLUMNS)
+    read_columns = columns if "call_uuid" in columns else ["call_uuid"] + columns
+    dictionary_columns = [column for column in read_columns if column in DICTIONARY_COLUMNS]
+    days = pd.to_datetime(calls["created_at"], utc=True).dt.date
+    tables = []
+    for day, call_uuids in calls["call_uuid"].groupby(days):
+        path = os.path.join(_partition_dir(day, mirror_dir), PARTITION_FILE)
+        if os.path.exists(path):
+            tables.append(pq.read_table(path, columns=read_columns, read_dictionary=dictionary_columns,
+                                        filters=[("call_uuid", "in", call_uuids.tolist())]))
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return compact(pa.concat_tables(tables, promote_options="permissive").to_pandas(), TRANSCRIPT_SCHEMA)[columns]
+
+
+def search_mirror(search_terms=None, days_back=30, limit=100, columns=None, mirror_dir=MIRROR_DIR):
+    """
+    Search mirrored transcripts the same way the warehouse search does
+
+    Args:
+        search_terms (list): Case-insensitive terms, a transcript matches if it
+            contains any of them
+        days_back (int): How many days back to search
+        limit (int): Maximum number of results to return
+        columns (list): Columns to return, all mirror columns if None
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        pandas.DataFrame: Most recent matching transcripts
+    """
+    columns = list(columns or MIRROR_COLUMNS)
+    read_columns = columns if "transcript_text" in columns else columns + ["transcript_text"]
+    df = load_mirror(days_back, read_columns, mirror_dir)
+
+    if search_terms:
+        text = df["transcript_text"].fillna("").str.lower()
+        mask = pd.Series(False, index=df.index)
+        for term in search_terms:
+            mask |= text.str.contains(term.lower(), regex=False)
+        df = df[mask]
+
+    return df.head(limit)[columns].reset_index(drop=True)
+
+
+def iter_mirror_batches(search_terms=None, days_back=30, limit=None, columns=None,
+                        batch_size=1000, mirror_dir=MIRROR_DIR):
+    """
+    Stream matching mirrored transcripts as Arrow record batches
+
+    Partitions are read newest day first and one row group at a time, so
+    memory use is bounded by `batch_size` rather than the size of the window.
+
+    Args:
+        search_terms (list): Case-insensitive terms, a transcript matches if it
+            contains any of them
+        days_back (int): How many days back to search
+        limit (int): Maximum number of rows to yield, unlimited if None
+        columns (list): Columns to yield, all mirror columns if None
+        batch_size (int): Maximum rows read per batch
+        mirror_dir (str): Root directory of the mirror
+
+    Yields:
+        pyarrow.RecordBatch: Matching rows, most recent first
+    """
+    columns = list(columns or MIRROR_COLUMNS)
+    read_columns = list(dict.fromkeys(columns + ["created_at", "transcript_text"]))
+    cutoff = _utcnow() - timedelta(days=days_back)
+    remaining = limit
+
+    for _, path in partition_paths(days_back, mirror_dir):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=read_columns):
+            created_at = batch.column("created_at")
+            mask = pc.greater_equal(created_at, pa.scalar(cutoff, type=created_at.type))
+            if search_terms:
+                text = pc.fill_null(batch.column("transcript_text"), "")
+                term_mask = pc.match_substring(text, search_terms[0], ignore_case=True)
+                for term in search_terms[1:]:
+                    term_mask = pc.or_(term_mask, pc.match_substring(text, term, ignore_case=True))
+                mask = pc.and_(mask, term_mask)
+            batch = batch.filter(mask).select(columns)
+            if remaining is not None:
+                batch = batch.slice(0, remaining)
+                remaining -= batch.num_rows
+            if batch.num_rows:
+                yield batch
+            if remaining == 0:
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Salesloft transcript mirror")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    sync_parser = subparsers.add_parser("sync", help="Pull new transcripts into the mirror")
+    sync_parser.add_argument("--days-back", type=int, default=90,
+                             help="How many days of history to keep mirrored (default 90)")
+    subparsers.add_parser("status", help="Show the mirror watermark")
+    args = parser.parse_args()
+
+    if args.command == "sync":
+        try:
+            rows = sync_transcripts(days_back=args.days_back)
+            print(f"Synced {rows} transcripts into {MIRROR_DIR}")
+            # Imported here because transcript_index builds on this module
+            from transcript_index import INDEX_DIR, MANIFEST_FILE, TranscriptIndex
+            if os.path.exists(os.path.join(INDEX_DIR, MANIFEST_FILE)):
+                print(f"Indexed {TranscriptIndex().update_from_mirror()} new transcripts")
+        except Exception as e:
+            print(f"Error syncing transcripts: {str(e)}")
+    else:
+        state = read_watermark()
+        if state is None:
+            print(f"No mirror found in {MIRROR_DIR}. Run 'python transcript_mirror.py sync' first.")
+            return
+        print(f"Earliest day: {state['earliest']:%Y-%m-%d}")
+        print(f"Watermark:    {state['watermark']:%Y-%m-%d %H:%M} UTC")
+        print(f"Last synced:  {state['synced_at']:%Y-%m-%d %H:%M} UTC")
+        print(f"Partitions:   {len(partition_paths())}")
+
+
+if __name__ == "__main__":
+    main()
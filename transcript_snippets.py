@@ -0,0 +1,275 @@
+"""
+Server-side snippet projection for transcript searches
+
+Searches that only show a few hundred characters around each match should not
+download whole transcripts. The snippet query finds match positions and cuts
+the surrounding windows inside BigQuery, so each result row carries only
+metadata plus, per matched term:
+
+    {"term": "bigcommerce", "match_count": 4, "snippets": ["...", "..."]}
+
+The full transcript is fetched lazily with fetch_full_transcript() when someone
+asks for it.
+"""
+from datetime import timedelta
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from query_planner import apply_budget, plan_query
+from transcript_mirror import MIRROR_DIR, iter_mirror_batches, mirror_covers, partition_paths
+
+# Characters kept on each side of a match
+SNIPPET_WINDOW = 100
+
+# Snippets returned per term and transcript
+MAX_SNIPPETS = 3
+
+SNIPPET_COLUMNS = [
+    "created_at",
+    "call_uuid",
+    "duration_seconds",
+    "opportunity_id",
+    "account_name",
+    "owner_name",
+    "matches",
+]
+
+SNIPPET_QUERY = """
+WITH transcripts AS (
+    SELECT
+        t.created_at,
+        t.call_uuid,
+        t.duration_seconds,
+        c.opportunity_id,
+        c.account_name,
+        c.owner_name,
+        t.transcript_text,
+        LOWER(t.transcript_text) AS text_lower
+    FROM `shopify-dw.raw_salesloft.transcriptions` t
+    LEFT JOIN `shopify-dw.raw_salesloft.conversations` c
+    ON t.call_uuid = c.call_uuid
+    WHERE t.created_at >= TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL @days_back DAY)
+),
+term_matches AS (
+    SELECT
+        tr.* EXCEPT (transcript_text, text_lower),
+        ARRAY(
+            SELECT AS STRUCT
+                term,
+                DIV(LENGTH(tr.text_lower) - LENGTH(REPLACE(tr.text_lower, LOWER(term), '')), LENGTH(term)) AS match_count,
+                ARRAY(
+                    SELECT SUBSTR(
+                        tr.transcript_text,
+                        GREATEST(1, INSTR(tr.text_lower, LOWER(term), 1, n) - @window),
+                        LENGTH(term) + 2 * @window
+                    )
+                    FROM UNNEST(GENERATE_ARRAY(1, @max_snippets)) AS n
+                    WHERE INSTR(tr.text_lower, LOWER(term), 1, n) > 0
+                    ORDER BY n
+                ) AS snippets
+            FROM UNNEST(@terms) AS term
+            WHERE STRPOS(tr.text_lower, LOWER(term)) > 0
+        ) AS matches
+    FROM transcripts tr
+)
+SELECT * FROM term_matches
+WHERE ARRAY_LENGTH(matches) > 0
+ORDER BY created_at DESC
+LIMIT @limit
+"""
+
+FULL_TRANSCRIPT_QUERY = """
+SELECT transcript_text
+FROM `shopify-dw.raw_salesloft.transcriptions`
+WHERE call_uuid = @call_uuid
+{created_at_filter}
+LIMIT 1
+"""
+
+
+def snippet_job_config(search_terms, days_back=30, limit=100, window=SNIPPET_WINDOW,
+                       max_snippets=MAX_SNIPPETS, **config):
+    """
+    Query parameters for SNIPPET_QUERY
+
+    Args:
+        search_terms (list): Terms to search for
+        days_back (int): How many days back to search
+        limit (int): Maximum number of transcripts to return
+        window (int): Characters kept on each side of a match
+        max_snippets (int): Snippets returned per term and transcript
+        **config: Extra bigquery.QueryJobConfig settings
+
+    Returns:
+        bigquery.QueryJobConfig: Config with the query parameters bound
+    """
+    from google.cloud import bigquery
+
+    return bigquery.QueryJobConfig(
+        query_parameters=[
+            bigquery.ArrayQueryParameter("terms", "STRING", [term for term in search_terms if term]),
+            bigquery.ScalarQueryParameter("days_back", "INT64", days_back),
+            bigquery.ScalarQueryParameter("limit", "INT64", limit),
+            bigquery.ScalarQueryParameter("window", "INT64", window),
+            bigquery.ScalarQueryParameter("max_snippets", "INT64", max_snippets),
+        ],
+        **config
+    )
+
+
+def extract_snippets(text, search_terms, window=SNIPPET_WINDOW, max_snippets=MAX_SNIPPETS):
+    """
+    Local equivalent of the snippet projection in SNIPPET_QUERY
+
+    Args:
+        text (str): Transcript text
+        search_terms (list): Terms to search for (case-insensitive)
+        window (int): Characters kept on each side of a match
+        max_snippets (int): Snippets returned per term
+
+    Returns:
+        list: {"term", "match_count", "snippets"} dicts for matched terms
+    """
+    if not text:
+        return []
+    text_lower = text.lower()
+    matches = []
+    for term in search_terms:
+        term_lower = term.lower()
+        if not term_lower:
+            continue
+        match_count = text_lower.count(term_lower)
+        if not match_count:
+            continue
+        snippets = []
+        position = text_lower.find(term_lower)
+        while position >= 0 and len(snippets) < max_snippets:
+            start = max(0, position - window)
+            snippets.append(text[start:start + len(term) + 2 * window])
+            position = text_lower.find(term_lower, position + 1)
+        matches.append({"term": term, "match_count": match_count, "snippets": snippets})
+    return matches
+
+
+def mirror_snippets(search_terms, days_back=30, limit=100, window=SNIPPET_WINDOW,
+                    max_snippets=MAX_SNIPPETS, mirror_dir=MIRROR_DIR):
+    """
+    Snippet search over the local transcript mirror
+
+    Transcripts are streamed batch by batch and reduced to snippets as they
+    are read, so full texts are never held for the whole result set.
+
+    Args:
+        search_terms (list): Terms to search for
+        days_back (int): How many days back to search
+        limit (int): Maximum number of transcripts to return
+        window (int): Characters kept on each side of a match
+        max_snippets (int): Snippets returned per term and transcript
+        mirror_dir (str): Root directory of the mirror
+
+    Returns:
+        pandas.DataFrame: SNIPPET_COLUMNS, most recent first
+    """
+    rows = []
+    for batch in iter_mirror_batches(search_terms, days_back=days_back, limit=limit, mirror_dir=mirror_dir):
+        for row in batch.to_pylist():
+            row["matches"] = extract_snippets(row.pop("transcript_text"), search_terms, window, max_snippets)
+            rows.append(row)
+    return pd.DataFrame(rows, columns=SNIPPET_COLUMNS)
+
+
+def search_snippets(search_terms, days_back=30, limit=100, window=SNIPPET_WINDOW,
+                    max_snippets=MAX_SNIPPETS, client=None, location=None, use_mirror=True):
+    """
+    Search transcripts returning match counts and snippets instead of full text
+
+    Args:
+        search_terms (list): Terms to search for
+        days_back (int): How many days back to search
+        limit (int): Maximum number of transcripts to return
+        window (int): Characters kept on each side of a match
+        max_snippets (int): Snippets returned per term and transcript
+        client (bigquery.Client): Client to use, created if not provided
+        location (str): Dataset location
+        use_mirror (bool): Answer from the local transcript mirror when it
+            covers the requested window
+
+    Returns:
+        pandas.DataFrame: SNIPPET_COLUMNS, most recent first, or None if the
+        query failed or was over budget
+    """
+    if use_mirror and mirror_covers(days_back):
+        return mirror_snippets(search_terms, days_back, limit, window, max_snippets)
+
+    if client is None:
+        from google.cloud import bigquery
+        client = bigquery.Client()
+    job_config = apply_budget(snippet_job_config(
+        search_terms, days_back, limit, window, max_snippets,
+        labels={'purpose': 'salesloft_search'}
+    ))
+
+    try:
+        plan = plan_query(client, SNIPPET_QUERY, job_config=job_config, location=location, days_back=days_back)
+        print(plan.summary())
+        if not plan.within_budget:
+            if use_mirror and plan.mirror_fallback:
+                print("Answering from the local mirror instead (it may be stale)")
+                return mirror_snippets(search_terms, days_back, limit, window, max_snippets)
+            return None
+        return client.query(SNIPPET_QUERY, job_config=job_config, location=location).to_dataframe()
+    except Exception as e:
+        print(f"Error executing query: {str(e)}")
+        return None
+
+
+def fetch_full_transcript(call_uuid, created_at=None, client=None, location=None, use_mirror=True):
+    """
+    Lazily fetch the full text of one transcript
+
+    Looks in the local mirror first. In the warehouse, passing the row's
+    `created_at` narrows the scan to that day.
+
+    Args:
+        call_uuid (str): Call to fetch
+        created_at (datetime): Creation time of the transcript, if known
+        client (bigquery.Client): Client to use, created if not provided
+        location (str): Dataset location
+        use_mirror (bool): Look in the local transcript mirror first
+
+    Returns:
+        str: Transcript text, or None if not found
+    """
+    if use_mirror:
+        partitions = partition_paths()
+        if created_at is not None:
+            day = pd.Timestamp(created_at).date()
+            partitions = [(d, path) for d, path in partitions if d == day]
+        for _, path in partitions:
+            table = pq.read_table(path, columns=["call_uuid", "transcript_text"],
+                                  filters=[("call_uuid", "=", call_uuid)])
+            if table.num_rows:
+                return table.column("transcript_text")[0].as_py()
+
+    from google.cloud import bigquery
+
+    if client is None:
+        client = bigquery.Client()
+    parameters = [bigquery.ScalarQueryParameter("call_uuid", "STRING", call_uuid)]
+    created_at_filter = ""
+    if created_at is not None:
+        created_at = pd.Timestamp(created_at)
+        parameters += [
+            bigquery.ScalarQueryParameter("day_start", "TIMESTAMP", created_at - timedelta(days=1)),
+            bigquery.ScalarQueryParameter("day_end", "TIMESTAMP", created_at + timedelta(days=1)),
+        ]
+        created_at_filter = "AND created_at BETWEEN @day_start AND @day_end"
+
+    job_config = apply_budget(bigquery.QueryJobConfig(query_parameters=parameters))
+    rows = list(client.query(
+        FULL_TRANSCRIPT_QUERY.format(created_at_filter=created_at_filter),
+        job_config=job_config,
+        location=location
+    ).result())
+    return rows[0].transcript_text if rows else None